@@ -0,0 +1,21 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.views import exception_handler as default_exception_handler
+
+from core.passwords import PasswordHashingBusy
+
+
+class ServiceUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Service temporarily unavailable, try again later.'
+    default_code = 'service_unavailable'
+
+
+def exception_handler(exc, context):
+    """
+    Answers errors of the core layer with HTTP responses,
+    other errors are handled by DRF.
+    """
+    if isinstance(exc, PasswordHashingBusy):
+        exc = ServiceUnavailable(str(exc), code='password_hashing_busy')
+    return default_exception_handler(exc, context)
@@ -0,0 +1,291 @@
+import functools
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import Prefetch
+from django.http import Http404, StreamingHttpResponse
+from django.utils.http import http_date
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import relations
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from library.conditional import (
+    aget_fingerprint,
+    aget_page_fingerprint,
+    get_etag,
+    get_fingerprint,
+    get_page_fingerprint,
+    not_modified,
+)
+from library.export import ASYNC_EXPORTERS, EXPORTERS, ato_ndjson, parse_since, to_ndjson
+
+from .renderers import NDJSONRenderer
+
+
+class EagerLoadingMixin:
+    """
+    Loads relations rendered by the serializer in bulk, so that
+    a list response runs a constant number of queries regardless of page size.
+
+    Forward foreign keys are joined with `select_related`, many-to-many and
+    reverse relations are fetched with `prefetch_related` limited to columns
+    needed to render them. Relations left out of a sparse fieldset are not
+    loaded and columns read only by left out fields are deferred.
+    """
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer = self.get_serializer()
+        return self.setup_eager_loading(queryset, serializer)
+
+    @staticmethod
+    def setup_eager_loading(queryset, serializer):
+        """
+        Adds `select_related` and `prefetch_related` calls for
+        related fields readable by the given serializer, and defers
+        columns it does not read.
+        """
+        opts = queryset.model._meta
+        select = []
+        prefetch = []
+        for field in serializer._readable_fields:
+            if isinstance(field, relations.ManyRelatedField):
+                relation = field.child_relation
+            elif isinstance(field, relations.RelatedField):
+                relation = field
+            else:
+                continue
+            if field.source == '*' or '.' in field.source:
+                continue
+
+            try:
+                model_field = opts.get_field(field.source)
+            except FieldDoesNotExist:
+                # Read from a property, e.g. `Article.related_articles`.
+                continue
+            if model_field.many_to_one or model_field.one_to_one:
+                select.append(field.source)
+                continue
+
+            related_model = model_field.related_model
+            only = {'pk', getattr(relation, 'lookup_field', 'pk')}
+            if model_field.one_to_many:
+                only.add(model_field.field.name)
+            prefetch.append(
+                Prefetch(field.source, queryset=related_model._default_manager.only(*only))
+            )
+
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        if hasattr(serializer, 'get_deferred_fields'):
+            deferred = serializer.get_deferred_fields()
+            if deferred:
+                queryset = queryset.defer(*deferred)
+        return queryset
+
+
+class NDJSONExportMixin:
+    """
+    Adds an `export` action that streams all objects as newline-delimited JSON.
+
+    The `since` query parameter limits the export to objects
+    modified after the given ISO 8601 timestamp. Async viewsets stream
+    it from an async iterator, which ASGI servers do not buffer.
+    """
+    export_name = None
+
+    @extend_schema(
+        parameters=[OpenApiParameter('since', OpenApiTypes.DATETIME, required=False)],
+        responses={(200, 'application/x-ndjson'): OpenApiTypes.STR},
+    )
+    @action(
+        detail=False, methods=['get'], renderer_classes=[*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+    )
+    def export(self, request):
+        try:
+            since = parse_since(request.query_params.get('since'))
+        except ValueError as error:
+            raise ValidationError({'since': str(error)})
+        if isinstance(self, AsyncViewSetMixin):
+            content = ato_ndjson(ASYNC_EXPORTERS[self.export_name](since))
+        else:
+            content = to_ndjson(EXPORTERS[self.export_name](since))
+        response = StreamingHttpResponse(content, content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="{self.export_name}.ndjson"'
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Answers `If-None-Match` and `If-Modified-Since` requests for list and
+    detail responses with 304 before the serializer runs.
+
+    Validators are computed from `modified` timestamps of the objects and
+    of relations listed in `conditional_related`, whose content is rendered
+    by the serializer. `Last-Modified` is sent only for details without such
+    relations, because a removed related object does not change any timestamp.
+
+    Lists are paginated first and fingerprinted from the objects of the page
+    and the pagination state around them, e.g. the count and links, so that
+    validators cost as much as the page rather than the whole query set.
+    """
+    conditional_related = ()
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        objects = list(queryset) if page is None else page
+        fingerprint = get_page_fingerprint(
+            queryset.model, [obj.pk for obj in objects], self.conditional_related
+        )
+        etag = get_etag(request, fingerprint, *self.get_page_state())
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+        serializer = self.get_serializer(objects, many=True)
+        if page is None:
+            response = Response(serializer.data)
+        else:
+            response = self.get_paginated_response(serializer.data)
+        response['ETag'] = etag
+        return response
+
+    def get_page_state(self) -> tuple:
+        """
+        Returns values rendered around the listed objects, e.g. the count and links.
+        """
+        if self.paginator is None or not hasattr(self.paginator, 'get_page_state'):
+            return ()
+        return self.paginator.get_page_state()
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        if self.conditional_related:
+            fingerprint, _ = get_fingerprint(
+                self.get_queryset().model._default_manager.filter(pk=instance.pk),
+                self.conditional_related,
+            )
+            last_modified = None
+        else:
+            fingerprint = instance.modified.isoformat()
+            last_modified = instance.modified
+        etag = get_etag(request, fingerprint)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        serializer = self.get_serializer(instance)
+        response = Response(serializer.data)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+
+class AsyncViewSetMixin:
+    """
+    Serves a viewset as an async view. `list` and `retrieve` run on the event
+    loop with the async ORM, other actions run in a thread as sync handlers.
+
+    Has to precede `ConditionalGetMixin`, whose validators it computes as well.
+    """
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        return functools.update_wrapper(async_view, view)
+
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        Async version of `APIView.dispatch()`.
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            if getattr(request._request, 'anonymous_fast_path', False):
+                self.initial(request, *args, **kwargs)
+            else:
+                # Authentication may load the user from the session.
+                await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await sync_to_async(self.paginate_queryset)(queryset)
+        objects = [obj async for obj in queryset] if page is None else page
+        fingerprint = await aget_page_fingerprint(
+            queryset.model, [obj.pk for obj in objects], self.conditional_related
+        )
+        etag = get_etag(request, fingerprint, *self.get_page_state())
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+        serializer = self.get_serializer(objects, many=True)
+        if page is None:
+            response = Response(serializer.data)
+        else:
+            response = self.get_paginated_response(serializer.data)
+        response['ETag'] = etag
+        return response
+
+    async def retrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        if self.conditional_related:
+            fingerprint, _ = await aget_fingerprint(
+                self.get_queryset().model._default_manager.filter(pk=instance.pk),
+                self.conditional_related,
+            )
+            last_modified = None
+        else:
+            fingerprint = instance.modified.isoformat()
+            last_modified = instance.modified
+        etag = get_etag(request, fingerprint)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        response = Response(self.get_serializer(instance).data)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+    async def aget_object(self):
+        """
+        Async version of `GenericAPIView.get_object()`.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, DjangoValidationError, TypeError, ValueError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
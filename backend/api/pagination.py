@@ -0,0 +1,213 @@
+import json
+from base64 import b64decode, b64encode
+
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db.models import Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(pagination.CursorPagination):
+    """
+    Cursor pagination keyed on the ordering of the query set, e.g. by
+    relevance of search results, or the model's `Meta.ordering`, with
+    the primary key as a unique tiebreaker.
+
+    The cursor stores values of all ordering fields of the boundary row,
+    so every page is fetched with a single indexed range condition
+    instead of an OFFSET scan and no COUNT query is run.
+    """
+    def get_ordering(self, request, queryset, view):
+        """
+        Returns the ordering of the query set, or model's `Meta.ordering`
+        when it is not ordered explicitly, extended with the primary key,
+        which is sorted in the same direction as the first ordering field.
+        """
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not all(isinstance(field, str) for field in ordering):
+            raise ImproperlyConfigured('Keyset pagination needs an ordering by field names.')
+        if 'pk' not in ordering and '-pk' not in ordering:
+            ordering.append('-pk' if ordering and ordering[0].startswith('-') else 'pk')
+        return tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.annotations = queryset.query.annotations
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = self.cursor is not None and self.cursor.reverse
+        if reverse:
+            queryset = queryset.order_by(*(self._invert(field) for field in self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if self.cursor is not None:
+            queryset = queryset.filter(self._get_keyset_filter(self.cursor.position, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_previous = has_more
+            # The extra row of the page in forward order, usually the cursor row.
+            self.has_next = bool(self.page) and queryset.order_by(*self.ordering).filter(
+                self._get_keyset_filter(self._get_position(self.page[-1]), reverse=False)
+            ).exists()
+        else:
+            self.has_previous = self.cursor is not None
+            self.has_next = has_more
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self._get_position(self.page[0]), reverse=True)
+
+    def decode_cursor(self, request):
+        """
+        Returns a `Cursor` with position decoded from the request,
+        or None when the request has no cursor. Values of the position
+        are converted to types of the ordering fields, so that a malformed
+        cursor is rejected like DRF's `CursorPagination` rejects it.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            tokens = json.loads(b64decode(encoded.encode('ascii')).decode('utf-8'))
+            position = tokens['p']
+            reverse = bool(tokens.get('r', False))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            position = [self._to_python(field, value) for field, value in zip(self.ordering, position)]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return pagination.Cursor(offset=0, reverse=reverse, position=position)
+
+    def encode_cursor(self, position, reverse):
+        """
+        Returns an url with the given position encoded as a cursor.
+        """
+        tokens = {'p': position}
+        if reverse:
+            tokens['r'] = 1
+        encoded = b64encode(json.dumps(tokens).encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _get_position(self, instance) -> list:
+        position = []
+        for field in self.ordering:
+            value = getattr(instance, field.lstrip('-'))
+            position.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return position
+
+    def _to_python(self, field: str, value):
+        name = field.lstrip('-')
+        if name == 'pk':
+            model_field = self.model._meta.pk
+        elif name in self.annotations:
+            model_field = self.annotations[name].output_field
+        else:
+            model_field = self.model._meta.get_field(name)
+        value = model_field.to_python(value)
+        if value is None:
+            raise ValueError('Cursor position values cannot be null.')
+        return value
+
+    def _get_keyset_filter(self, position, reverse) -> Q:
+        """
+        Builds a row value comparison `(f1, f2, ...) > (v1, v2, ...)`
+        that respects the direction of every ordering field.
+
+        The comparison is an OR of ANDs, which SQLite cannot use to seek
+        an index, so it is ANDed with an inclusive bound of the first field,
+        `f1 >= v1`, that turns the query into an index range search.
+        """
+        keyset_filter = Q()
+        equal = Q()
+        bound = None
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            lookup = f'{name}__lt' if descending else f'{name}__gt'
+            if bound is None:
+                bound = Q(**{f'{lookup}e': value})
+            keyset_filter |= equal & Q(**{lookup: value})
+            equal &= Q(**{name: value})
+        return bound & keyset_filter
+
+    @staticmethod
+    def _invert(field: str) -> str:
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+
+class PageNumberOrKeysetPagination(pagination.PageNumberPagination):
+    """
+    Page number pagination that switches to `KeysetPagination`
+    when a request contains a cursor or `?pagination=cursor`.
+
+    The keyset mode leaves out the total count.
+    """
+    mode_query_param = 'pagination'
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.keyset_pagination_class.cursor_query_param in request.query_params
+        ):
+            self.keyset = self.keyset_pagination_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_page_state(self) -> tuple:
+        """
+        Returns the count and links rendered with the page, which its ETag covers.
+        """
+        if self.keyset is not None:
+            return (self.keyset.get_next_link(), self.keyset.get_previous_link())
+        return (self.page.paginator.count, self.get_next_link(), self.get_previous_link())
+
+    def get_html_context(self):
+        if self.keyset is not None:
+            return self.keyset.get_html_context()
+        return super().get_html_context()
+
+    def to_html(self):
+        if self.keyset is not None:
+            return self.keyset.to_html()
+        return super().to_html()
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.extend([
+            {
+                'name': self.mode_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Set to `cursor` to use keyset pagination without a total count.',
+                'schema': {'type': 'string', 'enum': ['cursor']},
+            },
+            *self.keyset_pagination_class().get_schema_operation_parameters(view),
+        ])
+        return parameters
@@ -0,0 +1,63 @@
+"""
+Renderers of API responses.
+
+`ORJSONRenderer` encodes JSON with orjson, several times faster than
+the `json` module used by DRF's `JSONRenderer`. `MessagePackRenderer`
+encodes the same data as MessagePack for clients sending
+`Accept: application/msgpack`. Values neither library encodes natively,
+e.g. lazy translations or decimals, are converted by DRF's JSON encoder.
+`NDJSONRenderer` lets exports, streamed as newline-delimited JSON,
+accept `Accept: application/x-ndjson` and renders their errors as a line.
+"""
+import msgpack
+import orjson
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """
+    Renders JSON with orjson. Indented output, requested by the browsable
+    API or with `indent` media type parameter, is left to `JSONRenderer`.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Datetimes are passed to the default, so they are formatted like by `JSONRenderer`.
+        return orjson.dumps(
+            data, default=_encoder.default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_encoder.default, datetime=False)
+
+
+class NDJSONRenderer(renderers.BaseRenderer):
+    """
+    Renders a list as a line of JSON per item, and other data as a single line.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        return b''.join(
+            orjson.dumps(item, default=_encoder.default, option=orjson.OPT_NON_STR_KEYS) + b'\n'
+            for item in items
+        )
@@ -1,15 +1,86 @@
 from django.contrib.auth.password_validation import validate_password
-from rest_framework import serializers
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import permissions, serializers
+from rest_framework.exceptions import ValidationError
 
 from library.models import Article, Author, Tag
 
 
-class ArticleSerializer(serializers.HyperlinkedModelSerializer):
+class SparseFieldsMixin:
+    """
+    Prunes fields of GET responses with query parameters: `?fields=` lists
+    the only fields to return, `?omit=` the fields to leave out. Fields listed
+    in `Meta.optional_fields` are left out unless they are requested with
+    `?include=`, e.g. `?include=content_html`, or named in `?fields=`.
+
+    Pruned fields are kept in `omitted_fields`, so that views defer columns
+    read only by them and skip their prefetches. `Meta.extra_sources` maps
+    fields to model fields they read besides their source.
+    """
+    def get_fields(self):
+        fields = super().get_fields()
+        self.omitted_fields = {}
+        request = self.context.get('request')
+        query_params = getattr(request, 'query_params', {})
+        if request is not None and request.method in permissions.SAFE_METHODS:
+            only = _get_names(query_params, 'fields')
+            omit = _get_names(query_params, 'omit')
+        else:
+            only = omit = set()
+        included = _get_names(query_params, 'include') | only
+        optional = set(getattr(self.Meta, 'optional_fields', ()))
+
+        readable = {name for name, field in fields.items() if not field.write_only}
+        errors = {
+            param: [f'Unknown fields: {", ".join(sorted(names - readable))}.']
+            for param, names in (('fields', only), ('omit', omit))
+            if names - readable
+        }
+        if errors:
+            raise ValidationError(errors)
+
+        for name in readable:
+            if (only and name not in only) or name in omit or (name in optional and name not in included):
+                self.omitted_fields[name] = fields.pop(name)
+        return fields
+
+    def get_deferred_fields(self) -> set[str]:
+        """
+        Returns names of model fields read only by omitted fields,
+        whose columns do not need to be loaded.
+        """
+        fields = self.fields
+        opts = self.Meta.model._meta
+        extra_sources = getattr(self.Meta, 'extra_sources', {})
+        needed = {name.lstrip('-') for name in opts.ordering}
+        for name, field in fields.items():
+            needed.add(getattr(field, 'lookup_field', None) if field.source == '*' else field.source)
+            needed.update(extra_sources.get(name, ()))
+
+        deferred = set()
+        for name, field in self.omitted_fields.items():
+            try:
+                model_field = opts.get_field(field.source or name)
+            except FieldDoesNotExist:
+                continue
+            if model_field.concrete and not model_field.primary_key:
+                deferred.add(model_field.name)
+        return deferred - needed
+
+
+class ArticleSerializer(SparseFieldsMixin, serializers.HyperlinkedModelSerializer):
+    related_articles = serializers.HyperlinkedRelatedField(
+        many=True,
+        read_only=True,
+        view_name='article-detail',
+        lookup_field='slug',
+    )
 
     class Meta:
         model = Article
-        fields = '__all__'
+        exclude = ['is_verified', 'modified', 'content_html_version']
         read_only_fields = ['author', 'slug']
+        optional_fields = ['content_html']
         extra_kwargs = {
             'url': {'lookup_field': 'slug'},
             'author': {
@@ -34,11 +105,30 @@ class ArticleSerializer(serializers.HyperlinkedModelSerializer):
         return article
 
 
-class AuthorSerializer(serializers.HyperlinkedModelSerializer):
+class ArticleListSerializer(SparseFieldsMixin, serializers.HyperlinkedModelSerializer):
+    """
+    Compact representation of articles in lists. Carries an excerpt
+    and word count in place of the content, returned only by the detail.
+    """
+
+    class Meta:
+        model = Article
+        fields = ['url', 'title', 'slug', 'author', 'tags', 'pub_date', 'excerpt', 'word_count']
+        read_only_fields = fields
+        extra_kwargs = {
+            'url': {'lookup_field': 'slug'},
+            'author': {'lookup_field': 'slug'},
+            'tags': {'lookup_field': 'slug'},
+        }
+
+
+class AuthorSerializer(SparseFieldsMixin, serializers.HyperlinkedModelSerializer):
+    avatar_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Author
-        fields = ['url', 'user_name', 'slug', 'email', 'avatar', 'joined', 'password', 'articles']
+        fields = ['url', 'user_name', 'slug', 'email', 'avatar', 'avatar_variants', 'joined', 'password', 'articles']
+        extra_sources = {'avatar_variants': ['avatar']}
         extra_kwargs = {
             'url': {'lookup_field': 'slug'},
             'slug': {'read_only': True},
@@ -50,6 +140,16 @@ class AuthorSerializer(serializers.HyperlinkedModelSerializer):
                 },
         }
 
+    def get_avatar_variants(self, author) -> dict[str, str]:
+        """
+        Returns URLs of resized avatars by variant name,
+        absolute ones when the request is known.
+        """
+        request = self.context.get('request')
+        if request is None:
+            return author.avatar_urls
+        return {variant: request.build_absolute_uri(url) for variant, url in author.avatar_urls.items()}
+
     def validate_password(self, value):
         """
         Uses Django validate_password function to
@@ -68,7 +168,7 @@ class AuthorSerializer(serializers.HyperlinkedModelSerializer):
         return author
 
 
-class TagSerializer(serializers.HyperlinkedModelSerializer):
+class TagSerializer(SparseFieldsMixin, serializers.HyperlinkedModelSerializer):
 
     class Meta:
         model = Tag
@@ -81,3 +181,7 @@ class TagSerializer(serializers.HyperlinkedModelSerializer):
                 'read_only': True,
                 },
         }
+
+
+def _get_names(query_params, param: str) -> set[str]:
+    return {name.strip() for name in query_params.get(param, '').split(',') if name.strip()}
@@ -1,16 +1,25 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from api.views import (
     ArticleViewSet,
+    AsyncArticleViewSet,
+    AsyncAuthorViewSet,
+    AsyncTagViewSet,
     TagViewSet,
     AuthorViewSet,
 )
 
 router = DefaultRouter()
-router.register(r'authors', AuthorViewSet)
-router.register(r'articles', ArticleViewSet)
-router.register(r'tags', TagViewSet)
+if settings.ASYNC_VIEWS:
+    router.register(r'authors', AsyncAuthorViewSet)
+    router.register(r'articles', AsyncArticleViewSet)
+    router.register(r'tags', AsyncTagViewSet)
+else:
+    router.register(r'authors', AuthorViewSet)
+    router.register(r'articles', ArticleViewSet)
+    router.register(r'tags', TagViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
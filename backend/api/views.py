@@ -1,7 +1,14 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
 from rest_framework import mixins
 from rest_framework import permissions
+from rest_framework import status
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 
+from .mixins import AsyncViewSetMixin, ConditionalGetMixin, EagerLoadingMixin, NDJSONExportMixin
 from .permissions import (
     ArticleIsOwnerOrReadOnly,
     AuthorIsSelfOrReadOnly,
@@ -10,16 +17,25 @@ from .permissions import (
 )
 from .serializers import (
     AuthorSerializer,
+    ArticleListSerializer,
     ArticleSerializer,
     TagSerializer,
 )
+from library import tag_index
+from library.importer import import_articles
 from library.models import Article, Author, Tag
 
 
-class ArticleViewSet(viewsets.ModelViewSet):
+class ArticleViewSet(ConditionalGetMixin, EagerLoadingMixin, NDJSONExportMixin, viewsets.ModelViewSet):
     """
     Allows anyone to display published articles and
     to create a new article by logged in User.
+
+    Articles can be searched with `?q=` query parameter, filtered
+    by tags with `?tags=`, e.g. `rust OR go`, and created in bulk
+    through the `import` action.
+    The `similar` action lists articles with similar content.
+    Lists carry excerpts, the content is returned only by the detail.
     
     Uses custom permission `ArticleIsOwnerOrReadOnly` that allows only
     author of an article to edit it.
@@ -27,12 +43,76 @@ class ArticleViewSet(viewsets.ModelViewSet):
     queryset = Article.verified_objects.all()
     serializer_class = ArticleSerializer
     lookup_field = 'slug'
+    export_name = 'articles'
+    anonymous_fast_path = True
+    # Set by the async list before filtering by tags, see `tag_index.aget_index()`.
+    loaded_tag_index = None
     permission_classes = [
         permissions.IsAuthenticatedOrReadOnly, ArticleIsOwnerOrReadOnly
     ]
 
+    def get_queryset(self):
+        """
+        Filters articles by full-text search query passed as `?q=`,
+        best matches first, and by tag expression passed as `?tags=`,
+        e.g. `python AND (django OR flask)`.
+
+        The `queryset` attribute is filtered by publication date once, at import,
+        so published articles are selected again on every request.
+        """
+        if self.action == 'similar':
+            # Similar articles are read by the primary key of the requested one.
+            return Article.verified_objects.only('pk', 'slug')
+        queryset = self.setup_eager_loading(Article.verified_objects.all(), self.get_serializer())
+        if self.action == 'list':
+            queryset = queryset.summaries()
+            query = self.request.query_params.get('q')
+            if query is not None:
+                queryset = queryset.search(query)
+            tags = self.request.query_params.get('tags')
+            if tags is not None:
+                try:
+                    queryset = tag_index.filter_articles(queryset, tags, self.loaded_tag_index)
+                except tag_index.TagExpressionError as error:
+                    raise ValidationError({'tags': [str(error)]})
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action in ('list', 'similar'):
+            return ArticleListSerializer
+        return super().get_serializer_class()
+
+    @extend_schema(responses=ArticleListSerializer(many=True))
+    @action(detail=True, methods=['get'])
+    def similar(self, request, slug=None):
+        """
+        Lists published articles with the most similar content,
+        best matches first, read from the similar articles index.
+        """
+        article = self.get_object()
+        serializer = self.get_serializer()
+        articles = self.setup_eager_loading(article.get_similar_articles(), serializer)
+        return Response(self.get_serializer(articles, many=True).data)
 
-class AuthorViewSet(viewsets.ModelViewSet):
+    @extend_schema(request=OpenApiTypes.OBJECT, responses=OpenApiTypes.OBJECT)
+    @action(detail=False, methods=['post'], url_path='import', url_name='import')
+    def bulk_import(self, request):
+        """
+        Creates articles of the logged in User from a list of objects
+        with `title`, `content`, `tags` (names) and optional `pub_date`.
+        Missing tags are created. Invalid items are reported by index
+        and do not prevent the rest from being created.
+        """
+        if not isinstance(request.data, list):
+            raise ValidationError({'non_field_errors': ['Expected a list of articles.']})
+        result = import_articles(request.data, author=request.user)
+        return Response(
+            {'created': result.created, 'errors': result.errors},
+            status=status.HTTP_201_CREATED if result.created else status.HTTP_400_BAD_REQUEST,
+        )
+
+
+class AuthorViewSet(ConditionalGetMixin, EagerLoadingMixin, NDJSONExportMixin, viewsets.ModelViewSet):
     """
     Allows anyone to display users and
     to create a new account by anonymous visitors.
@@ -46,10 +126,13 @@ class AuthorViewSet(viewsets.ModelViewSet):
     queryset = Author.objects.all()
     serializer_class = AuthorSerializer
     lookup_field = 'slug'
+    export_name = 'authors'
+    anonymous_fast_path = True
+    conditional_related = ('articles',)
     permission_classes = [IsAnonymousOrNotAllowed, AuthorIsSelfOrReadOnly]
 
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(ConditionalGetMixin, EagerLoadingMixin, NDJSONExportMixin, viewsets.ModelViewSet):
     """
     Allows anyone to display tags and articles related to them.
     
@@ -59,4 +142,30 @@ class TagViewSet(viewsets.ModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     lookup_field = 'slug'
+    export_name = 'tags'
+    anonymous_fast_path = True
+    conditional_related = ('articles',)
     permission_classes = [IsStaffOrReadOnly]
+
+
+class AsyncArticleViewSet(AsyncViewSetMixin, ArticleViewSet):
+    __doc__ = ArticleViewSet.__doc__
+
+    async def list(self, request, *args, **kwargs):
+        if 'tags' in request.query_params:
+            self.loaded_tag_index = await tag_index.aget_index()
+        return await super().list(request, *args, **kwargs)
+
+    async def aget_object(self):
+        article = await super().aget_object()
+        if 'related_articles' in self.get_serializer().fields:
+            article.related_articles = [related async for related in article.get_related_articles()]
+        return article
+
+
+class AsyncAuthorViewSet(AsyncViewSetMixin, AuthorViewSet):
+    __doc__ = AuthorViewSet.__doc__
+
+
+class AsyncTagViewSet(AsyncViewSetMixin, TagViewSet):
+    __doc__ = TagViewSet.__doc__
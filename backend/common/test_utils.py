@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from api.serializers import ArticleSerializer, AuthorSerializer, TagSerializer
+from api.serializers import ArticleListSerializer, ArticleSerializer, AuthorSerializer, TagSerializer
 from library.models import Article, Author, Tag
 
 
@@ -60,6 +60,20 @@ def serialize_article(article: Article) -> dict:
     serialized_article['url'] = f'http://testserver{serialized_article["url"]}'
     serialized_article['author'] = f'http://testserver{serialized_article["author"]}'
     serialized_article['tags'] = [f'http://testserver{tag}' for tag in serialized_article['tags']]
+    serialized_article['related_articles'] = [
+        f'http://testserver{related}' for related in serialized_article['related_articles']
+    ]
+    return serialized_article
+
+def serialize_article_summary(article: Article) -> dict:
+    """
+    Serializes Article model object as listed by the API and
+    creates absolute urls for hyperlinked relations.
+    """
+    serialized_article = ArticleListSerializer(article, context={'request': None}).data
+    serialized_article['url'] = f'http://testserver{serialized_article["url"]}'
+    serialized_article['author'] = f'http://testserver{serialized_article["author"]}'
+    serialized_article['tags'] = [f'http://testserver{tag}' for tag in serialized_article['tags']]
     return serialized_article
 
 def serialize_author(author: Author) -> dict:
@@ -70,6 +84,9 @@ def serialize_author(author: Author) -> dict:
     serialized_author = AuthorSerializer(author, context={'request': None}).data
     serialized_author['url'] = f'http://testserver{serialized_author["url"]}'
     serialized_author['avatar'] = f'http://testserver{serialized_author["avatar"]}'
+    serialized_author['avatar_variants'] = {
+        variant: f'http://testserver{url}' for variant, url in serialized_author['avatar_variants'].items()
+    }
     serialized_author['articles'] = [f'http://testserver{article}' for article in serialized_author['articles']]
     return serialized_author
 
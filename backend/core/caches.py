@@ -0,0 +1,18 @@
+"""
+Tells whether worker processes share a cache.
+
+Pages in the page cache and the tag index of every process are invalidated
+through the cache, so a change handled by one process reaches the others
+only when they all read the same cache, e.g. Redis set with `REDIS_URL`.
+Django's local memory cache is private to the process, it only counts as
+shared when `SINGLE_PROCESS` says no other process serves or changes data.
+"""
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def is_shared(cache) -> bool:
+    """
+    Returns whether all processes see entries of the cache.
+    """
+    return getattr(settings, 'SINGLE_PROCESS', False) or not isinstance(cache, LocMemCache)
@@ -0,0 +1,140 @@
+"""
+Compression of response bodies with Brotli or gzip.
+
+The encoding is negotiated with the `Accept-Encoding` header, Brotli is
+preferred when the client accepts both equally. Only text-like bodies of
+at least `COMPRESSION_MIN_SIZE` bytes are compressed, smaller ones gain
+less than the encoding costs.
+
+Responses are compressed on the fly at a fast level. Pages stored in the
+page cache are compressed once, at the best level, and the variants are
+stored alongside them, see `library.page_cache`.
+"""
+import gzip
+import re
+import zlib
+from collections.abc import AsyncIterable, Iterable, Iterator
+
+import brotli
+from django.conf import settings
+
+# Preference of the server among encodings the client accepts equally.
+ENCODINGS = ('br', 'gzip')
+COMPRESSIBLE_TYPE_RE = re.compile(
+    r'^(text/|application/(json|javascript|xml|x-ndjson)\b|application/[\w.-]+\+(json|xml)\b|image/svg\+xml\b)'
+)
+FAST_LEVELS = {'br': 4, 'gzip': 6}
+BEST_LEVELS = {'br': 11, 'gzip': 9}
+
+
+def get_min_size() -> int:
+    return getattr(settings, 'COMPRESSION_MIN_SIZE', 512)
+
+
+def get_encoding(request) -> str | None:
+    """
+    Returns the encoding with the highest quality in the `Accept-Encoding`
+    header of the request, or None when the client accepts none of them.
+    """
+    qualities = {}
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = item.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip().lower()] = quality
+
+    default = qualities.get('*', 0.0)
+    best = max(ENCODINGS, key=lambda encoding: qualities.get(encoding, default))
+    return best if qualities.get(best, default) > 0 else None
+
+
+def is_compressible(response) -> bool:
+    """
+    Returns whether the response may be compressed, regardless of its size.
+    """
+    return (
+        not response.has_header('Content-Encoding')
+        and not response.has_header('Content-Range')
+        and 'no-transform' not in response.get('Cache-Control', '')
+        and COMPRESSIBLE_TYPE_RE.match(response.get('Content-Type', '')) is not None
+    )
+
+
+def weaken_etag(response):
+    """
+    Marks a strong ETag of an encoded response as weak, because
+    its body is no longer the same sequence of bytes.
+    """
+    etag = response.get('ETag', '')
+    if etag.startswith('"'):
+        response['ETag'] = f'W/{etag}'
+
+
+def compress(content: bytes, encoding: str, best: bool = False) -> bytes:
+    level = (BEST_LEVELS if best else FAST_LEVELS)[encoding]
+    if encoding == 'br':
+        return brotli.compress(content, quality=level)
+    return gzip.compress(content, compresslevel=level, mtime=0)
+
+
+def compress_variants(content: bytes, content_type: str) -> dict[str, bytes]:
+    """
+    Returns the content compressed at the best level by encoding,
+    leaving out encodings that do not make it smaller.
+    """
+    if len(content) < get_min_size() or not COMPRESSIBLE_TYPE_RE.match(content_type):
+        return {}
+    variants = {encoding: compress(content, encoding, best=True) for encoding in ENCODINGS}
+    return {encoding: variant for encoding, variant in variants.items() if len(variant) < len(content)}
+
+
+def compress_sequence(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """
+    Compresses a streamed body, flushing after every chunk,
+    so that clients receive parts as soon as they are produced.
+    """
+    compressor = _StreamCompressor(encoding)
+    for chunk in chunks:
+        if data := compressor.process(chunk):
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_sequence(chunks: AsyncIterable[bytes], encoding: str):
+    """
+    Async version of `compress_sequence()`.
+    """
+    compressor = _StreamCompressor(encoding)
+    async for chunk in chunks:
+        if data := compressor.process(chunk):
+            yield data
+    yield compressor.finish()
+
+
+class _StreamCompressor:
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        level = FAST_LEVELS[encoding]
+        if encoding == 'br':
+            self.compressor = brotli.Compressor(quality=level)
+        else:
+            self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def process(self, chunk: bytes) -> bytes:
+        if not chunk:
+            return b''
+        if self.encoding == 'br':
+            return self.compressor.process(chunk) + self.compressor.flush()
+        return self.compressor.compress(chunk) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == 'br':
+            return self.compressor.finish()
+        return self.compressor.flush()
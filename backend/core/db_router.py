@@ -0,0 +1,110 @@
+"""
+Routing of reads to read replicas listed in the `DATABASE_REPLICAS` setting.
+
+`ReplicaRoutingMiddleware` picks one replica for every safe request and
+pins unsafe requests to the primary. Once a request writes, the rest
+of it and requests of the same client within `REPLICA_PIN_SECONDS`
+read from the primary as well, so users see their own changes.
+Queries of managers passing the `replica` hint, e.g. `verified_objects`,
+read from a replica in routed blocks that did not pick one. Outside of
+requests, e.g. in commands, signal handlers and imports, reads use the
+primary, which has their own writes.
+
+Writes, sessions, permissions and loading of the logged in user always
+use the primary.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PRIMARY_APP_LABELS = ('admin', 'auth', 'sessions')
+
+
+@dataclass
+class RoutingState:
+    replica: str | None = None
+    pinned: bool = False
+    wrote: bool = False
+
+
+_state: ContextVar[RoutingState | None] = ContextVar('replica_routing_state', default=None)
+
+
+def get_replicas() -> list[str]:
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+@contextmanager
+def route_request(safe: bool):
+    """
+    Routes reads of the enclosed request to a randomly chosen replica
+    when `safe` is true, otherwise to the primary.
+    """
+    replicas = get_replicas()
+    state = RoutingState(
+        replica=random.choice(replicas) if safe and replicas else None,
+        pinned=not safe,
+    )
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """
+    Routes reads of the enclosed block to the primary.
+    """
+    token = _state.set(RoutingState(pinned=True))
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        replicas = get_replicas()
+        if not replicas or model._meta.app_label in PRIMARY_APP_LABELS:
+            return None
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+
+        state = _state.get()
+        if state is None:
+            return None
+        if state.pinned:
+            return DEFAULT_DB_ALIAS
+        if state.replica is not None:
+            return state.replica
+        if hints.get('replica'):
+            return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        if not get_replicas():
+            return None
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+            state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replicas():
+            return False
+        return None
@@ -0,0 +1,263 @@
+"""
+Cookie-free responses for anonymous readers, routing of reads to replicas,
+compression and static files, all usable by sync and async request handlers.
+
+`AnonymousFastPathMiddleware` has to be placed before `SessionMiddleware`.
+Anonymous GET and HEAD requests without a session cookie or credentials,
+routed to a view with `anonymous_fast_path = True`, get an `AnonymousUser`
+before the view runs, so the session is never loaded and no `Vary: Cookie`
+is added. Such responses are marked as cacheable by shared caches,
+responses of the same views for logged in users are marked as private.
+
+`ReplicaRoutingMiddleware` has to be placed after `AuthenticationMiddleware`.
+
+`CompressionMiddleware` has to be placed before middleware that reads or
+changes response bodies. It compresses bodies with Brotli or gzip, leaving
+responses already encoded, e.g. pages from the page cache, as they are.
+
+`StaticFilesMiddleware` is WhiteNoise without the thread hop that its
+sync-only middleware adds to every request under ASGI. Files named by the
+SHA-256 hash of their content, e.g. avatars, are cached forever and found
+even when they were saved after the start of the server.
+"""
+import os
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.middleware import get_user
+from django.contrib.auth.models import AnonymousUser
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.functional import SimpleLazyObject
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.string_utils import ensure_leading_trailing_slash
+
+from . import compression, db_router
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_COOKIE_NAME = 'pin_primary'
+CONTENT_ADDRESSED_RE = re.compile(r'/[0-9a-f]{64}(\.\w+)?$')
+
+
+class AsyncCapableMiddleware:
+    """
+    Base of middleware that runs in the mode of the request handler.
+    Subclasses implement `handle()` and `ahandle()`.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.ahandle(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        return self.get_response(request)
+
+    async def ahandle(self, request):
+        return await self.get_response(request)
+
+
+class AnonymousFastPathMiddleware(AsyncCapableMiddleware):
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if self.async_mode:
+            # The handler runs sync `process_view` in a thread.
+            self.process_view = self.aprocess_view
+
+    def handle(self, request):
+        return self.process_response(request, self.get_response(request))
+
+    async def ahandle(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        fast_path = getattr(request, 'anonymous_fast_path', None)
+        if fast_path is None or response.has_header('Cache-Control'):
+            return response
+
+        if hasattr(response, 'accepted_renderer'):
+            # API responses are negotiated by the `Accept` header.
+            patch_vary_headers(response, ('Accept',))
+        if fast_path and response.status_code in (200, 304) and not response.cookies:
+            max_age = getattr(settings, 'ANONYMOUS_CACHE_MAX_AGE', 60)
+            patch_cache_control(response, public=True, max_age=max_age)
+        else:
+            patch_cache_control(response, private=True)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None)
+        if not getattr(view_class, 'anonymous_fast_path', False):
+            return None
+
+        request.anonymous_fast_path = self.is_anonymous_read(request)
+        if request.anonymous_fast_path:
+            user = AnonymousUser()
+            request.user = user
+
+            async def auser():
+                return user
+
+            request.auser = auser
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        return type(self).process_view(self, request, view_func, view_args, view_kwargs)
+
+    @staticmethod
+    def is_anonymous_read(request) -> bool:
+        return (
+            request.method in ('GET', 'HEAD')
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+            and 'HTTP_AUTHORIZATION' not in request.META
+        )
+
+
+class ReplicaRoutingMiddleware(AsyncCapableMiddleware):
+
+    def handle(self, request):
+        if not db_router.get_replicas():
+            return self.get_response(request)
+
+        with db_router.route_request(self.is_safe(request)) as state:
+            self.load_user_from_primary(request)
+            response = self.get_response(request)
+        return self.pin_client(response, state)
+
+    async def ahandle(self, request):
+        if not db_router.get_replicas():
+            return await self.get_response(request)
+
+        with db_router.route_request(self.is_safe(request)) as state:
+            self.load_user_from_primary(request)
+            response = await self.get_response(request)
+        return self.pin_client(response, state)
+
+    @staticmethod
+    def is_safe(request) -> bool:
+        return request.method in SAFE_METHODS and PIN_COOKIE_NAME not in request.COOKIES
+
+    def load_user_from_primary(self, request):
+        if not hasattr(request, 'user'):
+            return
+        request.user = SimpleLazyObject(lambda: self.get_user(request))
+        auser = request.auser
+
+        async def auser_from_primary():
+            with db_router.use_primary():
+                return await auser()
+
+        request.auser = auser_from_primary
+
+    @staticmethod
+    def pin_client(response, state):
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE_NAME,
+                '1',
+                max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 15),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    @staticmethod
+    def get_user(request):
+        with db_router.use_primary():
+            return get_user(request)
+
+
+class CompressionMiddleware(AsyncCapableMiddleware):
+
+    def handle(self, request):
+        return self.process_response(request, self.get_response(request))
+
+    async def ahandle(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    @staticmethod
+    def process_response(request, response):
+        if not compression.is_compressible(response):
+            return response
+        if not response.streaming and len(response.content) < compression.get_min_size():
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = compression.get_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compression.acompress_sequence(response.streaming_content, encoding)
+            else:
+                response.streaming_content = compression.compress_sequence(response.streaming_content, encoding)
+            del response['Content-Length']
+        else:
+            content = compression.compress(response.content, encoding)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        response['Content-Encoding'] = encoding
+        compression.weaken_etag(response)
+        return response
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.acall(request)
+        static_file = self.files.get(request.path_info)
+        if static_file is None and self.is_findable(request.path_info):
+            static_file = self.find_new_file(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return self.get_response(request)
+
+    async def acall(self, request):
+        static_file = self.files.get(request.path_info)
+        if static_file is None and self.is_findable(request.path_info):
+            static_file = await sync_to_async(self.find_new_file)(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+    def add_files(self, root, prefix=None):
+        super().add_files(root, prefix)
+        if not self.autorefresh:
+            # Directories searched by `find_new_file()`, WhiteNoise keeps them only with autorefresh.
+            root = os.path.abspath(root).rstrip(os.path.sep) + os.path.sep
+            self.directories.insert(0, (root, ensure_leading_trailing_slash(prefix)))
+
+    def is_findable(self, url: str) -> bool:
+        return self.autorefresh or CONTENT_ADDRESSED_RE.search(url) is not None
+
+    def find_new_file(self, url: str):
+        static_file = self.find_file(url)
+        if static_file is not None and not self.autorefresh:
+            # Content of the file never changes.
+            self.files[url] = static_file
+        return static_file
+
+    def immutable_file_test(self, path, url):
+        return CONTENT_ADDRESSED_RE.search(url) is not None or super().immutable_file_test(path, url)
@@ -0,0 +1,176 @@
+"""
+Hashing and verification of passwords in a bounded pool of processes.
+
+Password hashers are deliberately slow and hold the GIL, so running them
+in a request thread stalls every other request served by the same worker.
+`PASSWORD_HASHING_WORKERS` processes hash passwords, at most
+`PASSWORD_HASHING_QUEUE_SIZE` more passwords wait for a free process and
+others wait up to `PASSWORD_HASHING_TIMEOUT` seconds for a place in the
+queue before `PasswordHashingBusy` is raised. With no workers, passwords
+are hashed in the calling thread.
+
+Callers wait up to `PASSWORD_HASHING_RESULT_TIMEOUT` seconds for a hash
+before `PasswordHashingBusy` is raised as well, e.g. when a worker hangs.
+Outdated hashes of correct passwords are upgraded in the pool in the
+background, the check returns without waiting for the new hash. The web
+and API layers answer `PasswordHashingBusy` with 503.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.signals import setting_changed
+from django.db import close_old_connections
+from django.dispatch import receiver
+
+_lock = threading.Lock()
+_pool: tuple[int, ProcessPoolExecutor, threading.BoundedSemaphore] | None = None
+
+
+class PasswordHashingBusy(Exception):
+    """
+    Raised when no place in the queue of the pool frees up in time.
+    """
+    def __init__(self, message='Too many passwords are being hashed, try again later.'):
+        super().__init__(message)
+
+
+def get_workers() -> int:
+    return getattr(settings, 'PASSWORD_HASHING_WORKERS', 2)
+
+
+def get_result_timeout() -> float:
+    return getattr(settings, 'PASSWORD_HASHING_RESULT_TIMEOUT', 30)
+
+
+def get_pool() -> tuple[ProcessPoolExecutor, threading.BoundedSemaphore]:
+    """
+    Returns the pool of the current process and the semaphore limiting
+    the number of passwords hashed or waiting, both created on first use.
+    """
+    global _pool
+    with _lock:
+        if _pool is None or _pool[0] != os.getpid():
+            workers = get_workers()
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                # Forking a process with running threads is unsafe.
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+            slots = threading.BoundedSemaphore(workers + getattr(settings, 'PASSWORD_HASHING_QUEUE_SIZE', 32))
+            _pool = (os.getpid(), executor, slots)
+        return _pool[1], _pool[2]
+
+
+def shutdown_pool():
+    global _pool
+    with _lock:
+        if _pool is not None and _pool[0] == os.getpid():
+            _pool[1].shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+@receiver(setting_changed)
+def reset_pool(*, setting, **kwargs):
+    if setting.startswith('PASSWORD_HASHING_'):
+        shutdown_pool()
+
+
+def submit(function, *args, wait: bool = True) -> Future:
+    """
+    Runs `function(PASSWORD_HASHERS, *args)` in the pool. Raises `PasswordHashingBusy`
+    when the queue is full, after `PASSWORD_HASHING_TIMEOUT` seconds if `wait` is true.
+    """
+    password_hashers = list(settings.PASSWORD_HASHERS)
+    if get_workers() <= 0:
+        future = Future()
+        try:
+            future.set_result(function(password_hashers, *args))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+    executor, slots = get_pool()
+    timeout = getattr(settings, 'PASSWORD_HASHING_TIMEOUT', 10) if wait else None
+    if not slots.acquire(blocking=wait, timeout=timeout):
+        raise PasswordHashingBusy
+    try:
+        future = executor.submit(function, password_hashers, *args)
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+
+def get_result(future: Future):
+    """
+    Returns the result of a submitted function, raises `PasswordHashingBusy`
+    when it is not ready in `PASSWORD_HASHING_RESULT_TIMEOUT` seconds.
+    """
+    try:
+        return future.result(timeout=get_result_timeout())
+    except TimeoutError:
+        future.cancel()
+        raise PasswordHashingBusy from None
+
+
+def make_password(password: str | None) -> str:
+    if password is None:
+        return hashers.make_password(None)
+    return get_result(submit(_make_password, password))
+
+
+def check_password(password: str | None, encoded: str, rehash=None) -> bool:
+    """
+    Returns whether the password matches the encoded one. When it does, but
+    the hash is outdated, the password is hashed again in the background,
+    unless the queue of the pool is full, and `rehash(new_encoded)` is called
+    once it is, from the thread that waits for results of the pool.
+    """
+    if password is None or not hashers.is_password_usable(encoded):
+        return False
+    is_correct, must_update = get_result(submit(_verify_password, password, encoded))
+    if is_correct and must_update and rehash is not None:
+        try:
+            future = submit(_make_password, password, wait=False)
+        except PasswordHashingBusy:
+            # The hash is upgraded on a later login.
+            return is_correct
+        caller = threading.get_ident()
+
+        def apply(future):
+            if future.cancelled() or future.exception() is not None:
+                return
+            try:
+                rehash(future.result())
+            finally:
+                if threading.get_ident() != caller:
+                    # Connections opened by `rehash` outside of requests.
+                    close_old_connections()
+
+        future.add_done_callback(apply)
+    return is_correct
+
+
+def _use_hashers(password_hashers: list[str]):
+    """
+    Applies `PASSWORD_HASHERS` of the calling process.
+    """
+    if settings.PASSWORD_HASHERS != password_hashers:
+        settings.PASSWORD_HASHERS = password_hashers
+        hashers.reset_hashers(setting='PASSWORD_HASHERS')
+
+
+def _make_password(password_hashers: list[str], password: str) -> str:
+    _use_hashers(password_hashers)
+    return hashers.make_password(password)
+
+
+def _verify_password(password_hashers: list[str], password: str, encoded: str) -> tuple[bool, bool]:
+    _use_hashers(password_hashers)
+    return hashers.verify_password(password, encoded)
+
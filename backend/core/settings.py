@@ -37,7 +37,6 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'debug_toolbar',
     'rest_framework',
     'corsheaders',
     'drf_spectacular',
@@ -45,18 +44,33 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.AnonymousFastPathMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.StaticFilesMiddleware',
 ]
 
+# The toolbar middleware is sync only, it would add a thread hop
+# to every request under ASGI, so it is only installed for debugging.
+# It has to see bodies before they are compressed.
+if DEBUG:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('core.middleware.CompressionMiddleware') + 1,
+        'debug_toolbar.middleware.DebugToolbarMiddleware',
+    )
+
+# Async read views with the async ORM, enabled by default under ASGI, see core/asgi.py.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS') == '1'
+
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
@@ -83,10 +97,48 @@ WSGI_APPLICATION = 'core.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
 
+# Profile for several concurrent workers, enabled with DATABASE_PROFILE=production:
+# WAL lets readers run during writes, connections are reused across requests
+# and writers wait for the lock instead of failing, see core/sqlite3/base.py.
+if os.environ.get('DATABASE_PROFILE') == 'production':
+    DATABASES['default'].update({
+        'ENGINE': 'core.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 20,
+            'transaction_mode': 'IMMEDIATE',
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                'mmap_size': 256 * 1024 * 1024,
+                'cache_size': -32 * 1024,
+                'temp_store': 'MEMORY',
+            },
+        },
+    })
+
+# Read replicas, e.g. DATABASE_REPLICAS=/data/replica1.sqlite3,/data/replica2.sqlite3
+# Safe requests read from them, clients that wrote read from the primary
+# for REPLICA_PIN_SECONDS, see core/db_router.py.
+DATABASE_REPLICAS = []
+
+for index, name in enumerate(filter(None, os.environ.get('DATABASE_REPLICAS', '').split(',')), start=1):
+    DATABASES[f'replica{index}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{index}')
+
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+
+REPLICA_PIN_SECONDS = 15
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -134,13 +186,63 @@ INTERNAL_IPS = [
     '127.0.0.1',
 ]
 
+# Cache shared by all worker processes, e.g. REDIS_URL=redis://127.0.0.1:6379/0.
+# Pages and the tag index are invalidated through it, so without it they are
+# not cached, unless SINGLE_PROCESS=1 says one process serves and changes
+# all data and may keep them in its local memory, see core/caches.py.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+SINGLE_PROCESS = os.environ.get('SINGLE_PROCESS') == '1'
+
+# Cache of rendered pages for anonymous visitors, entries are invalidated
+# by signals, the timeout only limits how long unused pages are kept.
+PAGE_CACHE_ALIAS = 'default'
+
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Response bodies smaller than this number of bytes are sent uncompressed.
+COMPRESSION_MIN_SIZE = 512
+
+# Seconds shared caches may serve public pages to anonymous readers,
+# they revalidate with ETags afterwards.
+ANONYMOUS_CACHE_MAX_AGE = 60
+
+# Processes hashing passwords off request threads, passwords waiting for
+# a free one and seconds to wait for a place among them, then for the hash,
+# before answering 503.
+PASSWORD_HASHING_WORKERS = int(os.environ.get('PASSWORD_HASHING_WORKERS', 2))
+
+PASSWORD_HASHING_QUEUE_SIZE = 32
+
+PASSWORD_HASHING_TIMEOUT = 10
+
+PASSWORD_HASHING_RESULT_TIMEOUT = 30
+
 # Custom user model
 AUTH_USER_MODEL = 'library.Author'
 
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticatedOrReadOnly'],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination', 'PAGE_SIZE': 9,
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.PageNumberOrKeysetPagination', 'PAGE_SIZE': 9,
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'api.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'EXCEPTION_HANDLER': 'api.exceptions.exception_handler',
 }
 
 CORS_ALLOWED_ORIGINS = [
@@ -0,0 +1,30 @@
+"""
+SQLite backend for concurrent workers.
+
+Accepts two extra `OPTIONS` on top of the ones passed to `sqlite3.connect()`:
+`pragmas`, a mapping of PRAGMA statements run on every new connection, and
+`transaction_mode`, e.g. 'IMMEDIATE', used to begin transactions. Immediate
+transactions take the write lock up front and wait for it with the busy
+timeout, instead of failing with `database is locked` when a deferred
+transaction tries to upgrade from a stale read snapshot.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        kwargs.pop('pragmas', None)
+        kwargs.pop('transaction_mode', None)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict['OPTIONS'].get('pragmas', {}).items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+        self.cursor().execute(f'BEGIN {mode}' if mode else 'BEGIN')
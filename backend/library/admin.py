@@ -14,9 +14,9 @@ class ArticleAdminConfig(admin.ModelAdmin):
     ]})]
     filter_horizontal = ['tags']
     list_display = [
-        'title', 'author', 'pub_date', 'tags_as_str'
+        'title', 'author', 'pub_date', 'tags_as_str', 'is_verified'
     ]
-    list_filter = ['author', 'pub_date', 'tags']
+    list_filter = ['author', 'pub_date', 'tags', 'is_verified']
 
 
 class UserAdminConfig(UserAdmin):
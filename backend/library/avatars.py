@@ -0,0 +1,104 @@
+"""
+Storage and resized variants of author avatars.
+
+Avatars are stored under the hash of their content, so identical uploads
+share one file and a URL always points to the same image, which can be
+cached forever. Files no longer used by any author are deleted by the
+`delete_unused_avatars` command.
+
+Avatars are cropped to squares and recompressed as WebP once, when they
+are uploaded, in every size of `AVATAR_VARIANTS`. Pages and API clients
+then download an image of the size they display instead of the upload.
+"""
+import hashlib
+import os
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+from PIL import Image, ImageOps
+
+AVATAR_ROOT = 'static/library/author'
+AVATAR_DIRECTORY = f'{AVATAR_ROOT}/avatars'
+AVATAR_VARIANTS = {
+    'small': 64,
+    'medium': 200,
+    'large': 400,
+}
+VARIANT_FORMAT = 'WEBP'
+VARIANT_EXTENSION = 'webp'
+VARIANT_QUALITY = 80
+
+
+@deconstructible
+class AvatarStorage(FileSystemStorage):
+    """
+    Saves files as `AVATAR_DIRECTORY/<ab>/<sha256 of content>.<extension>`,
+    a file with the same content is reused instead of being saved again.
+    """
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        digest = digest.hexdigest()
+
+        _, extension = posixpath.splitext(name)
+        extension = extension.lower()
+        if extension not in Image.registered_extensions():
+            extension = ''
+        name = f'{AVATAR_DIRECTORY}/{digest[:2]}/{digest}{extension}'
+        if self.exists(name):
+            # Keeps the file from being deleted as unused before its author is saved.
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length)
+
+
+avatar_storage = AvatarStorage()
+
+
+def get_variant_name(name: str, variant: str) -> str:
+    root, _ = posixpath.splitext(name)
+    return f'{root}_{variant}.{VARIANT_EXTENSION}'
+
+
+def get_variant_names(name: str) -> dict[str, str]:
+    return {variant: get_variant_name(name, variant) for variant in AVATAR_VARIANTS}
+
+
+def create_variants(field_file, name: str) -> dict[str, str]:
+    """
+    Saves resized copies of the image of the field file
+    next to `name` and returns their names by variant.
+    Images smaller than a variant are not enlarged.
+    """
+    field_file.open('rb')
+    with Image.open(field_file) as original:
+        image = ImageOps.exif_transpose(original)
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    variants = {}
+    for variant, size in AVATAR_VARIANTS.items():
+        side = min(size, *image.size)
+        resized = ImageOps.fit(image, (side, side), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        resized.save(buffer, VARIANT_FORMAT, quality=VARIANT_QUALITY)
+        variants[variant] = field_file.storage.save(
+            get_variant_name(name, variant), ContentFile(buffer.getvalue())
+        )
+    return variants
+
+
+def list_files(storage, directory: str):
+    """
+    Yields names of all files in the directory and its subdirectories.
+    """
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield f'{directory}/{name}'
+    for name in directories:
+        yield from list_files(storage, f'{directory}/{name}')
@@ -0,0 +1,23 @@
+from django.core.checks import Tags, Warning, register
+
+from core.caches import is_shared
+
+from . import page_cache, tag_index
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Warns when worker processes do not share the cache, which turns off
+    the page cache and the tag index.
+    """
+    if is_shared(page_cache.get_cache()) and tag_index.is_enabled():
+        return []
+    return [
+        Warning(
+            'The cache is local to each process, so pages are not cached '
+            'and tag filters are evaluated with subqueries.',
+            hint='Set REDIS_URL to a Redis server, or SINGLE_PROCESS=1 when one process serves all requests.',
+            id='library.W001',
+        )
+    ]
@@ -0,0 +1,104 @@
+"""
+Validators for conditional GET requests.
+
+ETags are computed from a single aggregate query over the `modified`
+timestamps of the listed objects and their related objects, together
+with their counts, so that deleted objects and scheduled articles that
+became published change the ETag as well.
+
+Paginated lists are fingerprinted from the page instead, the primary keys
+of its objects in order and an aggregate over their rows only, so the
+cost of the validators grows with the page rather than with the table.
+"""
+import hashlib
+
+from django.db import models
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, quote_etag
+
+from .models import Article
+
+
+def get_fingerprint(queryset: models.QuerySet, related: tuple[str, ...] = ()) -> tuple[str, object]:
+    """
+    Returns a fingerprint of the query set content and the latest
+    modification time of its objects and the given related objects.
+    """
+    return _fingerprint(queryset.order_by().aggregate(**_get_aggregates(queryset, related)))
+
+
+async def aget_fingerprint(queryset: models.QuerySet, related: tuple[str, ...] = ()) -> tuple[str, object]:
+    """
+    Async version of `get_fingerprint()`.
+    """
+    return _fingerprint(await queryset.order_by().aaggregate(**_get_aggregates(queryset, related)))
+
+
+def get_page_fingerprint(model: type[models.Model], pks: list, related: tuple[str, ...] = ()) -> str:
+    """
+    Returns a fingerprint of listed objects with the given primary keys in order.
+    """
+    queryset = model._default_manager.filter(pk__in=pks)
+    values = queryset.order_by().aggregate(**_get_aggregates(queryset, related)) if pks else {}
+    return _fingerprint({'pks': pks, **values})[0]
+
+
+async def aget_page_fingerprint(model: type[models.Model], pks: list, related: tuple[str, ...] = ()) -> str:
+    """
+    Async version of `get_page_fingerprint()`.
+    """
+    queryset = model._default_manager.filter(pk__in=pks)
+    values = await queryset.order_by().aaggregate(**_get_aggregates(queryset, related)) if pks else {}
+    return _fingerprint({'pks': pks, **values})[0]
+
+
+def _get_aggregates(queryset: models.QuerySet, related: tuple[str, ...]) -> dict:
+    now = timezone.now()
+    aggregates = {
+        'count': models.Count('pk', distinct=True),
+        'modified': models.Max('modified'),
+    }
+    if queryset.model is Article:
+        aggregates['published'] = models.Max('pub_date', filter=models.Q(pub_date__lte=now))
+    for name in related:
+        alias = name.replace('__', '_')
+        aggregates[f'{alias}_count'] = models.Count(name, distinct=True)
+        aggregates[f'{alias}_modified'] = models.Max(f'{name}__modified')
+        if _get_related_model(queryset.model, name) is Article:
+            aggregates[f'{alias}_published'] = models.Max(
+                f'{name}__pub_date', filter=models.Q(**{f'{name}__pub_date__lte': now})
+            )
+    return aggregates
+
+
+def _get_related_model(model: type[models.Model], path: str) -> type[models.Model]:
+    """
+    Returns the model at the end of a relation path, e.g. `tags__articles`.
+    """
+    for name in path.split('__'):
+        model = model._meta.get_field(name).related_model
+    return model
+
+
+def _fingerprint(values: dict) -> tuple[str, object]:
+    fingerprint = hashlib.md5(repr(sorted(values.items())).encode()).hexdigest()
+    modified = [value for key, value in values.items() if key.endswith('modified') and value]
+    return fingerprint, max(modified, default=None)
+
+
+def get_etag(request, *parts) -> str:
+    """
+    Returns a quoted ETag for the requested url, the negotiated
+    media type and the given parts.
+    """
+    media_type = getattr(request, 'accepted_media_type', '')
+    source = '|'.join(str(part) for part in (request.get_full_path(), media_type, *parts))
+    return quote_etag(hashlib.md5(source.encode()).hexdigest())
+
+
+def not_modified(request, etag: str, last_modified=None):
+    """
+    Returns a 304 response when the request validators match, otherwise None.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
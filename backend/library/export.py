@@ -0,0 +1,191 @@
+"""
+Newline-delimited JSON export of articles, authors and tags.
+
+Records are read with chunked iteration and encoded one by one,
+so memory use does not depend on the size of the tables.
+`since` limits an export to objects modified after the given time and
+articles published since. Such exports start with `{"slug": ..., "removed":
+true}` records of objects deleted since, and of articles changed since that
+are not published anymore, so consumers can drop their copies.
+
+Every exporter has an async version reading chunks with the async ORM,
+which ASGI servers stream without collecting the export in memory first.
+"""
+from collections.abc import AsyncIterator, Iterator
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Article, Author, Tag, Tombstone
+
+CHUNK_SIZE = 2000
+
+
+def parse_since(value: str | None) -> datetime | None:
+    """
+    Parses an ISO 8601 `since` timestamp, naive values use the current time zone.
+    Raises ValueError when the value is not a valid timestamp.
+    """
+    if not value:
+        return None
+    since = parse_datetime(value)
+    if since is None:
+        raise ValueError(f'Invalid timestamp: {value}')
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def iter_articles(since: datetime | None = None) -> Iterator[dict]:
+    """
+    Yields verified articles with author and tag slugs inlined.
+    """
+    yield from _iter_removed(Article, since)
+    for article in _get_articles(since).iterator(chunk_size=CHUNK_SIZE):
+        yield _get_article_record(article)
+
+
+async def aiter_articles(since: datetime | None = None) -> AsyncIterator[dict]:
+    """
+    Async version of `iter_articles()`.
+    """
+    async for record in _aiter_removed(Article, since):
+        yield record
+    async for article in _get_articles(since).aiterator(chunk_size=CHUNK_SIZE):
+        yield _get_article_record(article)
+
+
+def iter_authors(since: datetime | None = None) -> Iterator[dict]:
+    """
+    Yields authors.
+    """
+    yield from _iter_removed(Author, since)
+    yield from _get_authors(since).iterator(chunk_size=CHUNK_SIZE)
+
+
+async def aiter_authors(since: datetime | None = None) -> AsyncIterator[dict]:
+    """
+    Async version of `iter_authors()`.
+    """
+    async for record in _aiter_removed(Author, since):
+        yield record
+    async for author in _get_authors(since).aiterator(chunk_size=CHUNK_SIZE):
+        yield author
+
+
+def iter_tags(since: datetime | None = None) -> Iterator[dict]:
+    """
+    Yields tags.
+    """
+    yield from _iter_removed(Tag, since)
+    yield from _get_tags(since).iterator(chunk_size=CHUNK_SIZE)
+
+
+async def aiter_tags(since: datetime | None = None) -> AsyncIterator[dict]:
+    """
+    Async version of `iter_tags()`.
+    """
+    async for record in _aiter_removed(Tag, since):
+        yield record
+    async for tag in _get_tags(since).aiterator(chunk_size=CHUNK_SIZE):
+        yield tag
+
+
+EXPORTERS = {
+    'articles': iter_articles,
+    'authors': iter_authors,
+    'tags': iter_tags,
+}
+
+ASYNC_EXPORTERS = {
+    'articles': aiter_articles,
+    'authors': aiter_authors,
+    'tags': aiter_tags,
+}
+
+
+def to_ndjson(records: Iterator[dict]) -> Iterator[str]:
+    """
+    Encodes every record as a single line of JSON.
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for record in records:
+        yield encoder.encode(record) + '\n'
+
+
+async def ato_ndjson(records: AsyncIterator[dict]) -> AsyncIterator[str]:
+    """
+    Async version of `to_ndjson()`.
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    async for record in records:
+        yield encoder.encode(record) + '\n'
+
+
+def _get_articles(since: datetime | None):
+    articles = Article.verified_objects.select_related('author').only(
+        'title', 'slug', 'pub_date', 'content', 'author__slug'
+    ).prefetch_related(
+        Prefetch('tags', queryset=Tag.objects.only('slug'))
+    ).order_by('pub_date', 'pk')
+    if since is not None:
+        # Scheduled articles published since keep their earlier `modified`.
+        articles = articles.filter(Q(modified__gte=since) | Q(pub_date__gte=since, pub_date__lte=timezone.now()))
+    return articles
+
+
+def _get_article_record(article: Article) -> dict:
+    return {
+        'title': article.title,
+        'slug': article.slug,
+        'author': article.author.slug,
+        'tags': [tag.slug for tag in article.tags.all()],
+        'pub_date': article.pub_date,
+        'content': article.content,
+    }
+
+
+def _get_authors(since: datetime | None):
+    authors = Author.objects.values('user_name', 'slug', 'avatar', 'joined').order_by('joined', 'pk')
+    if since is not None:
+        authors = authors.filter(modified__gte=since)
+    return authors
+
+
+def _get_tags(since: datetime | None):
+    tags = Tag.objects.values('name', 'slug').order_by('pk')
+    if since is not None:
+        tags = tags.filter(modified__gte=since)
+    return tags
+
+
+def _iter_removed(model, since: datetime | None) -> Iterator[dict]:
+    if since is not None:
+        for slug in _get_removed(model, since).iterator(chunk_size=CHUNK_SIZE):
+            yield {'slug': slug, 'removed': True}
+
+
+async def _aiter_removed(model, since: datetime | None) -> AsyncIterator[dict]:
+    if since is not None:
+        async for slug in _get_removed(model, since).aiterator(chunk_size=CHUNK_SIZE):
+            yield {'slug': slug, 'removed': True}
+
+
+def _get_removed(model, since: datetime):
+    """
+    Returns slugs of objects of the model deleted since, and of articles
+    changed since that are not published, i.e. unverified or rescheduled.
+    """
+    removed = Tombstone.objects.filter(
+        model=model._meta.model_name, deleted__gte=since
+    ).order_by().values_list('slug', flat=True)
+    if model is Article:
+        removed = removed.union(
+            Article.objects.filter(modified__gte=since).exclude(
+                is_verified=True, pub_date__lte=timezone.now()
+            ).order_by().values_list('slug', flat=True)
+        )
+    return removed
@@ -0,0 +1,221 @@
+"""
+Bulk import of articles referencing tags by name.
+
+Records are processed in chunks, every chunk in its own transaction:
+missing tags are upserted with one INSERT, then articles and their
+through table rows are inserted with one INSERT each. Slugs of a chunk
+are allocated together, titles with the same slug get numbered ones.
+Invalid records are reported with their index and do not stop the
+import of the rest.
+"""
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import page_cache, related, rendering, similarity, tag_index
+from .models import Article, Author, Tag
+from .slugs import assign_slugs
+
+BATCH_SIZE = 500
+
+
+@dataclass
+class ImportResult:
+    created: list[str] = field(default_factory=list)
+    errors: list[dict] = field(default_factory=list)
+
+    def add_error(self, index: int, errors: dict):
+        self.errors.append({'index': index, 'errors': errors})
+
+    def merge(self, other: 'ImportResult'):
+        self.created.extend(other.created)
+        self.errors.extend(other.errors)
+
+
+def import_articles(
+        records: Iterable[dict], author: Author | None = None, batch_size: int = BATCH_SIZE
+    ) -> ImportResult:
+    """
+    Imports articles from `records`. When `author` is not given,
+    every record has to reference its author by slug.
+    """
+    result = ImportResult()
+    for chunk in _chunks(enumerate(records), batch_size):
+        cleaned = []
+        for index, record in chunk:
+            data, errors = _clean(record, author)
+            if errors:
+                result.add_error(index, errors)
+            else:
+                cleaned.append((index, data))
+        if not cleaned:
+            continue
+        try:
+            with transaction.atomic():
+                result.merge(_import_chunk(cleaned))
+        except IntegrityError:
+            # A concurrent writer took a title or slug, retry one by one
+            # to allocate slugs again and find the taken title.
+            for item in cleaned:
+                try:
+                    with transaction.atomic():
+                        result.merge(_import_chunk([item]))
+                except IntegrityError as error:
+                    result.add_error(item[0], {'non_field_errors': [str(error)]})
+    result.errors.sort(key=lambda error: error['index'])
+    return result
+
+
+def _import_chunk(items: list[tuple[int, dict]]) -> ImportResult:
+    result = ImportResult()
+    _resolve_authors(items, result)
+    items = [item for item in items if item[1].get('author') is not None]
+    items = _skip_duplicates(items, result)
+    tags = _upsert_tags({name for _, data in items for name in data['tags']})
+
+    articles = []
+    created = []
+    for index, data in items:
+        missing = [name for name in data['tags'] if name not in tags]
+        if missing:
+            result.add_error(index, {'tags': [f'Tag could not be created: {name}' for name in missing]})
+            continue
+        content_html, excerpt, word_count = rendering.render_article(data['content'])
+        articles.append(Article(
+            title=data['title'],
+            author=data['author'],
+            pub_date=data['pub_date'],
+            content=data['content'],
+            content_html=content_html,
+            content_html_version=rendering.RENDERER_VERSION,
+            excerpt=excerpt,
+            word_count=word_count,
+            is_verified=True,
+        ))
+        created.append(data)
+
+    assign_slugs(articles, 'title')
+    Article.objects.bulk_create(articles)
+    pairs = [(article.pk, tags[name].pk) for article, data in zip(articles, created) for name in data['tags']]
+    Article.tags.through.objects.bulk_create([
+        Article.tags.through(article_id=article_id, tag_id=tag_id) for article_id, tag_id in pairs
+    ])
+    tag_index.add(pairs, slugs={tag.pk: tag.slug for tag in tags.values()})
+    related.add(article.pk for article in articles)
+    similarity.schedule(article.pk for article in articles)
+    result.created.extend(article.slug for article in articles)
+    page_cache.invalidate(
+        'articles',
+        *{f'author-articles:{article.author_id}' for article in articles},
+        *{f'tag-articles:{tags[name].pk}' for data in created for name in data['tags']},
+    )
+    return result
+
+
+def _clean(record, author: Author | None) -> tuple[dict, dict]:
+    """
+    Validates a single record, returns cleaned data and errors.
+    """
+    errors = {}
+    if not isinstance(record, dict):
+        return {}, {'non_field_errors': ['Expected an object.']}
+
+    title = record.get('title')
+    if not isinstance(title, str) or not title.strip():
+        errors['title'] = ['This field is required.']
+    elif len(title) > Article._meta.get_field('title').max_length:
+        errors['title'] = ['Ensure this field has no more than 250 characters.']
+
+    content = record.get('content')
+    if not isinstance(content, str) or not content.strip():
+        errors['content'] = ['This field is required.']
+
+    tags = record.get('tags')
+    if not isinstance(tags, list) or not tags or not all(isinstance(name, str) and name.strip() for name in tags):
+        errors['tags'] = ['Expected a non-empty list of tag names.']
+    elif any(len(name) > Tag._meta.get_field('name').max_length for name in tags):
+        errors['tags'] = ['Tag names have to have no more than 250 characters.']
+
+    pub_date = record.get('pub_date')
+    if pub_date is None:
+        pub_date = timezone.now()
+    else:
+        pub_date = parse_datetime(pub_date) if isinstance(pub_date, str) else None
+        if pub_date is None:
+            errors['pub_date'] = ['Expected an ISO 8601 timestamp.']
+        elif timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date)
+
+    author_slug = None
+    if author is None:
+        author_slug = record.get('author')
+        if not isinstance(author_slug, str) or not author_slug:
+            errors['author'] = ['This field is required.']
+
+    if errors:
+        return {}, errors
+    return {
+        'title': title,
+        'content': content,
+        'tags': list(dict.fromkeys(name.strip() for name in tags)),
+        'pub_date': pub_date,
+        'author': author,
+        'author_slug': author_slug,
+    }, {}
+
+
+def _resolve_authors(items: list[tuple[int, dict]], result: ImportResult):
+    """
+    Replaces author slugs with Author objects fetched in one query.
+    """
+    slugs = {data['author_slug'] for _, data in items if data['author'] is None}
+    if not slugs:
+        return
+    authors = {author.slug: author for author in Author.objects.filter(slug__in=slugs)}
+    for index, data in items:
+        if data['author'] is None:
+            data['author'] = authors.get(data['author_slug'])
+            if data['author'] is None:
+                result.add_error(index, {'author': [f'Author does not exist: {data["author_slug"]}']})
+
+
+def _skip_duplicates(items: list[tuple[int, dict]], result: ImportResult) -> list[tuple[int, dict]]:
+    """
+    Reports records whose title is already taken,
+    in the database or by an earlier record.
+    """
+    titles = {data['title'] for _, data in items}
+    taken_titles = set(Article.objects.filter(title__in=titles).values_list('title', flat=True))
+
+    unique = []
+    for index, data in items:
+        if data['title'] in taken_titles:
+            result.add_error(index, {'title': ['Article with this title already exists.']})
+        else:
+            taken_titles.add(data['title'])
+            unique.append((index, data))
+    return unique
+
+
+def _upsert_tags(names: set[str]) -> dict[str, Tag]:
+    """
+    Creates missing tags with one INSERT and returns all tags by name.
+    """
+    tags = {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+    missing = names - tags.keys()
+    if missing:
+        new_tags = [Tag(name=name) for name in sorted(missing)]
+        assign_slugs(new_tags, 'name')
+        Tag.objects.bulk_create(new_tags, ignore_conflicts=True)
+        tags.update((tag.name, tag) for tag in Tag.objects.filter(name__in=missing))
+    return tags
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -0,0 +1,158 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand
+
+from library.models import Article
+
+STACKS = ('sync', 'async')
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares sync and async read views under ASGI with many concurrent slow clients, '
+        'every stack runs in its own process against a temporary database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stack', nargs='+', choices=STACKS, default=list(STACKS))
+        parser.add_argument('--clients', type=int, default=200, help='Number of concurrent clients.')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds to run every stack for.')
+        parser.add_argument(
+            '--delay', type=float, default=0.05,
+            help='Seconds every client takes to receive each part of a response.',
+        )
+        parser.add_argument('--articles', type=int, default=200, help='Number of articles to start with.')
+        # Internal option of worker processes.
+        parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            result = asyncio.run(self.work(options['clients'], options['duration'], options['delay']))
+            self.stdout.write(json.dumps(result))
+            return
+
+        results = {stack: self.run_stack(stack, options) for stack in options['stack']}
+        self.stdout.write(f'{"stack":<8}{"requests/s":>12}{"p50 ms":>9}{"p95 ms":>9}{"errors":>8}{"threads":>9}')
+        for stack, result in results.items():
+            self.stdout.write(
+                f'{stack:<8}{result["throughput"]:>12.1f}{result["p50"]:>9.1f}{result["p95"]:>9.1f}'
+                f'{result["errors"]:>8}{result["threads"]:>9}'
+            )
+        if set(results) == set(STACKS) and results['sync']['throughput']:
+            gain = results['async']['throughput'] / results['sync']['throughput']
+            self.stdout.write(f'Throughput of the async stack: {gain:.2f}x')
+
+    def run_stack(self, stack: str, options: dict) -> dict:
+        with tempfile.TemporaryDirectory() as directory:
+            env = {
+                **os.environ,
+                'SQLITE_PATH': os.path.join(directory, 'db.sqlite3'),
+                'ASYNC_VIEWS': '1' if stack == 'async' else '0',
+            }
+            self.manage(env, 'migrate', '--verbosity', '0')
+            self.manage(
+                env, 'benchmark_concurrency', '--worker', 'seed',
+                '--articles', str(options['articles']), '--writers', '0',
+            )
+            output = self.manage(
+                env, 'benchmark_asgi', '--worker', '--clients', str(options['clients']),
+                '--duration', str(options['duration']), '--delay', str(options['delay']),
+            )
+        return json.loads(output)
+
+    @staticmethod
+    def manage(env: dict, *args: str) -> str:
+        return subprocess.run(
+            [sys.executable, settings.BASE_DIR / 'manage.py', *args],
+            env=env, check=True, stdout=subprocess.PIPE, text=True,
+        ).stdout
+
+    async def work(self, clients: int, duration: float, delay: float) -> dict:
+        """
+        Runs `clients` concurrent clients requesting article, author and tag
+        pages and API endpoints for `duration` seconds, returns throughput,
+        latency percentiles, errors and the peak number of threads.
+        """
+        application = ASGIHandler()
+        slugs = await asyncio.to_thread(
+            lambda: list(Article.verified_objects.values_list('slug', 'author__slug')[:20])
+        )
+        paths = ['/api/articles/', '/articles/', '/api/tags/', '/tags/']
+        for slug, author_slug in slugs:
+            paths += [f'/api/articles/{slug}/', f'/article-{slug}/', f'/author-{author_slug}/']
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + duration
+        latencies = []
+        errors = 0
+        threads = threading.active_count()
+
+        async def client(index: int):
+            nonlocal errors, threads
+            while loop.time() < deadline:
+                path = paths[index % len(paths)]
+                index += 1
+                start = loop.time()
+                status = await self.request(application, path, delay)
+                threads = max(threads, threading.active_count())
+                if status == 200:
+                    latencies.append(loop.time() - start)
+                else:
+                    errors += 1
+
+        await asyncio.gather(*(client(index) for index in range(clients)))
+        quantiles = statistics.quantiles(latencies, n=20) if len(latencies) > 1 else [0] * 19
+        return {
+            'throughput': len(latencies) / duration,
+            'p50': quantiles[9] * 1000,
+            'p95': quantiles[18] * 1000,
+            'errors': errors,
+            'threads': threads,
+        }
+
+    @staticmethod
+    async def request(application, path: str, delay: float) -> int:
+        """
+        Sends a GET request to the ASGI application as a client
+        that takes `delay` seconds to receive every message.
+        """
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': b'',
+            'headers': [(b'host', b'localhost'), (b'accept', b'application/json,text/html')],
+            'server': ('localhost', 80),
+            'client': ('127.0.0.1', 50000),
+        }
+        requested = asyncio.Event()
+        status = None
+
+        async def receive():
+            if not requested.is_set():
+                requested.set()
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await asyncio.Future()
+
+        async def send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await asyncio.sleep(delay)
+
+        await application(scope, receive, send)
+        return status
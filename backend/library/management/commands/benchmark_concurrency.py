@@ -0,0 +1,160 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.utils import timezone
+
+from library.importer import import_articles
+from library.models import Author
+
+PROFILES = ('default', 'production')
+TAG_NAME = 'benchmark'
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures throughput of concurrent readers and writers of /api/articles/ '
+        'for each database profile, every worker runs in its own process against '
+        'a temporary database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', nargs='+', choices=PROFILES, default=list(PROFILES))
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--duration', type=float, default=10, help='Seconds to run every profile for.')
+        parser.add_argument('--articles', type=int, default=200, help='Number of articles to start with.')
+        # Internal options of worker processes.
+        parser.add_argument('--worker', choices=('seed', 'read', 'write'), help=argparse.SUPPRESS)
+        parser.add_argument('--index', type=int, default=0, help=argparse.SUPPRESS)
+        parser.add_argument('--start', type=float, default=0, help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['worker'] == 'seed':
+            return self.seed(options['articles'], options['writers'])
+        if options['worker'] is not None:
+            result = self.work(options['worker'], options['index'], options['start'], options['duration'])
+            self.stdout.write(json.dumps(result))
+            return
+
+        results = {profile: self.run_profile(profile, options) for profile in options['profile']}
+        self.stdout.write(f'{"profile":<12}{"reads/s":>10}{"writes/s":>10}{"errors":>8}')
+        for profile, result in results.items():
+            self.stdout.write(
+                f'{profile:<12}{result["reads"]:>10.1f}{result["writes"]:>10.1f}{result["errors"]:>8}'
+            )
+        if set(results) == set(PROFILES):
+            default, production = (results[profile]['reads'] + results[profile]['writes'] for profile in PROFILES)
+            if default:
+                self.stdout.write(f'Throughput of the production profile: {production / default:.2f}x')
+
+    def run_profile(self, profile: str, options: dict) -> dict:
+        """
+        Runs readers and writers against a new database using the given profile
+        and returns successful requests per second and the number of errors.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            env = {
+                **os.environ,
+                'SQLITE_PATH': os.path.join(directory, 'db.sqlite3'),
+                'DATABASE_PROFILE': profile,
+            }
+            self.manage(env, 'migrate', '--verbosity', '0')
+            self.manage(
+                env, 'benchmark_concurrency', '--worker', 'seed',
+                '--articles', str(options['articles']), '--writers', str(options['writers']),
+            )
+
+            start = time.time() + 2
+            workers = [('read', index) for index in range(options['readers'])]
+            workers += [('write', index) for index in range(options['writers'])]
+            processes = [
+                (kind, subprocess.Popen(
+                    [
+                        sys.executable, settings.BASE_DIR / 'manage.py', 'benchmark_concurrency',
+                        '--worker', kind, '--index', str(index),
+                        '--start', str(start), '--duration', str(options['duration']),
+                    ],
+                    env=env,
+                    stdout=subprocess.PIPE,
+                    text=True,
+                ))
+                for kind, index in workers
+            ]
+            totals = {'read': 0, 'write': 0, 'errors': 0}
+            for kind, process in processes:
+                output, _ = process.communicate()
+                result = json.loads(output)
+                totals[kind] += result['requests']
+                totals['errors'] += result['errors']
+
+        return {
+            'reads': totals['read'] / options['duration'],
+            'writes': totals['write'] / options['duration'],
+            'errors': totals['errors'],
+        }
+
+    @staticmethod
+    def manage(env: dict, *args: str):
+        subprocess.run([sys.executable, settings.BASE_DIR / 'manage.py', *args], env=env, check=True)
+
+    @staticmethod
+    def seed(articles: int, writers: int):
+        reader = Author.objects.create(user_name='benchmark reader', email='reader@ex.com', is_active=True)
+        for index in range(writers):
+            Author.objects.create(user_name=f'benchmark writer {index}', email=f'writer{index}@ex.com', is_active=True)
+        import_articles(
+            (
+                {
+                    'title': f'benchmark article {index}',
+                    'content': 'benchmark content ' * 50,
+                    'tags': [TAG_NAME],
+                    'pub_date': (timezone.now() - timedelta(minutes=index)).isoformat(),
+                }
+                for index in range(articles)
+            ),
+            author=reader,
+        )
+
+    @staticmethod
+    def work(kind: str, index: int, start: float, duration: float) -> dict:
+        """
+        Sends requests of the given kind from `start` for `duration` seconds,
+        returns the numbers of successful and failed requests.
+        """
+        client = Client(raise_request_exception=False)
+        if kind == 'write':
+            author = Author.objects.get(user_name=f'benchmark writer {index}')
+            while True:
+                try:
+                    client.force_login(author)
+                    break
+                except Exception:
+                    time.sleep(0.1)
+
+        time.sleep(max(0, start - time.time()))
+        deadline = start + duration
+        result = {'requests': 0, 'errors': 0}
+        number = 0
+        while time.time() < deadline:
+            if kind == 'read':
+                response = client.get('/api/articles/')
+                succeeded = response.status_code == 200
+            else:
+                number += 1
+                response = client.post('/api/articles/', {
+                    'title': f'writer {index} article {number}',
+                    'content': 'benchmark content',
+                    'tags': [f'/api/tags/{TAG_NAME}/'],
+                }, content_type='application/json')
+                succeeded = response.status_code == 201
+            result['requests' if succeeded else 'errors'] += 1
+        return result
@@ -0,0 +1,96 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api.renderers import MessagePackRenderer, ORJSONRenderer
+from library.models import Article
+
+RENDERERS = {
+    'json': JSONRenderer,
+    'orjson': ORJSONRenderer,
+    'msgpack': MessagePackRenderer,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares encode time and payload size of API renderers on article list and detail '
+        'responses, which are fetched from a temporary database in a separate process.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--articles', type=int, default=200, help='Number of articles to start with.')
+        parser.add_argument('--pages', type=int, default=10, help='Number of list and of detail responses.')
+        parser.add_argument('--repeat', type=int, default=200, help='Times every response is encoded.')
+        # Internal option of the worker process.
+        parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            self.stdout.write(JSONRenderer().render(self.fetch(options['pages'])).decode())
+            return
+
+        pages = self.fetch_pages(options)
+        results = {name: self.measure(renderer(), pages, options['repeat']) for name, renderer in RENDERERS.items()}
+        self.stdout.write(f'{"renderer":<10}{"ms/response":>13}{"bytes/response":>16}{"speedup":>9}')
+        for name, (seconds, size) in results.items():
+            self.stdout.write(
+                f'{name:<10}{seconds * 1000:>13.3f}{size:>16.0f}{results["json"][0] / seconds:>8.2f}x'
+            )
+
+    def fetch_pages(self, options: dict) -> list:
+        with tempfile.TemporaryDirectory() as directory:
+            env = {**os.environ, 'SQLITE_PATH': os.path.join(directory, 'db.sqlite3')}
+            self.manage(env, 'migrate', '--verbosity', '0')
+            self.manage(
+                env, 'benchmark_concurrency', '--worker', 'seed',
+                '--articles', str(options['articles']), '--writers', '0',
+            )
+            output = self.manage(env, 'benchmark_renderers', '--worker', '--pages', str(options['pages']))
+        return json.loads(output)
+
+    @staticmethod
+    def manage(env: dict, *args: str) -> str:
+        return subprocess.run(
+            [sys.executable, settings.BASE_DIR / 'manage.py', *args],
+            env=env, check=True, stdout=subprocess.PIPE, text=True,
+        ).stdout
+
+    @staticmethod
+    def fetch(pages: int) -> list:
+        """
+        Returns data of article list pages and of article
+        details with their content rendered to HTML.
+        """
+        client = APIClient()
+        data = []
+        for page in range(1, pages + 1):
+            response = client.get('/api/articles/', {'page': page})
+            if response.status_code != 200:
+                break
+            data.append(response.data)
+        for slug in Article.verified_objects.values_list('slug', flat=True)[:pages]:
+            data.append(client.get(f'/api/articles/{slug}/', {'include': 'content_html'}).data)
+        return data
+
+    @staticmethod
+    def measure(renderer, pages: list, repeat: int) -> tuple[float, float]:
+        """
+        Returns mean seconds to encode a response and its mean size in bytes.
+        """
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for data in pages:
+                renderer.render(data, renderer.media_type, {})
+        seconds = (time.perf_counter() - start) / (repeat * len(pages))
+        size = sum(len(renderer.render(data, renderer.media_type, {})) for data in pages) / len(pages)
+        return seconds, size
@@ -0,0 +1,49 @@
+import posixpath
+import time
+
+from django.core.management.base import BaseCommand
+
+from library import avatars
+from library.models import Author
+
+
+class Command(BaseCommand):
+    help = (
+        'Deletes avatars and their variants which are not used by any author. '
+        'Recently saved files are kept, because their author may not be saved yet.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age', type=int, default=60 * 60,
+            help='Seconds since the last modification of files to delete.',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Lists files without deleting them.')
+
+    def handle(self, *args, **options):
+        storage = avatars.avatar_storage
+        if not storage.exists(avatars.AVATAR_ROOT):
+            self.stdout.write(self.style.SUCCESS('Deleted 0 unused avatar files.'))
+            return
+
+        used = set()
+        for avatar, variants in Author.objects.values_list('avatar', 'avatar_variants').iterator():
+            used.add(avatar)
+            used.update(variants.values())
+        default_directory = posixpath.dirname(Author.DEFAULT_AVATAR)
+        deadline = time.time() - options['min_age']
+
+        deleted = 0
+        for name in avatars.list_files(storage, avatars.AVATAR_ROOT):
+            if name in used or posixpath.dirname(name) == default_directory:
+                continue
+            if storage.get_modified_time(name).timestamp() > deadline:
+                continue
+            if options['dry_run']:
+                self.stdout.write(name)
+            else:
+                storage.delete(name)
+            deleted += 1
+
+        action = 'Found' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{action} {deleted} unused avatar files.'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from library.export import EXPORTERS, parse_since, to_ndjson
+
+
+class Command(BaseCommand):
+    help = 'Exports articles, authors or tags as newline-delimited JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTERS))
+        parser.add_argument('--since', help='Export only objects modified since the ISO 8601 timestamp.')
+        parser.add_argument('--output', help='File to write to, standard output by default.')
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_since(options['since'])
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        lines = to_ndjson(EXPORTERS[options['kind']](since))
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.writelines(lines)
+        else:
+            self.stdout.ending = ''
+            for line in lines:
+                self.stdout.write(line)
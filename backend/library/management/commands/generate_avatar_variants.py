@@ -0,0 +1,46 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+
+from library import avatars
+from library.models import Author
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates resized variants of uploaded avatars which do not have all of them, '
+        'images are processed in parallel threads.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='Number of images processed at once.')
+        parser.add_argument('--force', action='store_true', help='Generates variants of all avatars again.')
+
+    def handle(self, *args, **options):
+        authors = [
+            author
+            for author in Author.objects.exclude(avatar=Author.DEFAULT_AVATAR).exclude(avatar='')
+            if options['force'] or set(author.avatar_variants) != set(avatars.AVATAR_VARIANTS)
+        ]
+        generated = 0
+        # Pillow releases the GIL while it decodes, resizes and encodes images.
+        with ThreadPoolExecutor(max_workers=max(1, options['jobs'])) as executor:
+            futures = {executor.submit(self.create_variants, author): author for author in authors}
+            for future in as_completed(futures):
+                author = futures[future]
+                try:
+                    author.avatar_variants = future.result()
+                except OSError as error:
+                    self.stdout.write(self.style.WARNING(f'Skipped avatar of {author.user_name}: {error}'))
+                    continue
+                author.save(update_fields=['avatar_variants', 'modified'])
+                generated += 1
+        self.stdout.write(self.style.SUCCESS(f'Generated avatar variants of {generated} authors.'))
+
+    @staticmethod
+    def create_variants(author: Author) -> dict[str, str]:
+        try:
+            return avatars.create_variants(author.avatar, author.avatar.name)
+        finally:
+            author.avatar.close()
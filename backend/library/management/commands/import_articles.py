@@ -0,0 +1,45 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from library.importer import BATCH_SIZE, import_articles
+from library.models import Author
+
+
+class Command(BaseCommand):
+    help = (
+        'Imports articles from a newline-delimited JSON file. Every line is an object with '
+        '`title`, `content`, `tags` (names), optional `pub_date` and `author` (slug).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--author', help='Slug of the author of all imported articles.')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        author = None
+        if options['author']:
+            try:
+                author = Author.objects.get(slug=options['author'])
+            except Author.DoesNotExist:
+                raise CommandError(f'Author does not exist: {options["author"]}')
+
+        with open(options['path'], encoding='utf-8') as source:
+            result = import_articles(
+                self.read_records(source), author=author, batch_size=options['batch_size']
+            )
+
+        for error in result.errors:
+            self.stderr.write(f'Line {error["index"] + 1}: {json.dumps(error["errors"])}')
+        self.stdout.write(
+            self.style.SUCCESS(f'Imported {len(result.created)} articles, {len(result.errors)} failed.')
+        )
+
+    @staticmethod
+    def read_records(source):
+        for line in source:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from library import related
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the related articles index with current tag weights.'
+
+    def handle(self, *args, **options):
+        entries = related.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the related articles index with {entries} entries.'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from library.search import is_supported, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the full-text search index of articles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        if not is_supported(options['database']):
+            self.stdout.write(self.style.WARNING('Database does not support the full-text index.'))
+            return
+        rebuild_search_index(options['database'])
+        self.stdout.write(self.style.SUCCESS('Rebuilt the full-text search index.'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from library import similarity
+
+
+class Command(BaseCommand):
+    help = 'Recounts term frequencies and recomputes the content similarity index of articles.'
+
+    def handle(self, *args, **options):
+        articles, entries = similarity.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt the similar articles index of {articles} articles with {entries} entries.'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from library.models import Article
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the stored `is_verified` flag of all articles.'
+
+    def handle(self, *args, **options):
+        updated = Article.objects.all().refresh_verified()
+        verified = Article.objects.filter(is_verified=True).count()
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt {updated} articles, {verified} of them are verified.')
+        )
@@ -0,0 +1,73 @@
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from library import page_cache, rendering
+from library.models import Article
+
+
+class Command(BaseCommand):
+    help = (
+        'Renders content of articles rendered by an older renderer version again, '
+        'batches of articles are rendered in parallel processes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='Number of rendering processes.')
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--force', action='store_true', help='Renders content of all articles again.')
+
+    def handle(self, *args, **options):
+        queryset = Article.objects.all()
+        if not options['force']:
+            queryset = queryset.exclude(content_html_version=rendering.RENDERER_VERSION)
+        pks = list(queryset.order_by('pk').values_list('pk', flat=True))
+        batch_size = max(1, options['batch_size'])
+        jobs = max(1, options['jobs'])
+
+        rendered = 0
+        pending = {}
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context('spawn')) as executor:
+            for start in range(0, len(pks), batch_size):
+                items = list(
+                    Article.objects.filter(pk__in=pks[start:start + batch_size]).values_list('pk', 'content')
+                )
+                future = executor.submit(rendering.render_many, [content for _, content in items])
+                pending[future] = items
+                if len(pending) >= 2 * jobs:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    rendered += sum(self.store(pending.pop(future), future.result()) for future in done)
+            rendered += sum(self.store(items, future.result()) for future, items in pending.items())
+
+        self.stdout.write(self.style.SUCCESS(f'Rendered {rendered} articles.'))
+
+    @staticmethod
+    def store(items: list[tuple[int, str]], rendered: list[rendering.Rendered]) -> int:
+        """
+        Stores rendered HTML, excerpts and word counts of articles
+        whose content did not change in the meantime.
+        """
+        with transaction.atomic():
+            current = dict(Article.objects.filter(pk__in=[pk for pk, _ in items]).values_list('pk', 'content'))
+            modified = timezone.now()
+            articles = [
+                Article(
+                    pk=pk,
+                    content_html=result.html,
+                    content_html_version=rendering.RENDERER_VERSION,
+                    excerpt=result.excerpt,
+                    word_count=result.word_count,
+                    modified=modified,
+                )
+                for (pk, content), result in zip(items, rendered)
+                if current.get(pk) == content
+            ]
+            Article.objects.bulk_update(
+                articles, ['content_html', 'content_html_version', 'excerpt', 'word_count', 'modified']
+            )
+        page_cache.invalidate(*(f'article:{article.pk}' for article in articles))
+        return len(articles)
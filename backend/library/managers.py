@@ -2,26 +2,70 @@ from django.contrib.auth.models import BaseUserManager
 from django.db import models
 from django.utils import timezone
 
+from . import search
 
-class CustomArticleManager(models.Manager):
+
+class ArticleQuerySet(models.QuerySet):
+    """
+    A custom `Article` query set that maintains the stored `is_verified` flag.
+    """
+    def refresh_verified(self, **fields) -> int:
+        """
+        Recomputes `is_verified` for every article in the query set
+        with a single UPDATE statement, which also sets the given `fields`.
+        Returns number of updated rows.
+        """
+        has_tags = models.Exists(
+            self.model.tags.through.objects.filter(article_id=models.OuterRef('pk'))
+        )
+        return self.update(
+            is_verified=models.Case(
+                models.When(
+                    models.Q(has_tags, author__isnull=False) & ~models.Q(title='') & ~models.Q(content=''),
+                    then=models.Value(True),
+                ),
+                default=models.Value(False),
+            ),
+            **fields,
+        )
+
+    def next_pub_date(self):
+        """
+        Returns the earliest future `pub_date` of verified articles
+        in the query set, or None when nothing is scheduled.
+        """
+        return self.filter(
+            is_verified=True, pub_date__gt=timezone.now()
+        ).aggregate(next_pub_date=models.Min('pub_date'))['next_pub_date']
+
+    def summaries(self) -> models.QuerySet:
+        """
+        Defers the content and its HTML, which lists of articles do not show,
+        so that only the stored excerpt is read.
+        """
+        return self.defer('content', 'content_html')
+
+    def search(self, text: str) -> models.QuerySet:
+        """
+        Returns articles matching all words of `text`, best matches first.
+        """
+        return search.search(self, text)
+
+
+class CustomArticleManager(models.Manager.from_queryset(ArticleQuerySet)):
     """
     A custom `Article` model manager that sors out defective articles.
+    Its queries pass the `replica` hint, so the router sends them
+    to a read replica when there is one.
     """
     def get_queryset(self) -> models.QuerySet:
         """
-        Filters out defective articles.
-        """
-        return super().get_queryset().filter(
-        pub_date__lte=timezone.now()
-        ).exclude(
-            title=''
-        ).exclude(
-            author__isnull=True
-        ).exclude(
-            tags__isnull=True
-        ).exclude(
-            content=''
-        )
+        Filters out defective and not yet published articles.
+        Relies on the stored `is_verified` flag, so the query is a single
+        range scan over the partial index of verified articles by pub_date.
+        """
+        queryset = self._queryset_class(model=self.model, using=self._db, hints={'replica': True})
+        return queryset.filter(is_verified=True, pub_date__lte=timezone.now())
     
 
 class CustomAuthorManager(BaseUserManager):
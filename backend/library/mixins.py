@@ -1,4 +1,13 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
 from django.shortcuts import redirect
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+from core.passwords import PasswordHashingBusy
+
+from . import page_cache
+from .conditional import aget_fingerprint, get_etag, get_fingerprint, not_modified
 
 
 class RedirectAuthenticatedUserMixin:
@@ -24,3 +33,131 @@ class RedirectUnAuthenticatedUserMixin:
             return redirect(redirect_to)
         else:
             return super().dispatch(request, *args, **kwargs)
+
+
+class PasswordHashingBusyMixin:
+    """
+    Answers with 503 when the password of a submitted form
+    cannot be hashed because too many are waiting.
+    """
+    def post(self, request, *args, **kwargs):
+        try:
+            return super().post(request, *args, **kwargs)
+        except PasswordHashingBusy as error:
+            return HttpResponse(str(error), status=503)
+
+
+class CachePageMixin:
+    """
+    Serves rendered pages to anonymous visitors from the page cache.
+
+    Views list objects the page depends on in `get_cache_dependencies()`
+    and may return the time the page changes on its own (e.g. when
+    a scheduled article gets published) from `get_cache_expiry()`.
+    Works with both sync and async views.
+    """
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self._dispatch_cached_async(request, *args, **kwargs)
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+
+        cached = page_cache.get_page(request)
+        if cached is not None:
+            return self._get_cached_response(request, cached)
+        generation = page_cache.get_generation()
+        return self._cache_response(request, super().dispatch(request, *args, **kwargs), generation)
+
+    async def _dispatch_cached_async(self, request, *args, **kwargs):
+        user = await request.auser()
+        if request.method != 'GET' or user.is_authenticated:
+            return await super().dispatch(request, *args, **kwargs)
+
+        cached = await sync_to_async(page_cache.get_page)(request)
+        if cached is not None:
+            return self._get_cached_response(request, cached)
+        generation = await sync_to_async(page_cache.get_generation)()
+        return self._cache_response(request, await super().dispatch(request, *args, **kwargs), generation)
+
+    @staticmethod
+    def _get_cached_response(request, cached):
+        return get_conditional_response(
+            request,
+            etag=cached.get('ETag'),
+            last_modified=parse_http_date_safe(cached.get('Last-Modified')),
+            response=cached,
+        )
+
+    def _cache_response(self, request, response, generation):
+        """
+        Stores the page once rendered, unless objects it depends on changed
+        after `generation` was read, before the view queried the database.
+        """
+        if response.status_code == 200 and hasattr(response, 'add_post_render_callback'):
+            response.add_post_render_callback(
+                lambda rendered: page_cache.set_page(
+                    request, rendered, self.get_cache_dependencies(), generation, self.get_cache_expiry()
+                )
+            )
+        return response
+
+    def get_cache_dependencies(self) -> list[str]:
+        return []
+
+    def get_cache_expiry(self):
+        return None
+
+
+class ConditionalGetMixin:
+    """
+    Answers `If-None-Match` and `If-Modified-Since` requests with 304
+    before the template is rendered.
+
+    Views return objects displayed on the page from `get_conditional_queryset()`
+    and relations displayed with them in `conditional_related`.
+    Works with both sync and async views.
+    """
+    conditional_related = ()
+    conditional_last_modified = False
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self._dispatch_conditional_async(request, *args, **kwargs)
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+
+        fingerprint, modified = get_fingerprint(
+            self.get_conditional_queryset(), self.conditional_related
+        )
+        etag, last_modified = self._get_validators(request, fingerprint, modified)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        return self._set_validators(super().dispatch(request, *args, **kwargs), etag, last_modified)
+
+    async def _dispatch_conditional_async(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await super().dispatch(request, *args, **kwargs)
+
+        fingerprint, modified = await aget_fingerprint(
+            self.get_conditional_queryset(), self.conditional_related
+        )
+        etag, last_modified = self._get_validators(request, fingerprint, modified)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        return self._set_validators(await super().dispatch(request, *args, **kwargs), etag, last_modified)
+
+    def _get_validators(self, request, fingerprint: str, modified):
+        return get_etag(request, fingerprint), modified if self.conditional_last_modified else None
+
+    @staticmethod
+    def _set_validators(response, etag: str, last_modified):
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+    def get_conditional_queryset(self):
+        raise NotImplementedError('get_conditional_queryset() must be implemented.')
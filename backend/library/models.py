@@ -1,35 +1,125 @@
+from concurrent.futures import Future
+
 from django.contrib import admin
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.db import models
 from django.utils import timezone
-from django.utils.text import slugify
+from django.utils.functional import cached_property
+
+from core import passwords
 
-from .managers import CustomArticleManager, CustomAuthorManager
+from . import avatars, rendering, search
+from .managers import ArticleQuerySet, CustomArticleManager, CustomAuthorManager
+from .slugs import UniqueSlugMixin
 
 
-class Article(models.Model):
+class Article(UniqueSlugMixin, models.Model):
     title = models.CharField(max_length=250, unique=True)
     slug = models.SlugField(max_length=250, unique=True, blank=True)
     author = models.ForeignKey('Author', on_delete=models.CASCADE)
     tags = models.ManyToManyField('Tag')
     pub_date = models.DateTimeField(default=timezone.now)
     content = models.TextField()
+    content_html = models.TextField(blank=True, editable=False)
+    content_html_version = models.PositiveSmallIntegerField(default=0, editable=False)
+    excerpt = models.TextField(blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    is_verified = models.BooleanField(default=False, editable=False)
+    modified = models.DateTimeField(auto_now=True, db_index=True)
 
-    objects = models.Manager()
+    objects = ArticleQuerySet.as_manager()
     verified_objects = CustomArticleManager()
 
+    slug_source = 'title'
+
     class Meta:
         ordering = ['-pub_date']
         default_related_name = 'articles'
+        indexes = [
+            # Partial, SQLite compiles `is_verified=True` to a bare column it cannot seek.
+            models.Index(
+                fields=['-pub_date', '-id'], condition=models.Q(is_verified=True),
+                name='article_verified_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'content' in field_names:
+            instance._rendered_content = instance.content
+            if 'title' in field_names:
+                instance._indexed_text = (instance.title, instance.content)
+        return instance
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.title)
+        self.is_verified = self.check_verified()
+        rendered = self.render_content()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = {*update_fields, 'is_verified', 'modified'}
+            if rendered:
+                update_fields |= {'content_html', 'content_html_version', 'excerpt', 'word_count'}
+            kwargs['update_fields'] = update_fields
         super().save(*args, **kwargs)
+
+    def render_content(self) -> bool:
+        """
+        Renders content into `content_html`, `excerpt` and `word_count` unless
+        they were rendered from the same content by the current renderer.
+        Returns whether it did.
+        """
+        if 'content' in self.get_deferred_fields():
+            return False
+        if (
+            self.content_html_version == rendering.RENDERER_VERSION
+            and getattr(self, '_rendered_content', None) == self.content
+        ):
+            return False
+        self.content_html, self.excerpt, self.word_count = rendering.render_article(self.content)
+        self.content_html_version = rendering.RENDERER_VERSION
+        self._rendered_content = self.content
+        return True
+
+    def check_verified(self) -> bool:
+        """
+        Returns whether an article has a title, content, author and at least one tag.
+        Articles that are not saved yet have no tags, so they are never verified.
+        """
+        return bool(
+            self.title and self.content and self.author_id
+            and self.pk and self.tags.exists()
+        )
     
+    def get_related_articles(self, limit: int = 5) -> models.QuerySet:
+        """
+        Returns published articles sharing most weighted tags with the article,
+        read from the related articles index, best matches first.
+        """
+        return Article.verified_objects.summaries().filter(
+            related_by__article=self
+        ).order_by('-related_by__score', '-related_by__related_id')[:limit]
+
+    @cached_property
+    def related_articles(self) -> list:
+        """
+        Returns related articles displayed with the article. Async views
+        assign the list fetched with the async ORM beforehand.
+        """
+        return list(self.get_related_articles())
+
+    def get_similar_articles(self, limit: int = 10) -> models.QuerySet:
+        """
+        Returns published articles with the most similar content,
+        read from the similar articles index, best matches first.
+        """
+        return Article.verified_objects.summaries().filter(
+            similar_by__article=self
+        ).order_by('-similar_by__score', '-similar_by__similar_id')[:limit]
+
     @admin.display(description='tags')
     def tags_as_str(self) -> str:
         """
@@ -38,28 +128,28 @@ class Article(models.Model):
         return ', '.join(tag.name for tag in self.tags.all())
     
 
-class Author(AbstractBaseUser, PermissionsMixin):
+class Author(UniqueSlugMixin, AbstractBaseUser, PermissionsMixin):
     DEFAULT_AVATAR = 'static/library/author/default/default_avatar.png'
 
-    def create_avatar_path(instance, filename):
-        """
-        Creates a path where Author avatar will be uploaded.
-        """
-        return f'static/library/author/{instance.user_name}/{filename}'
-
     user_name = models.CharField(max_length=250, unique=True)
     slug = models.SlugField(max_length=250, unique=True, blank=True)
     email = models.EmailField(max_length=250, unique=True)
-    avatar = models.ImageField(default=DEFAULT_AVATAR, upload_to=create_avatar_path)
+    avatar = models.ImageField(
+        default=DEFAULT_AVATAR, upload_to=avatars.AVATAR_DIRECTORY, storage=avatars.avatar_storage, max_length=255
+    )
+    avatar_variants = models.JSONField(default=dict, blank=True, editable=False)
     joined = models.DateTimeField(default=timezone.now)
     is_staff = models.BooleanField(default=False)
     is_active = models.BooleanField(default=False)
+    modified = models.DateTimeField(auto_now=True, db_index=True)
 
     objects = CustomAuthorManager()
     
     USERNAME_FIELD = 'user_name'
     REQUIRED_FIELDS = ['email']
 
+    slug_source = 'user_name'
+
     class Meta:
         ordering = ['user_name']
 
@@ -67,14 +157,60 @@ class Author(AbstractBaseUser, PermissionsMixin):
         return self.user_name
     
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.user_name)
+        if self.avatar and not self.avatar._committed:
+            # A new upload, saved together with the author.
+            name = self.avatar.field.generate_filename(self, self.avatar.name)
+            self.avatar_variants = avatars.create_variants(self.avatar, name)
         super().save(*args, **kwargs)
 
+    @property
+    def avatar_urls(self) -> dict[str, str]:
+        """
+        Returns URLs of resized avatars by variant name.
+        The original avatar stands in for variants not generated yet.
+        """
+        variants = self.avatar_variants
+        if not variants and self.avatar.name == self.DEFAULT_AVATAR:
+            variants = avatars.get_variant_names(self.DEFAULT_AVATAR)
+        return {
+            variant: self.avatar.storage.url(variants[variant]) if variant in variants else self.avatar.url
+            for variant in avatars.AVATAR_VARIANTS
+        }
+
+    def set_password(self, raw_password):
+        self.password = passwords.make_password(raw_password)
+        self._password = raw_password
 
-class Tag(models.Model):
+    def check_password(self, raw_password):
+        """
+        Verifies the password in the hashing pool. An outdated hash is
+        upgraded in the background, `password_upgrade` resolves to True
+        once the new hash is stored, see `UserLoginView`.
+        """
+        encoded = self.password
+        self.password_upgrade = upgrade = Future()
+
+        def rehash(new_encoded):
+            stored = False
+            try:
+                # Skipped when the password was changed in the meantime.
+                stored = self.pk is None or type(self)._default_manager.filter(
+                    pk=self.pk, password=encoded
+                ).update(password=new_encoded) > 0
+                if stored:
+                    self.password = new_encoded
+            finally:
+                upgrade.set_result(stored)
+
+        return passwords.check_password(raw_password, encoded, rehash)
+
+
+class Tag(UniqueSlugMixin, models.Model):
     name = models.CharField(max_length=250, unique=True)
     slug = models.SlugField(max_length=250, unique=True, blank=True)
+    modified = models.DateTimeField(auto_now=True, db_index=True)
+
+    slug_source = 'name'
 
     class Meta:
         ordering = ['name']
@@ -82,7 +218,106 @@ class Tag(models.Model):
     def __str__(self):
         return self.name
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+
+class RelatedArticle(models.Model):
+    """
+    An entry of the related articles index, maintained by `library.related`.
+    `related` is one of the articles sharing most weighted tags with `article`.
+    """
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='related_entries')
+    related = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='related_by')
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['article', 'related'], name='related_article_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.article_id} -> {self.related_id} ({self.score})'
+
+
+class Term(models.Model):
+    """
+    A word of article titles and contents with the number of articles
+    containing it, which sets its inverse document frequency.
+    """
+    name = models.CharField(max_length=64, unique=True)
+    articles = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return self.name
+
+
+class ArticleTerm(models.Model):
+    """
+    A component of the TF-IDF vector of an article, maintained by
+    `library.similarity`. Rows of a term form its posting list.
+    """
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='terms')
+    term = models.CharField(max_length=64)
+    weight = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['article', 'term'], name='article_term_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['term', 'article'], name='article_term_posting_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.article_id}: {self.term} ({self.weight})'
+
+
+class SimilarArticle(models.Model):
+    """
+    An entry of the similar articles index, maintained by `library.similarity`.
+    `similar` is one of the articles whose content is closest to `article`.
+    """
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='similar_entries')
+    similar = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='similar_by')
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['article', 'similar'], name='similar_article_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.article_id} -> {self.similar_id} ({self.score})'
+
+
+class ArticleSearchIndex(models.Model):
+    """
+    A row of the FTS5 table of `library.search`, joined to its article
+    by the primary key. The table is created by `search.create_search_index()`
+    instead of migrations and kept in sync by triggers.
+    """
+    article = models.OneToOneField(
+        Article, on_delete=models.DO_NOTHING, primary_key=True,
+        db_column='rowid', db_constraint=False, related_name='search_index',
+    )
+    document = search.DocumentField(db_column=search.FTS_TABLE)
+
+    class Meta:
+        managed = False
+        db_table = search.FTS_TABLE
+
+
+class Tombstone(models.Model):
+    """
+    A record of a deleted article, author or tag, so that exports
+    limited with `since` can report the deletion.
+    """
+    model = models.CharField(max_length=16)
+    slug = models.SlugField(max_length=250)
+    deleted = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'deleted'], name='tombstone_model_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.model}: {self.slug}'
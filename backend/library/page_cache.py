@@ -0,0 +1,158 @@
+"""
+Cache of rendered pages for anonymous visitors.
+
+Every cached page records tokens of the objects it depends on, e.g.
+`article:1` or `tag-articles:3`. Signal handlers replace the token of a
+changed object, which makes every page depending on it stale, so pages
+are invalidated precisely instead of expiring after a fixed time.
+
+Tokens are values of a shared generation counter. Views read the counter
+before they query the database and pages whose tokens were replaced
+since, while they were rendered, are not stored.
+
+Entries hold the page compressed with every encoding next to the page
+itself, so hits are served compressed without compressing them again.
+
+Pages are only cached in a cache all processes share, see `core.caches`,
+otherwise other processes would keep serving pages a change made stale.
+"""
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+
+from core import compression
+from core.caches import is_shared
+
+PAGE_PREFIX = 'page:'
+TOKEN_PREFIX = 'page-dependency:'
+GENERATION_KEY = 'page-generation'
+CACHED_HEADERS = ('ETag', 'Last-Modified')
+
+
+def get_cache():
+    return caches[getattr(settings, 'PAGE_CACHE_ALIAS', 'default')]
+
+
+def is_enabled() -> bool:
+    return is_shared(get_cache())
+
+
+def get_timeout() -> int:
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def get_page_key(request) -> str:
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'{PAGE_PREFIX}{path}'
+
+
+def get_generation() -> int | None:
+    """
+    Returns the current generation of tokens, read before a page is
+    rendered and passed to `set_page()`, or None when caching is disabled.
+    """
+    if not is_enabled():
+        return None
+    cache = get_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Starting from the time keeps new tokens above tokens issued before an eviction.
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def get_page(request) -> HttpResponse | None:
+    """
+    Returns a cached response for the request, or None when
+    there is no entry or any of its dependencies has changed.
+    The response is compressed when the client accepts a stored variant.
+    """
+    if not is_enabled():
+        return None
+    cache = get_cache()
+    entry = cache.get(get_page_key(request))
+    if entry is None:
+        return None
+    tokens = cache.get_many([f'{TOKEN_PREFIX}{dependency}' for dependency in entry['tokens']])
+    for dependency, token in entry['tokens'].items():
+        if tokens.get(f'{TOKEN_PREFIX}{dependency}') != token:
+            return None
+    variants = entry.get('variants', {})
+    encoding = compression.get_encoding(request)
+    content = variants.get(encoding, entry['content'])
+    response = HttpResponse(content, content_type=entry['content_type'])
+    for header, value in entry['headers'].items():
+        response[header] = value
+    if variants:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    if encoding in variants:
+        response['Content-Encoding'] = encoding
+        compression.weaken_etag(response)
+    return response
+
+
+def set_page(request, response, dependencies: list[str], generation: int | None, expires=None):
+    """
+    Stores the rendered response together with current tokens of its
+    dependencies, unless any of them was replaced after `generation`
+    was read. When `expires` is given, the entry is removed at that time.
+    """
+    if generation is None or not is_enabled():
+        return
+    cache = get_cache()
+    keys = [f'{TOKEN_PREFIX}{dependency}' for dependency in dependencies]
+    tokens = cache.get_many(keys)
+    for key in keys:
+        if key not in tokens:
+            cache.add(key, generation, timeout=None)
+    tokens = cache.get_many(keys)
+    if any(tokens.get(key, generation + 1) > generation for key in keys):
+        # Changed while the page was rendered, it may show old data.
+        return
+
+    timeout = get_timeout()
+    if expires is not None:
+        timeout = min(timeout, max(1, math.ceil((expires - timezone.now()).total_seconds())))
+    cache.set(
+        get_page_key(request),
+        {
+            'content': response.content,
+            'variants': compression.compress_variants(response.content, response['Content-Type']),
+            'content_type': response['Content-Type'],
+            'headers': {
+                header: response[header] for header in CACHED_HEADERS if response.has_header(header)
+            },
+            'tokens': {dependency: tokens.get(f'{TOKEN_PREFIX}{dependency}') for dependency in dependencies},
+        },
+        timeout=timeout,
+    )
+
+
+def invalidate(*dependencies: str):
+    """
+    Makes pages depending on any of the given objects stale.
+    Runs again after commit, so that a page rendered from data
+    that was not committed yet is not kept in the cache.
+    """
+    if not dependencies or not is_enabled():
+        return
+
+    def replace_tokens():
+        cache = get_cache()
+        try:
+            token = cache.incr(GENERATION_KEY)
+        except ValueError:
+            cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+            token = cache.incr(GENERATION_KEY)
+        cache.set_many({f'{TOKEN_PREFIX}{dependency}': token for dependency in dependencies}, timeout=None)
+
+    replace_tokens()
+    transaction.on_commit(replace_tokens)
@@ -0,0 +1,266 @@
+"""
+Index of related articles, scored by weighted tag overlap.
+
+Two articles score the sum of weights of the tags they share. A tag
+weighs 1 / log2(1 + number of its articles), so sharing a rare tag counts
+more than sharing a popular one. Every article keeps its `INDEX_SIZE` best
+matches in `RelatedArticle` rows, so pages read them with one indexed
+query instead of joining the tags of every other article.
+
+New articles are added in bulk by `add()`. When tags of an article
+change, its matches are computed again and the lists of articles sharing
+its old or new tags are patched with its new score. Only lists the article
+drops out of, or falls in while full, are computed again. Weights of
+unchanged tags drift as tags gain articles, `rebuild()` recomputes
+the whole index with current weights.
+"""
+import heapq
+import math
+from collections import defaultdict
+from collections.abc import Iterable
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from . import page_cache
+from .models import Article, RelatedArticle
+
+INDEX_SIZE = 10
+# Scores are rounded, so both directions of a pair compare equal.
+SCORE_DIGITS = 9
+
+ArticleTag = Article.tags.through
+
+
+def get_weight(articles: int) -> float:
+    return 1 / math.log2(1 + articles)
+
+
+def get_scores(article_id: int) -> dict[int, float]:
+    """
+    Returns scores of all articles sharing a tag with the article by their ids.
+    """
+    tag_ids = ArticleTag.objects.filter(article_id=article_id).values('tag_id')
+    weights = {
+        tag_id: get_weight(count)
+        for tag_id, count in ArticleTag.objects.filter(tag_id__in=tag_ids).values_list(
+            'tag_id'
+        ).annotate(count=models.Count('article_id')).order_by()
+    }
+    shared = defaultdict(list)
+    for other_id, tag_id in ArticleTag.objects.filter(tag_id__in=tag_ids).exclude(
+        article_id=article_id
+    ).values_list('article_id', 'tag_id'):
+        shared[other_id].append(tag_id)
+    return {
+        other_id: round(sum(weights[tag_id] for tag_id in sorted(tags)), SCORE_DIGITS)
+        for other_id, tags in shared.items()
+    }
+
+
+def get_best(scores: dict[int, float]) -> list[tuple[int, float]]:
+    """
+    Returns `INDEX_SIZE` best matches, newer articles first on equal scores.
+    """
+    return heapq.nlargest(INDEX_SIZE, scores.items(), key=lambda item: (item[1], item[0]))
+
+
+def update(article_ids: Iterable[int]):
+    """
+    Updates the index after tags of the given articles changed. Articles whose
+    lists changed get a new `modified` time and their pages are invalidated.
+    """
+    changed = set()
+    with transaction.atomic():
+        for article_id in dict.fromkeys(article_ids):
+            changed |= _update_article(article_id)
+        if changed:
+            Article.objects.filter(pk__in=changed).update(modified=timezone.now())
+    page_cache.invalidate(*(f'article:{article_id}' for article_id in changed))
+
+
+def add(article_ids: Iterable[int]):
+    """
+    Adds new articles to the index in a constant number of queries,
+    e.g. after an import. Their tags are read once, so the lists of new
+    articles and of articles sharing their tags are computed in memory.
+    """
+    article_ids = set(article_ids)
+    if not article_ids:
+        return
+    tag_ids = ArticleTag.objects.filter(article_id__in=article_ids).values('tag_id')
+    tags_of = defaultdict(list)
+    articles_of = defaultdict(list)
+    for article_id, tag_id in ArticleTag.objects.filter(tag_id__in=tag_ids).values_list('article_id', 'tag_id'):
+        tags_of[article_id].append(tag_id)
+        articles_of[tag_id].append(article_id)
+    weights = {tag_id: get_weight(len(articles)) for tag_id, articles in articles_of.items()}
+
+    candidates = defaultdict(dict)
+    created = []
+    for article_id in article_ids & tags_of.keys():
+        scores = _score(article_id, tags_of, articles_of, weights)
+        created.extend(
+            RelatedArticle(article_id=article_id, related_id=other_id, score=score)
+            for other_id, score in get_best(scores)
+        )
+        for other_id, score in scores.items():
+            if other_id not in article_ids:
+                candidates[other_id][article_id] = score
+
+    entries = defaultdict(dict)
+    for pk, article_id, related_id, score in RelatedArticle.objects.filter(
+        article_id__in=ArticleTag.objects.filter(tag_id__in=tag_ids).values('article_id')
+    ).values_list('pk', 'article_id', 'related_id', 'score'):
+        entries[article_id][related_id] = (pk, score)
+
+    deleted = []
+    for other_id, scores in candidates.items():
+        listed = entries[other_id]
+        best = get_best({**{related_id: score for related_id, (_, score) in listed.items()}, **scores})
+        best_ids = {related_id for related_id, _ in best}
+        deleted.extend(pk for related_id, (pk, _) in listed.items() if related_id not in best_ids)
+        created.extend(
+            RelatedArticle(article_id=other_id, related_id=related_id, score=score)
+            for related_id, score in best
+            if related_id in scores
+        )
+
+    changed = {entry.article_id for entry in created} - article_ids
+    # Imports call it within their own transaction, a savepoint would cost two more queries.
+    with transaction.atomic(savepoint=False):
+        if deleted:
+            RelatedArticle.objects.filter(pk__in=deleted).delete()
+        RelatedArticle.objects.bulk_create(created, batch_size=1000)
+        if changed:
+            Article.objects.filter(pk__in=changed).update(modified=timezone.now())
+    page_cache.invalidate(*(f'article:{article_id}' for article_id in changed))
+
+
+def refresh(article_ids: Iterable[int]):
+    """
+    Computes lists of the given articles again, e.g. after
+    an article they listed was deleted.
+    """
+    article_ids = set(article_ids)
+    if not article_ids:
+        return
+    with transaction.atomic():
+        for article_id in article_ids:
+            _store(article_id, get_best(get_scores(article_id)))
+        Article.objects.filter(pk__in=article_ids).update(modified=timezone.now())
+    page_cache.invalidate(*(f'article:{article_id}' for article_id in article_ids))
+
+
+def rebuild() -> int:
+    """
+    Recomputes the whole index with current tag weights in memory,
+    returns the number of stored entries.
+    """
+    tags_of = defaultdict(list)
+    articles_of = defaultdict(list)
+    for article_id, tag_id in ArticleTag.objects.values_list('article_id', 'tag_id').iterator():
+        tags_of[article_id].append(tag_id)
+        articles_of[tag_id].append(article_id)
+    weights = {tag_id: get_weight(len(articles)) for tag_id, articles in articles_of.items()}
+
+    entries = []
+    for article_id in tags_of:
+        scores = _score(article_id, tags_of, articles_of, weights)
+        entries.extend(
+            RelatedArticle(article_id=article_id, related_id=other_id, score=score)
+            for other_id, score in get_best(scores)
+        )
+
+    with transaction.atomic():
+        RelatedArticle.objects.all().delete()
+        RelatedArticle.objects.bulk_create(entries, batch_size=1000)
+    page_cache.invalidate('articles', *(f'article:{article_id}' for article_id in tags_of))
+    return len(entries)
+
+
+def _score(article_id: int, tags_of: dict, articles_of: dict, weights: dict) -> dict[int, float]:
+    """
+    Returns scores like `get_scores()` from tags and articles loaded in memory.
+    """
+    scores = defaultdict(float)
+    for tag_id in sorted(tags_of[article_id]):
+        for other_id in articles_of[tag_id]:
+            if other_id != article_id:
+                scores[other_id] += weights[tag_id]
+    return {other_id: round(score, SCORE_DIGITS) for other_id, score in scores.items()}
+
+
+def _update_article(article_id: int) -> set[int]:
+    """
+    Updates the list of the article and lists of articles sharing
+    its old or new tags, returns ids of articles whose lists changed.
+    """
+    scores = get_scores(article_id)
+    changed = {article_id} if _store(article_id, get_best(scores)) else set()
+
+    listing = dict(RelatedArticle.objects.filter(related_id=article_id).values_list('article_id', 'score'))
+    stats = {
+        other_id: (count, lowest)
+        for other_id, count, lowest in RelatedArticle.objects.filter(
+            article_id__in=ArticleTag.objects.filter(
+                tag_id__in=ArticleTag.objects.filter(article_id=article_id).values('tag_id')
+            ).values('article_id')
+        ).values_list('article_id').annotate(count=models.Count('pk'), lowest=models.Min('score')).order_by()
+    }
+
+    recompute = set()
+    for other_id, old_score in listing.items():
+        score = scores.get(other_id)
+        if score is None or (score < old_score and stats.get(other_id, (0,))[0] >= INDEX_SIZE):
+            # A better match that is not listed may take its place.
+            recompute.add(other_id)
+        elif score != old_score:
+            RelatedArticle.objects.filter(article_id=other_id, related_id=article_id).update(score=score)
+            changed.add(other_id)
+
+    created = []
+    deleted = []
+    for other_id, score in scores.items():
+        if other_id in listing:
+            continue
+        count, lowest = stats.get(other_id, (0, None))
+        if count >= INDEX_SIZE:
+            if score < lowest:
+                continue
+            lowest_pk, lowest_related_id = _get_lowest(other_id)
+            if (score, article_id) < (lowest, lowest_related_id):
+                continue
+            deleted.append(lowest_pk)
+        created.append(RelatedArticle(article_id=other_id, related_id=article_id, score=score))
+        changed.add(other_id)
+    RelatedArticle.objects.filter(pk__in=deleted).delete()
+    RelatedArticle.objects.bulk_create(created)
+
+    for other_id in recompute:
+        if _store(other_id, get_best(get_scores(other_id))):
+            changed.add(other_id)
+    return changed
+
+
+def _get_lowest(article_id: int) -> tuple[int, int]:
+    """
+    Returns the primary key and the related article id of the worst entry of the article.
+    """
+    return RelatedArticle.objects.filter(article_id=article_id).order_by(
+        'score', 'related_id'
+    ).values_list('pk', 'related_id')[0]
+
+
+def _store(article_id: int, best: list[tuple[int, float]]) -> bool:
+    """
+    Replaces entries of the article when they differ, returns whether they did.
+    """
+    current = set(RelatedArticle.objects.filter(article_id=article_id).values_list('related_id', 'score'))
+    if current == set(best):
+        return False
+    RelatedArticle.objects.filter(article_id=article_id).delete()
+    RelatedArticle.objects.bulk_create(
+        RelatedArticle(article_id=article_id, related_id=other_id, score=score) for other_id, score in best
+    )
+    return True
@@ -0,0 +1,48 @@
+"""
+Rendering of article content from Markdown to HTML.
+
+Content is rendered once, when an article is saved, and stored together
+with `RENDERER_VERSION`, so pages serve the stored HTML. Raw HTML in the
+content is escaped and links with unsafe schemes, e.g. `javascript:`,
+are left as text, so the output is safe to include in pages.
+
+The plain text excerpt and word count shown by article lists are
+derived from the rendered HTML and stored with it as well.
+
+Increase `RENDERER_VERSION` whenever the output changes, then render
+stored content again with the `render_articles` command.
+"""
+import html
+from typing import NamedTuple
+
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+from markdown_it import MarkdownIt
+
+RENDERER_VERSION = 2
+EXCERPT_WORDS = 40
+
+_markdown = MarkdownIt('commonmark', {'html': False}).enable(['table', 'strikethrough'])
+
+
+class Rendered(NamedTuple):
+    html: str
+    excerpt: str
+    word_count: int
+
+
+def render(content: str) -> str:
+    return _markdown.render(content)
+
+
+def render_article(content: str) -> Rendered:
+    """
+    Returns the HTML of `content` along with its plain text excerpt and word count.
+    """
+    content_html = render(content)
+    text = html.unescape(strip_tags(content_html))
+    return Rendered(content_html, Truncator(text).words(EXCERPT_WORDS), len(text.split()))
+
+
+def render_many(contents: list[str]) -> list[Rendered]:
+    return [render_article(content) for content in contents]
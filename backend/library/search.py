@@ -0,0 +1,149 @@
+"""
+Full-text search over articles.
+
+On SQLite the title and content of articles are indexed in an FTS5
+external content table kept in sync by triggers on `library_article`,
+so every insert, update and delete updates the index incrementally.
+Other database backends fall back to case-insensitive substring matching.
+
+The index is joined to articles through the unmanaged `ArticleSearchIndex`
+model, so a search runs the MATCH query once and ranks matches with bm25()
+in the same scan, while results remain an ordinary query set that can be
+filtered and paginated.
+"""
+import re
+
+from django.db import connections, models
+
+FTS_TABLE = 'library_article_fts'
+
+# Matches in a title weigh more than matches in content.
+TITLE_WEIGHT = 10.0
+CONTENT_WEIGHT = 1.0
+
+CREATE_STATEMENTS = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, content,
+        content='library_article', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON library_article BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON library_article BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF title, content ON library_article BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+]
+
+
+def is_supported(using: str = 'default') -> bool:
+    """
+    Returns whether the database supports the FTS5 index.
+    """
+    return connections[using].vendor == 'sqlite'
+
+
+def create_search_index(using: str = 'default', **kwargs):
+    """
+    Creates the FTS5 table and triggers that keep it in sync.
+    Connected to `post_migrate`, safe to run repeatedly.
+    """
+    if not is_supported(using):
+        return
+    with connections[using].cursor() as cursor:
+        existed = _table_exists(cursor)
+        for statement in CREATE_STATEMENTS:
+            cursor.execute(statement)
+        if not existed:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def rebuild_search_index(using: str = 'default'):
+    """
+    Recreates the index content from the `library_article` table.
+    """
+    create_search_index(using)
+    if is_supported(using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+
+def build_match_expression(text: str) -> str:
+    """
+    Turns user input into an FTS5 query matching all of its words.
+    Every word is quoted, so FTS5 operators in the input are treated as text.
+    """
+    words = re.findall(r'\w+', text)
+    return ' '.join(f'"{word}"' for word in words)
+
+
+def search(queryset: models.QuerySet, text: str) -> models.QuerySet:
+    """
+    Filters articles matching all words of `text`, best matches first.
+    """
+    expression = build_match_expression(text)
+    if not expression:
+        return queryset.none()
+
+    if not is_supported(queryset.db):
+        condition = models.Q()
+        for word in re.findall(r'\w+', text):
+            condition &= models.Q(title__icontains=word) | models.Q(content__icontains=word)
+        return queryset.filter(condition)
+
+    return queryset.filter(search_index__document__match=expression).annotate(
+        search_rank=BM25(
+            models.F('search_index__document'), models.Value(TITLE_WEIGHT), models.Value(CONTENT_WEIGHT)
+        )
+    ).order_by('search_rank', 'pk')
+
+
+class DocumentField(models.TextField):
+    """
+    The hidden column of an FTS5 table named after the table, the left
+    operand of MATCH and the first argument of auxiliary functions.
+    """
+
+
+@DocumentField.register_lookup
+class Match(models.Lookup):
+    """
+    `document__match=query` selects rows of the FTS5 table matching the query.
+    """
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class BM25(models.Func):
+    """
+    Relevance of a row of the FTS5 table matched in the same query,
+    lower for better matches, with weights of its columns.
+    """
+    function = 'bm25'
+    output_field = models.FloatField()
+
+
+def _table_exists(cursor) -> bool:
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE]
+    )
+    return cursor.fetchone() is not None
@@ -0,0 +1,224 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import page_cache, related, similarity, tag_index
+from .models import Article, Author, RelatedArticle, SimilarArticle, Tag, Tombstone
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def refresh_verified_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keeps `Article.is_verified` and `Article.modified` up to date when tags
+    of an article change, both from the article side (`article.tags`)
+    and from the tag side (`tag.articles`).
+    """
+    if action == 'pre_clear':
+        if reverse:
+            instance._cleared_article_ids = list(instance.articles.values_list('pk', flat=True))
+        else:
+            instance._cleared_tag_ids = list(instance.tags.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        article_ids = [instance.pk]
+    elif action == 'post_clear':
+        article_ids = getattr(instance, '_cleared_article_ids', [])
+    else:
+        article_ids = pk_set or []
+    Article.objects.filter(pk__in=article_ids).refresh_verified(modified=timezone.now())
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def update_related_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Updates the related articles index for re-tagged articles.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        article_ids = [instance.pk]
+    elif action == 'post_clear':
+        article_ids = getattr(instance, '_cleared_article_ids', [])
+    else:
+        article_ids = pk_set or []
+    related.update(article_ids)
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def update_tag_index_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Applies added and removed tags of articles to the tag index.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        tag_ids = getattr(instance, '_cleared_tag_ids', []) if action == 'post_clear' else pk_set or []
+        pairs = [(instance.pk, tag_id) for tag_id in tag_ids]
+    else:
+        article_ids = getattr(instance, '_cleared_article_ids', []) if action == 'post_clear' else pk_set or []
+        pairs = [(article_id, instance.pk) for article_id in article_ids]
+    if action == 'post_add':
+        tag_index.add(pairs)
+    else:
+        tag_index.remove(pairs)
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def invalidate_pages_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Invalidates pages of re-tagged articles, their authors and tags.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        tag_ids = getattr(instance, '_cleared_tag_ids', []) if action == 'post_clear' else pk_set or []
+        page_cache.invalidate(
+            'articles',
+            f'article:{instance.pk}',
+            f'author-articles:{instance.author_id}',
+            *(f'tag-articles:{tag_id}' for tag_id in tag_ids),
+        )
+    else:
+        article_ids = getattr(instance, '_cleared_article_ids', []) if action == 'post_clear' else pk_set or []
+        author_ids = set(Article.objects.filter(pk__in=article_ids).values_list('author_id', flat=True))
+        page_cache.invalidate(
+            'articles',
+            f'tag-articles:{instance.pk}',
+            *(f'article:{article_id}' for article_id in article_ids),
+            *(f'author-articles:{author_id}' for author_id in author_ids),
+        )
+
+
+@receiver(post_save, sender=Article)
+def invalidate_pages_on_article_save(sender, instance, created, **kwargs):
+    """
+    Invalidates pages that display the article. A new article has no tags yet,
+    its tag pages are invalidated when tags are added.
+    """
+    tag_ids = [] if created else instance.tags.values_list('pk', flat=True)
+    page_cache.invalidate(
+        'articles',
+        f'article:{instance.pk}',
+        f'author-articles:{instance.author_id}',
+        *(f'tag-articles:{tag_id}' for tag_id in tag_ids),
+    )
+
+
+@receiver(post_save, sender=Article)
+def update_similarity_on_article_save(sender, instance, update_fields, **kwargs):
+    """
+    Indexes created articles and articles whose title or content changed
+    since they were loaded, after the transaction commits.
+    """
+    if update_fields is not None and not {'title', 'content'} & set(update_fields):
+        return
+    indexed_text = getattr(instance, '_indexed_text', None)
+    if indexed_text is not None and indexed_text == (instance.title, instance.content):
+        return
+    if not {'title', 'content'} & instance.get_deferred_fields():
+        instance._indexed_text = (instance.title, instance.content)
+    similarity.schedule([instance.pk])
+
+
+@receiver(pre_delete, sender=Article)
+def remember_article_tags(sender, instance, **kwargs):
+    instance._deleted_tag_ids = list(instance.tags.values_list('pk', flat=True))
+    instance._listing_article_ids = list(
+        RelatedArticle.objects.filter(related=instance).values_list('article_id', flat=True)
+    )
+    instance._similar_listing_ids = list(
+        SimilarArticle.objects.filter(similar=instance).values_list('article_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Article)
+def invalidate_pages_on_article_delete(sender, instance, **kwargs):
+    page_cache.invalidate(
+        'articles',
+        f'article:{instance.pk}',
+        f'author-articles:{instance.author_id}',
+        *(f'tag-articles:{tag_id}' for tag_id in getattr(instance, '_deleted_tag_ids', [])),
+    )
+
+
+@receiver(post_delete, sender=Article)
+def refresh_related_on_article_delete(sender, instance, **kwargs):
+    """
+    Fills lists of related and similar articles that showed the deleted
+    article and removes it from the tag index.
+    """
+    related.refresh(getattr(instance, '_listing_article_ids', []))
+    similarity.refresh(getattr(instance, '_similar_listing_ids', []))
+    tag_index.remove_article(instance.pk)
+
+
+@receiver(post_delete, sender=Article)
+@receiver(post_delete, sender=Author)
+@receiver(post_delete, sender=Tag)
+def record_tombstone(sender, instance, **kwargs):
+    """
+    Records the deletion for exports limited with `since`.
+    """
+    Tombstone.objects.create(model=sender._meta.model_name, slug=instance.slug)
+
+
+@receiver(post_save, sender=Author)
+def invalidate_pages_on_author_save(sender, instance, update_fields, **kwargs):
+    """
+    Invalidates pages that display the author,
+    except when only the last login time was updated.
+    """
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    page_cache.invalidate(f'author:{instance.pk}')
+
+
+@receiver(post_delete, sender=Author)
+def invalidate_pages_on_author_delete(sender, instance, **kwargs):
+    page_cache.invalidate(f'author:{instance.pk}', f'author-articles:{instance.pk}')
+
+
+@receiver(post_save, sender=Tag)
+def invalidate_pages_on_tag_save(sender, instance, **kwargs):
+    page_cache.invalidate(f'tag:{instance.pk}')
+
+
+@receiver(post_save, sender=Tag)
+def update_tag_index_on_tag_save(sender, instance, **kwargs):
+    tag_index.set_slug(instance.pk, instance.slug)
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_tag_articles(sender, instance, **kwargs):
+    """
+    Remembers articles of a tag that is about to be deleted, because
+    through table rows are removed without sending `m2m_changed`.
+    """
+    instance._deleted_articles = list(instance.articles.values_list('pk', 'author_id'))
+
+
+@receiver(post_delete, sender=Tag)
+def refresh_verified_on_tag_delete(sender, instance, **kwargs):
+    """
+    Rechecks articles that could lose their last tag, updates their related
+    articles and the tag index and invalidates pages that displayed the tag.
+    """
+    articles = getattr(instance, '_deleted_articles', [])
+    Article.objects.filter(
+        pk__in=[article_id for article_id, _ in articles]
+    ).refresh_verified(modified=timezone.now())
+    related.update(article_id for article_id, _ in articles)
+    tag_index.remove_tag(instance.pk)
+    page_cache.invalidate(
+        'articles',
+        f'tag:{instance.pk}',
+        f'tag-articles:{instance.pk}',
+        *(f'article:{article_id}' for article_id, _ in articles),
+        *{f'author-articles:{author_id}' for _, author_id in articles},
+    )
@@ -0,0 +1,361 @@
+"""
+Index of articles with similar content, compared as TF-IDF vectors.
+
+Titles and contents are split into lowercase words, leaving out common
+English words, and title words count `TITLE_WEIGHT` times. A term weighs
+(1 + log tf) * idf, with idf = 1 + log((1 + articles) / (1 + articles
+with the term)), and every article keeps its `MAX_TERMS` heaviest terms,
+normalized to unit length. Similarity of two articles is the dot product
+of their vectors, the cosine of the pruned vectors.
+
+Vectors are stored as `ArticleTerm` rows, which double as an inverted
+index: scoring an article reads posting lists of its terms in one query
+and accumulates dot products with all candidates in a single pass, a
+sparse matrix-vector product. Terms in more than `MAX_POSTINGS` articles
+add little and are not read. Every article keeps its `INDEX_SIZE` best
+matches in `SimilarArticle` rows, so they are read with one indexed query.
+
+Saved articles are indexed again and the lists of their best candidates
+are patched, lists they drop out of are computed again. `schedule()`
+defers this until the saving transaction commits, so it holds no locks of
+the transaction and articles saved together are indexed in one batch.
+Document frequencies in `Term` rows are counted when an article is indexed
+for the first time, edits and deletions let them drift, `rebuild()` counts
+them again and recomputes the whole index.
+"""
+import heapq
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+
+from django.db import models, transaction
+
+from .models import Article, ArticleTerm, SimilarArticle, Term
+
+INDEX_SIZE = 10
+MAX_TERMS = 32
+MAX_POSTINGS = 10_000
+# Number of best candidates of an indexed article whose lists are patched.
+CANDIDATES = 1000
+TITLE_WEIGHT = 3
+# Number of ids or terms per query, below the limit of SQLite query parameters.
+QUERY_BATCH_SIZE = 900
+# Weights and scores are rounded, so both directions of a pair compare equal.
+SCORE_DIGITS = 9
+
+WORD_RE = re.compile(r'[^\W\d_]{3,64}')
+STOP_WORDS = frozenset('''
+    about above after again against all also and any are because been before being below between both but
+    can could did does doing down during each few for from further had has have having her here hers him
+    his how http https into its itself just more most not now off once only other our ours out over own
+    same she should some such than that the their theirs them then there these they this those through
+    too under until very was were what when where which while who whom why will with would www you your
+'''.split())
+
+# Ids of articles to index after commit, by thread.
+_pending = threading.local()
+
+
+def get_terms(title: str, content: str) -> Counter:
+    """
+    Returns counts of terms of an article, title words counting more.
+    """
+    counts = Counter(_words(content))
+    for word in _words(title):
+        counts[word] += TITLE_WEIGHT
+    return counts
+
+
+def get_vector(counts: Counter, frequencies: dict[str, int], articles: int) -> dict[str, float]:
+    """
+    Returns the `MAX_TERMS` heaviest TF-IDF weights of the term counts,
+    normalized to unit length.
+    """
+    weights = {
+        term: (1 + math.log(count)) * (1 + math.log((1 + articles) / (1 + frequencies.get(term, 0))))
+        for term, count in counts.items()
+    }
+    if not weights:
+        return {}
+    norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+    top = heapq.nlargest(MAX_TERMS, weights.items(), key=lambda item: (item[1], item[0]))
+    return {term: round(weight / norm, SCORE_DIGITS) for term, weight in top}
+
+
+def get_best(scores: dict[int, float]) -> list[tuple[int, float]]:
+    """
+    Returns `INDEX_SIZE` best matches, newer articles first on equal scores.
+    """
+    return heapq.nlargest(INDEX_SIZE, scores.items(), key=lambda item: (item[1], item[0]))
+
+
+def schedule(article_ids: Iterable[int]):
+    """
+    Indexes the given articles with `update()` once the current transaction
+    commits, together with all other articles scheduled meanwhile.
+    """
+    article_ids = set(article_ids)
+    if not article_ids:
+        return
+    if not hasattr(_pending, 'article_ids'):
+        _pending.article_ids = set()
+    _pending.article_ids |= article_ids
+    # Callbacks of rolled back savepoints are dropped, so every call registers
+    # one, the first to run indexes all pending articles. An error is logged,
+    # the saved articles are indexed by their next save or by `rebuild()`.
+    transaction.on_commit(_update_pending, robust=True)
+
+
+def _update_pending():
+    article_ids, _pending.article_ids = getattr(_pending, 'article_ids', set()), set()
+    update(article_ids)
+
+
+def update(article_ids: Iterable[int]):
+    """
+    Indexes the given articles after they were created or their title or
+    content changed, and patches lists of articles similar to them.
+    """
+    counts = {
+        article_id: get_terms(title, content)
+        for article_id, title, content in Article.objects.filter(
+            pk__in=set(article_ids)
+        ).values_list('pk', 'title', 'content')
+    }
+    if not counts:
+        return
+    indexed = set(ArticleTerm.objects.filter(article_id__in=counts).values_list('article_id', flat=True).distinct())
+
+    # Callers within a transaction would pay two more queries for a savepoint.
+    with transaction.atomic(savepoint=False):
+        _count_terms(article_counts for article_id, article_counts in counts.items() if article_id not in indexed)
+        frequencies = _get_frequencies({term for article_counts in counts.values() for term in article_counts})
+        articles = Article.objects.count()
+        vectors = {
+            article_id: get_vector(article_counts, frequencies, articles)
+            for article_id, article_counts in counts.items()
+        }
+        if indexed:
+            ArticleTerm.objects.filter(article_id__in=indexed).delete()
+        ArticleTerm.objects.bulk_create(
+            (
+                ArticleTerm(article_id=article_id, term=term, weight=weight)
+                for article_id, vector in vectors.items()
+                for term, weight in vector.items()
+            ),
+            batch_size=1000,
+        )
+
+        scores = _score_many(vectors, frequencies)
+        if indexed:
+            SimilarArticle.objects.filter(article_id__in=indexed).delete()
+        SimilarArticle.objects.bulk_create(
+            (
+                SimilarArticle(article_id=article_id, similar_id=other_id, score=score)
+                for article_id, article_scores in scores.items()
+                for other_id, score in get_best(article_scores)
+            ),
+            batch_size=1000,
+        )
+        _patch_lists(scores)
+
+
+def refresh(article_ids: Iterable[int]):
+    """
+    Computes lists of the given articles again from their stored vectors,
+    e.g. after an article they listed was deleted.
+    """
+    article_ids = set(article_ids)
+    if not article_ids:
+        return
+    with transaction.atomic():
+        for article_id in article_ids:
+            _store(article_id, get_best(get_scores(article_id)))
+
+
+def get_scores(article_id: int) -> dict[int, float]:
+    """
+    Returns similarity of the article with all articles sharing a term of
+    its stored vector by their ids.
+    """
+    vector = dict(ArticleTerm.objects.filter(article_id=article_id).values_list('term', 'weight'))
+    return _score_many({article_id: vector}, _get_frequencies(vector))[article_id]
+
+
+def rebuild() -> tuple[int, int]:
+    """
+    Counts document frequencies again and recomputes all vectors and lists
+    in memory, returns the number of indexed articles and of stored entries.
+    """
+    frequencies = Counter()
+    for title, content in Article.objects.values_list('title', 'content').iterator():
+        frequencies.update(get_terms(title, content).keys())
+    articles = Article.objects.count()
+
+    vectors = {}
+    postings = defaultdict(list)
+    for article_id, title, content in Article.objects.order_by('pk').values_list('pk', 'title', 'content').iterator():
+        vectors[article_id] = get_vector(get_terms(title, content), frequencies, articles)
+        for term, weight in vectors[article_id].items():
+            postings[term].append((article_id, weight))
+
+    entries = []
+    for article_id, vector in vectors.items():
+        scores = defaultdict(float)
+        for term in sorted(vector):
+            if frequencies[term] > MAX_POSTINGS:
+                continue
+            for other_id, weight in postings[term]:
+                if other_id != article_id:
+                    scores[other_id] += vector[term] * weight
+        entries.extend(
+            SimilarArticle(article_id=article_id, similar_id=other_id, score=score)
+            for other_id, score in get_best(_round(scores))
+        )
+
+    with transaction.atomic():
+        Term.objects.all().delete()
+        ArticleTerm.objects.all().delete()
+        SimilarArticle.objects.all().delete()
+        Term.objects.bulk_create(
+            (Term(name=term, articles=count) for term, count in frequencies.items()), batch_size=1000
+        )
+        ArticleTerm.objects.bulk_create(
+            (
+                ArticleTerm(article_id=article_id, term=term, weight=weight)
+                for article_id, vector in vectors.items()
+                for term, weight in vector.items()
+            ),
+            batch_size=1000,
+        )
+        SimilarArticle.objects.bulk_create(entries, batch_size=1000)
+    return len(vectors), len(entries)
+
+
+def _words(text: str) -> Iterable[str]:
+    return (word for word in WORD_RE.findall(text.lower()) if word not in STOP_WORDS)
+
+
+def _round(scores: dict[int, float]) -> dict[int, float]:
+    return {other_id: round(score, SCORE_DIGITS) for other_id, score in scores.items()}
+
+
+def _batches(values: Iterable) -> list[list]:
+    values = sorted(values)
+    return [values[start:start + QUERY_BATCH_SIZE] for start in range(0, len(values), QUERY_BATCH_SIZE)]
+
+
+def _count_terms(counts: Iterable[Counter]):
+    """
+    Adds articles indexed for the first time to document frequencies of their terms.
+    """
+    added = Counter()
+    for article_counts in counts:
+        added.update(article_counts.keys())
+    if not added:
+        return
+    Term.objects.bulk_create([Term(name=term) for term in added], ignore_conflicts=True, batch_size=1000)
+    by_increment = defaultdict(list)
+    for term, increment in added.items():
+        by_increment[increment].append(term)
+    for increment, terms in by_increment.items():
+        for batch in _batches(terms):
+            Term.objects.filter(name__in=batch).update(articles=models.F('articles') + increment)
+
+
+def _get_frequencies(terms: set[str]) -> dict[str, int]:
+    return {
+        name: articles
+        for batch in _batches(terms)
+        for name, articles in Term.objects.filter(name__in=batch).values_list('name', 'articles')
+    }
+
+
+def _score_many(vectors: dict[int, dict[str, float]], frequencies: dict[str, int]) -> dict[int, dict[int, float]]:
+    """
+    Returns scores of the given vectors with all articles sharing their terms,
+    reading posting lists of all terms in one query.
+    """
+    terms = {
+        term for vector in vectors.values() for term in vector
+        if frequencies.get(term, 0) <= MAX_POSTINGS
+    }
+    postings = defaultdict(list)
+    for batch in _batches(terms):
+        for other_id, term, weight in ArticleTerm.objects.filter(term__in=batch).order_by(
+            'term', 'article_id'
+        ).values_list('article_id', 'term', 'weight'):
+            postings[term].append((other_id, weight))
+
+    scores = {}
+    for article_id, vector in vectors.items():
+        article_scores = defaultdict(float)
+        for term in sorted(vector.keys() & terms):
+            for other_id, weight in postings[term]:
+                if other_id != article_id:
+                    article_scores[other_id] += vector[term] * weight
+        scores[article_id] = _round(article_scores)
+    return scores
+
+
+def _patch_lists(scores: dict[int, dict[int, float]]):
+    """
+    Merges new scores of indexed articles into lists of their best
+    candidates. Lists in which an indexed article scores lower than
+    before, or no longer at all, are computed again.
+    """
+    candidates = defaultdict(dict)
+    for article_id, article_scores in scores.items():
+        best = heapq.nlargest(CANDIDATES, article_scores.items(), key=lambda item: (item[1], item[0]))
+        for other_id, score in best:
+            if other_id not in scores:
+                candidates[other_id][article_id] = score
+
+    # The first query reads lists showing indexed articles as well.
+    listing = models.Q(article_id__in=SimilarArticle.objects.filter(similar_id__in=scores).values('article_id'))
+    entries = defaultdict(dict)
+    for index, batch in enumerate(_batches(candidates) or [[]]):
+        condition = models.Q(article_id__in=batch) | listing if index == 0 else models.Q(article_id__in=batch)
+        for pk, other_id, similar_id, score in SimilarArticle.objects.filter(condition).exclude(
+            article_id__in=scores
+        ).values_list('pk', 'article_id', 'similar_id', 'score'):
+            entries[other_id][similar_id] = (pk, score)
+
+    recompute = set()
+    created = []
+    deleted = []
+    for other_id in candidates.keys() | entries.keys():
+        listed = entries[other_id]
+        new_scores = candidates[other_id]
+        if any(
+            similar_id in scores and new_scores.get(similar_id, 0) < score
+            for similar_id, (_, score) in listed.items()
+        ):
+            recompute.add(other_id)
+            continue
+        merged = {similar_id: score for similar_id, (_, score) in listed.items()}
+        merged.update(new_scores)
+        best = dict(get_best(merged))
+        for similar_id, (pk, score) in listed.items():
+            if best.get(similar_id) != score:
+                deleted.append(pk)
+        created.extend(
+            SimilarArticle(article_id=other_id, similar_id=similar_id, score=score)
+            for similar_id, score in best.items()
+            if listed.get(similar_id, (None, None))[1] != score
+        )
+    for batch in _batches(deleted):
+        SimilarArticle.objects.filter(pk__in=batch).delete()
+    SimilarArticle.objects.bulk_create(created, batch_size=1000)
+
+    for other_id in recompute:
+        _store(other_id, get_best(get_scores(other_id)))
+
+
+def _store(article_id: int, best: list[tuple[int, float]]):
+    SimilarArticle.objects.filter(article_id=article_id).delete()
+    SimilarArticle.objects.bulk_create(
+        SimilarArticle(article_id=article_id, similar_id=other_id, score=score) for other_id, score in best
+    )
@@ -0,0 +1,114 @@
+"""
+Allocation of unique slugs.
+
+Values are slugified and slugs already taken, in the database or earlier
+in the same batch, get the first free `-2`, `-3`, ... suffix, with the
+base truncated to make room for it at the length limit. Taken slugs of a
+whole batch are found with one indexed lookup, plus one range scan of the
+index for bases which are taken or repeated in the batch, instead of
+a query per attempt.
+
+Another writer can still take a slug between the lookup and the INSERT,
+so `UniqueSlugMixin` allocates again when saving fails on the slug.
+"""
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from functools import reduce
+from itertools import islice
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+SAVE_ATTEMPTS = 3
+# Keeps the number of OR terms within the expression depth limit of SQLite.
+RANGES_PER_QUERY = 200
+# Longest suffix whose truncated base is scanned for, i.e. `-9999999`.
+MAX_SUFFIX_LENGTH = 8
+
+
+def allocate_slugs(model, values: Iterable[str]) -> list[str]:
+    """
+    Returns unique slugs of `model` for the values, in the same order.
+    Values without letters or digits get slugs made of the model name.
+    """
+    max_length = model._meta.get_field('slug').max_length
+    bases = [slugify(value)[:max_length].strip('-') or model._meta.model_name for value in values]
+    taken = get_taken_slugs(model, Counter(bases))
+
+    slugs = []
+    for base in bases:
+        slug = base
+        number = 1
+        while slug in taken:
+            number += 1
+            suffix = f'-{number}'
+            slug = f'{base[:max_length - len(suffix)]}{suffix}'
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def assign_slugs(objects: list, source: str):
+    """
+    Sets unique slugs of objects without one from their `source` field,
+    e.g. before they are inserted with `bulk_create()`.
+    """
+    objects = [obj for obj in objects if not obj.slug]
+    if not objects:
+        return
+    slugs = allocate_slugs(type(objects[0]), [getattr(obj, source) for obj in objects])
+    for obj, slug in zip(objects, slugs):
+        obj.slug = slug
+
+
+def get_taken_slugs(model, bases: Counter[str]) -> set[str]:
+    """
+    Returns slugs equal to any of the bases or made of one and a suffix,
+    including bases truncated to fit the suffix into the slug field.
+    Bases counted once in the batch and free in the database need no suffix,
+    so numbered slugs are only looked up for the others.
+    """
+    manager = model._default_manager
+    max_length = model._meta.get_field('slug').max_length
+    taken = set(manager.filter(slug__in=bases).values_list('slug', flat=True))
+    stems = {
+        base[:max_length - length]
+        for base, count in bases.items() if count > 1 or base in taken
+        for length in range(2, MAX_SUFFIX_LENGTH + 1)
+    }
+    for chunk in _chunks(sorted(stems), RANGES_PER_QUERY):
+        # '.' follows '-', so the range holds all slugs starting with `stem-`.
+        query = reduce(or_, (Q(slug__gte=f'{stem}-', slug__lt=f'{stem}.') for stem in chunk))
+        taken.update(manager.filter(query).values_list('slug', flat=True))
+    return taken
+
+
+class UniqueSlugMixin:
+    """
+    Allocates a unique `slug` from the `slug_source` field
+    when a model without a slug is saved.
+    """
+    slug_source = None
+
+    def save(self, *args, **kwargs):
+        if self.slug:
+            return super().save(*args, **kwargs)
+
+        for attempt in range(SAVE_ATTEMPTS):
+            self.slug = allocate_slugs(type(self), [getattr(self, self.slug_source)])[0]
+            try:
+                with transaction.atomic(using=kwargs.get('using')):
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                taken = type(self)._default_manager.filter(slug=self.slug).exists()
+                if attempt == SAVE_ATTEMPTS - 1 or not taken:
+                    self.slug = ''
+                    raise
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
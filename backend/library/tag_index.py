@@ -0,0 +1,468 @@
+"""
+In-memory inverted index of articles by tag, for boolean tag filters.
+
+Every tag maps to a compressed bitmap of primary keys of its articles,
+see `Bitmap`. Filters like `python AND (django OR flask) AND NOT legacy`
+are evaluated with set operations on the bitmaps, and only primary keys
+of matched articles are sent to the database, instead of joining the
+tags table once per tag. Results larger than `MAX_IDS` are filtered with
+subqueries instead.
+
+The index of a process is loaded on first use and updated incrementally
+by signal handlers when tags of articles change, once the transaction
+commits. The handlers increment a version counter in the cache and store
+the change under the new version, other processes apply changes they
+missed from there. An index is only loaded again when a change is missing,
+e.g. after it expired. Processes only notice changes of others through
+a shared cache, see `core.caches`, so without one expressions are always
+evaluated with subqueries.
+"""
+import re
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+
+from asgiref.sync import sync_to_async
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.db import models, transaction
+
+from core.caches import is_shared
+
+from .models import Article, Tag
+
+VERSION_KEY = 'tag-index-version'
+CHANGE_KEY = 'tag-index-change:{}'
+# Seconds changes are kept for processes that missed them.
+CHANGE_TIMEOUT = 60 * 60
+# Processes further behind load the index again instead of reading the changes.
+MAX_CHANGES = 1000
+# Primary keys per query, below the limit of SQLite query parameters.
+MAX_IDS = 10_000
+TOKEN_RE = re.compile(r'[()]|[^\s()]+')
+OPERATORS = ('and', 'or', 'not')
+# Primary keys are split into chunks by their high bits, see `Bitmap`.
+CHUNK_BITS = 16
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+CHUNK_BYTES = 1 << CHUNK_BITS - 3
+# Chunks with more keys are bitmaps, both take 8 KiB at this size.
+ARRAY_MAX = 4096
+
+ArticleTag = Article.tags.through
+
+
+class TagExpressionError(ValueError):
+    pass
+
+
+def parse(text: str) -> tuple:
+    """
+    Parses a tag expression into a tree of `('tag', slug)`, `('not', node)`,
+    `('and', left, right)` and `('or', left, right)` tuples. Operators are
+    case-insensitive, NOT binds tighter than AND, and AND tighter than OR.
+    """
+    parser = _Parser(TOKEN_RE.findall(text))
+    node = parser.parse_or()
+    if parser.peek() is not None:
+        raise TagExpressionError(f'Unexpected "{parser.tokens[parser.position]}".')
+    return node
+
+
+def filter_articles(queryset: models.QuerySet, text: str, index: 'TagIndex | None' = None) -> models.QuerySet:
+    """
+    Filters articles of the query set by a tag expression, e.g. `python AND django`.
+    Async views pass the index returned by `aget_index()`, so that it is not
+    checked or loaded again on the event loop.
+    """
+    node = parse(text)
+    if not is_enabled():
+        return queryset.filter(_to_q(node))
+    bitmap = (index if index is not None else get_index()).evaluate(node)
+    if len(bitmap) > MAX_IDS:
+        return queryset.filter(_to_q(node))
+    return queryset.filter(pk__in=list(bitmap))
+
+
+def is_enabled() -> bool:
+    return is_shared(caches[DEFAULT_CACHE_ALIAS])
+
+
+def get_index() -> 'TagIndex':
+    """
+    Returns the index of the process, loaded again when it missed a change.
+    """
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Starts from the time, so a lost counter does not repeat versions seen before.
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    if version != _index.version and not _catch_up(version):
+        _index.load(version)
+    return _index
+
+
+async def aget_index() -> 'TagIndex | None':
+    """
+    Async version of `get_index()`, async views call it before filtering
+    and pass the index to `filter_articles()`, so that the index is not
+    loaded on the event loop.
+    Returns None when the index is not used.
+    """
+    if not is_enabled():
+        return None
+    return await sync_to_async(get_index)()
+
+
+def add(pairs: Iterable[tuple[int, int]], slugs: dict[int, str] | None = None):
+    """
+    Adds `(article_id, tag_id)` pairs once the transaction commits,
+    along with slugs of tags created in bulk, without `post_save`.
+    """
+    slugs = slugs or {}
+    _on_commit([*(('set_slug', tag_id, slug) for tag_id, slug in slugs.items()), ('add', list(pairs))])
+
+
+def remove(pairs: Iterable[tuple[int, int]]):
+    """
+    Removes `(article_id, tag_id)` pairs once the transaction commits.
+    """
+    _on_commit([('remove', list(pairs))])
+
+
+def remove_article(article_id: int):
+    _on_commit([('remove_article', article_id)])
+
+
+def remove_tag(tag_id: int):
+    _on_commit([('remove_tag', tag_id)])
+
+
+def set_slug(tag_id: int, slug: str):
+    _on_commit([('set_slug', tag_id, slug)])
+
+
+class Bitmap:
+    """
+    Compressed set of primary keys, split into chunks of 2 ** 16 keys by
+    their high bits like Roaring bitmaps. A chunk holds low bits of up to
+    `ARRAY_MAX` keys as a sorted array, and of more keys as an int whose
+    bit `n` is set for the key `n`, so memory grows with the number of
+    keys rather than with the largest one. Bitmaps are not changed once
+    built, operations return new ones sharing unchanged chunks.
+    """
+    __slots__ = ('chunks',)
+
+    def __init__(self, chunks: dict[int, array | int] | None = None):
+        self.chunks = chunks if chunks is not None else {}
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[int]) -> 'Bitmap':
+        lows = defaultdict(set)
+        for pk in ids:
+            lows[pk >> CHUNK_BITS].add(pk & CHUNK_MASK)
+        return cls({high: _pack(values) for high, values in lows.items()})
+
+    def __len__(self) -> int:
+        return sum(_count(chunk) for chunk in self.chunks.values())
+
+    def __iter__(self) -> Iterator[int]:
+        for high in sorted(self.chunks):
+            base = high << CHUNK_BITS
+            for low in _unpack(self.chunks[high]):
+                yield base | low
+
+    def __contains__(self, pk: int) -> bool:
+        chunk = self.chunks.get(pk >> CHUNK_BITS)
+        low = pk & CHUNK_MASK
+        if chunk is None:
+            return False
+        if isinstance(chunk, int):
+            return bool(chunk >> low & 1)
+        index = bisect_left(chunk, low)
+        return index < len(chunk) and chunk[index] == low
+
+    def __and__(self, other: 'Bitmap') -> 'Bitmap':
+        return Bitmap(_non_empty(
+            (high, _and(chunk, other.chunks[high]))
+            for high, chunk in self.chunks.items() if high in other.chunks
+        ))
+
+    def __or__(self, other: 'Bitmap') -> 'Bitmap':
+        chunks = dict(self.chunks)
+        for high, chunk in other.chunks.items():
+            chunks[high] = _or(chunks[high], chunk) if high in chunks else chunk
+        return Bitmap(chunks)
+
+    def __sub__(self, other: 'Bitmap') -> 'Bitmap':
+        return Bitmap(_non_empty(
+            (high, _and_not(chunk, other.chunks[high]) if high in other.chunks else chunk)
+            for high, chunk in self.chunks.items()
+        ))
+
+
+EMPTY = Bitmap()
+
+
+class TagIndex:
+
+    def __init__(self):
+        self.version = None
+        self.bitmaps = {}
+        self.tag_ids = {}
+        self._all = None
+
+    def load(self, version):
+        """
+        Reads all tags of articles, building every bitmap at once.
+        """
+        article_ids = defaultdict(list)
+        for article_id, tag_id in ArticleTag.objects.values_list('article_id', 'tag_id').iterator():
+            article_ids[tag_id].append(article_id)
+        self.bitmaps = {tag_id: Bitmap.from_ids(ids) for tag_id, ids in article_ids.items()}
+        self.tag_ids = dict(Tag.objects.values_list('slug', 'pk'))
+        self._all = None
+        self.version = version
+
+    def evaluate(self, node: tuple) -> Bitmap:
+        """
+        Returns the bitmap of articles matching a parsed expression.
+        """
+        operator, *operands = node
+        if operator == 'tag':
+            tag_id = self.tag_ids.get(operands[0])
+            return self.bitmaps.get(tag_id, EMPTY)
+        if operator == 'not':
+            return self.get_all() - self.evaluate(operands[0])
+        left, right = (self.evaluate(operand) for operand in operands)
+        return left & right if operator == 'and' else left | right
+
+    def get_all(self) -> Bitmap:
+        """
+        Returns the bitmap of all articles with a tag, which NOT is applied within.
+        """
+        if self._all is None:
+            self._all = EMPTY
+            for bitmap in list(self.bitmaps.values()):
+                self._all |= bitmap
+        return self._all
+
+    def add(self, pairs: list[tuple[int, int]]):
+        for tag_id, article_ids in _group(pairs).items():
+            self.bitmaps[tag_id] = self.bitmaps.get(tag_id, EMPTY) | Bitmap.from_ids(article_ids)
+        self._all = None
+
+    def remove(self, pairs: list[tuple[int, int]]):
+        for tag_id, article_ids in _group(pairs).items():
+            if tag_id in self.bitmaps:
+                self.bitmaps[tag_id] -= Bitmap.from_ids(article_ids)
+        self._all = None
+
+    def remove_article(self, article_id: int):
+        removed = Bitmap.from_ids([article_id])
+        for tag_id, bitmap in list(self.bitmaps.items()):
+            if article_id in bitmap:
+                self.bitmaps[tag_id] = bitmap - removed
+        self._all = None
+
+    def remove_tag(self, tag_id: int):
+        self.bitmaps.pop(tag_id, None)
+        self.tag_ids = {slug: pk for slug, pk in self.tag_ids.items() if pk != tag_id}
+        self._all = None
+
+    def set_slug(self, tag_id: int, slug: str):
+        self.tag_ids = {old_slug: pk for old_slug, pk in self.tag_ids.items() if pk != tag_id}
+        self.tag_ids[slug] = tag_id
+
+
+_index = TagIndex()
+
+
+class _Parser:
+
+    def __init__(self, tokens: list[str]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> str | None:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position].lower()
+        return None
+
+    def take(self) -> str:
+        token = self.peek()
+        if token is None:
+            raise TagExpressionError('Unexpected end of the expression.')
+        self.position += 1
+        return token
+
+    def parse_or(self) -> tuple:
+        node = self.parse_and()
+        while self.peek() == 'or':
+            self.take()
+            node = ('or', node, self.parse_and())
+        return node
+
+    def parse_and(self) -> tuple:
+        node = self.parse_not()
+        while self.peek() == 'and':
+            self.take()
+            node = ('and', node, self.parse_not())
+        return node
+
+    def parse_not(self) -> tuple:
+        if self.peek() == 'not':
+            self.take()
+            return ('not', self.parse_not())
+        token = self.take()
+        if token == '(':
+            node = self.parse_or()
+            if self.take() != ')':
+                raise TagExpressionError('Expected ")".')
+            return node
+        if token == ')' or token in OPERATORS:
+            raise TagExpressionError(f'Expected a tag, got "{token}".')
+        return ('tag', token)
+
+
+def _on_commit(change: list[tuple]):
+    """
+    Publishes a change, a list of `(method, *args)` calls of `TagIndex`,
+    after commit and applies it to the index of the process, when
+    the index has not missed a change of another process meanwhile.
+    """
+    def apply():
+        try:
+            version = cache.incr(VERSION_KEY)
+        except ValueError:
+            _index.version = None
+            return
+        cache.set(CHANGE_KEY.format(version), change, timeout=CHANGE_TIMEOUT)
+        if _index.version is not None and version == _index.version + 1:
+            _apply(_index, change)
+            _index.version = version
+
+    transaction.on_commit(apply)
+
+
+def _catch_up(version) -> bool:
+    """
+    Applies changes of other processes the index missed, in order.
+    Returns False when some of them are not in the cache.
+    """
+    if _index.version is None or not 0 < version - _index.version <= MAX_CHANGES:
+        return False
+    keys = [CHANGE_KEY.format(number) for number in range(_index.version + 1, version + 1)]
+    changes = cache.get_many(keys)
+    if len(changes) < len(keys):
+        return False
+    for key in keys:
+        _apply(_index, changes[key])
+    _index.version = version
+    return True
+
+
+def _apply(index: TagIndex, change: list[tuple]):
+    for method, *args in change:
+        getattr(index, method)(*args)
+
+
+def _group(pairs: list[tuple[int, int]]) -> dict[int, list[int]]:
+    article_ids = defaultdict(list)
+    for article_id, tag_id in pairs:
+        article_ids[tag_id].append(article_id)
+    return article_ids
+
+
+def _non_empty(chunks: Iterable[tuple[int, array | int | None]]) -> dict[int, array | int]:
+    return {high: chunk for high, chunk in chunks if chunk is not None}
+
+
+def _pack(lows: Iterable[int]) -> array | int | None:
+    """
+    Returns the smaller chunk holding the low bits, None when there are none.
+    """
+    lows = sorted(set(lows))
+    if not lows:
+        return None
+    if len(lows) <= ARRAY_MAX:
+        return array('H', lows)
+    return _to_int(lows)
+
+
+def _unpack(chunk: array | int) -> Iterable[int]:
+    if not isinstance(chunk, int):
+        return chunk
+    data = chunk.to_bytes(CHUNK_BYTES, 'little')
+    return [
+        index * 8 + bit
+        for index, byte in enumerate(data) if byte
+        for bit in range(8) if byte >> bit & 1
+    ]
+
+
+def _count(chunk: array | int) -> int:
+    return chunk.bit_count() if isinstance(chunk, int) else len(chunk)
+
+
+def _to_int(chunk: Iterable[int] | int) -> int:
+    if isinstance(chunk, int):
+        return chunk
+    data = bytearray(CHUNK_BYTES)
+    for low in chunk:
+        data[low >> 3] |= 1 << (low & 7)
+    return int.from_bytes(data, 'little')
+
+
+def _shrink(bits: int) -> array | int | None:
+    """
+    Turns a bitmap chunk that lost keys back into an array when it is smaller.
+    """
+    return bits if bits.bit_count() > ARRAY_MAX else _pack(_unpack(bits))
+
+
+def _filter(lows: array, bits: int, keep: bool) -> array | None:
+    data = bits.to_bytes(CHUNK_BYTES, 'little')
+    return _pack(low for low in lows if bool(data[low >> 3] >> (low & 7) & 1) == keep)
+
+
+def _and(left: array | int, right: array | int) -> array | int | None:
+    if isinstance(left, int) and isinstance(right, int):
+        return _shrink(left & right)
+    if isinstance(left, int):
+        left, right = right, left
+    if isinstance(right, int):
+        return _filter(left, right, keep=True)
+    return _pack(set(left).intersection(right))
+
+
+def _or(left: array | int, right: array | int) -> array | int:
+    if isinstance(left, int) or isinstance(right, int):
+        return _to_int(left) | _to_int(right)
+    return _pack(set(left).union(right))
+
+
+def _and_not(left: array | int, right: array | int) -> array | int | None:
+    if isinstance(left, int):
+        return _shrink(left & ~_to_int(right))
+    if isinstance(right, int):
+        return _filter(left, right, keep=False)
+    return _pack(set(left).difference(right))
+
+
+def _to_q(node: tuple) -> models.Q:
+    """
+    Returns a filter equivalent to a parsed expression, with a subquery per tag.
+    """
+    operator, *operands = node
+    if operator == 'tag':
+        return models.Q(models.Exists(
+            ArticleTag.objects.filter(article_id=models.OuterRef('pk'), tag__slug=operands[0])
+        ))
+    if operator == 'not':
+        # NOT applies within articles with a tag, like in the index.
+        return ~_to_q(operands[0]) & models.Q(models.Exists(
+            ArticleTag.objects.filter(article_id=models.OuterRef('pk'))
+        ))
+    left, right = (_to_q(operand) for operand in operands)
+    return left & right if operator == 'and' else left | right
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, re_path
 from django.views import generic
 
@@ -6,6 +7,14 @@ from . import views as library_views
 
 app_name = 'library'
 
+
+def read_view(name: str):
+    """
+    Returns the async version of a read view when `ASYNC_VIEWS` is enabled.
+    """
+    return getattr(library_views, f'Async{name}' if settings.ASYNC_VIEWS else name).as_view()
+
+
 urlpatterns = [
     path(
         '', generic.TemplateView.as_view(
@@ -13,22 +22,25 @@ urlpatterns = [
         ), name='index'
     ),
     path(
-        'articles/', library_views.ArticleListView.as_view(), name='article-list'
+        'articles/', read_view('ArticleListView'), name='article-list'
+    ),
+    path(
+        'search/', library_views.ArticleSearchView.as_view(), name='article-search'
     ),
     re_path(
-        r'^(?:article-(?P<slug>[0-9-a-z]+))/$', library_views.ArticleDetailView.as_view(), name='article-detail'
+        r'^(?:article-(?P<slug>[0-9-a-z]+))/$', read_view('ArticleDetailView'), name='article-detail'
     ),
     path(
-        'authors/', library_views.AuthorListView.as_view(), name='author-list'
+        'authors/', read_view('AuthorListView'), name='author-list'
     ),
     re_path(
-        r'^(?:author-(?P<slug>[0-9-a-z]+))/$', library_views.AuthorDetailView.as_view(), name='author-detail'
+        r'^(?:author-(?P<slug>[0-9-a-z]+))/$', read_view('AuthorDetailView'), name='author-detail'
     ),
     path(
-        'tags/', library_views.TagListView.as_view(), name='tag-list'
+        'tags/', read_view('TagListView'), name='tag-list'
     ),
     re_path(
-        r'^(?:tag-(?P<slug>[0-9-a-z]+))/$', library_views.TagDetailView.as_view(), name='tag-detail'
+        r'^(?:tag-(?P<slug>[0-9-a-z]+))/$', read_view('TagDetailView'), name='tag-detail'
     ),
     path(
         'register/', library_views.UserRegisterView.as_view(), name='user-register'
@@ -1,27 +1,83 @@
-from django.contrib.auth import views as auth_views
+from django.contrib.auth import HASH_SESSION_KEY, views as auth_views
+from django.core.exceptions import BadRequest
 from django.http import Http404
+from django.shortcuts import aget_object_or_404
 from django.views import generic
 from django.urls import reverse_lazy
 
 from .forms import UserRegisterForm
-from .mixins import RedirectAuthenticatedUserMixin, RedirectUnAuthenticatedUserMixin
+from .mixins import (
+    CachePageMixin,
+    ConditionalGetMixin,
+    PasswordHashingBusyMixin,
+    RedirectAuthenticatedUserMixin,
+    RedirectUnAuthenticatedUserMixin,
+)
+from . import tag_index
 from .models import Article, Author, Tag
 
 
-class ArticleListView(generic.ListView):
+class ArticleListView(CachePageMixin, ConditionalGetMixin, generic.ListView):
+    anonymous_fast_path = True
     template_name = 'library/article_list.html'
     context_object_name = 'published_articles_list'
+    # Set by the async view before filtering by tags, see `tag_index.aget_index()`.
+    loaded_tag_index = None
 
     def get_queryset(self):
         """
         Returns a query set that includes verified articles
-        whose pub_date is present or past.
+        whose pub_date is present or past, without their content.
         """
-        return Article.verified_objects.all()
+        return self.filter_by_tags(Article.verified_objects.summaries())
+
+    def get_conditional_queryset(self):
+        return self.filter_by_tags(Article.verified_objects.all())
+
+    def filter_by_tags(self, queryset):
+        """
+        Filters articles by the tag expression passed as `?tags=`,
+        e.g. `python AND django`.
+        """
+        tags = self.request.GET.get('tags')
+        if tags is None:
+            return queryset
+        try:
+            return tag_index.filter_articles(queryset, tags, self.loaded_tag_index)
+        except tag_index.TagExpressionError as error:
+            raise BadRequest(str(error))
+
+    def get_cache_dependencies(self):
+        return ['articles']
+
+    def get_cache_expiry(self):
+        return Article.objects.next_pub_date()
     
 
-class ArticleDetailView(generic.DetailView):
+class ArticleSearchView(generic.ListView):
+    anonymous_fast_path = True
+    template_name = 'library/article_search.html'
+    context_object_name = 'found_articles_list'
+    paginate_by = 20
+
+    def get_queryset(self):
+        """
+        Returns verified articles matching words from `q` query parameter,
+        best matches first.
+        """
+        return Article.verified_objects.summaries().search(self.request.GET.get('q', ''))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.request.GET.get('q', '')
+        return context
+
+
+class ArticleDetailView(CachePageMixin, ConditionalGetMixin, generic.DetailView):
+    anonymous_fast_path = True
     template_name = 'library/article_detail.html'
+    conditional_related = ('author', 'tags', 'related_entries__related')
+    conditional_last_modified = True
 
     def get_object(self):
         """
@@ -33,9 +89,23 @@ class ArticleDetailView(generic.DetailView):
         except Article.DoesNotExist:
             raise Http404
 
+    def get_conditional_queryset(self):
+        return Article.verified_objects.filter(slug=self.kwargs['slug'])
+
+    def get_cache_dependencies(self):
+        tag_ids = self.object.tags.values_list('pk', flat=True)
+        related_ids = self.object.related_entries.values_list('related_id', flat=True)
+        return [
+            f'article:{self.object.pk}',
+            f'author:{self.object.author_id}',
+            *(f'tag:{tag_id}' for tag_id in tag_ids),
+            *(f'article:{related_id}' for related_id in related_ids),
+        ]
+
 
 class AuthorListView(generic.ListView):
-    emplate_name = 'library/author_list.html'
+    anonymous_fast_path = True
+    template_name = 'library/author_list.html'
     context_object_name = 'authors_list'
 
     def get_queryset(self):
@@ -45,9 +115,11 @@ class AuthorListView(generic.ListView):
         return Author.objects.all()
 
 
-class AuthorDetailView(generic.DetailView):
+class AuthorDetailView(CachePageMixin, ConditionalGetMixin, generic.DetailView):
+    anonymous_fast_path = True
     model = Author
     template_name = 'library/author_detail.html'
+    conditional_related = ('articles',)
 
     def get_context_data(self, **kwargs):
         """
@@ -56,12 +128,22 @@ class AuthorDetailView(generic.DetailView):
         """
         context = super().get_context_data(**kwargs)
         author_obj = self.get_object()
-        articles = Article.verified_objects.filter(author__slug=author_obj.slug)
+        articles = Article.verified_objects.summaries().filter(author__slug=author_obj.slug)
         context['articles'] = articles
         return context
 
+    def get_conditional_queryset(self):
+        return Author.objects.filter(slug=self.kwargs['slug'])
+
+    def get_cache_dependencies(self):
+        return [f'author:{self.object.pk}', f'author-articles:{self.object.pk}']
+
+    def get_cache_expiry(self):
+        return Article.objects.filter(author=self.object).next_pub_date()
+
 
 class TagListView(generic.ListView):
+    anonymous_fast_path = True
     template_name = 'library/tag_list.html'
     context_object_name = 'available_tags_list'
 
@@ -72,9 +154,11 @@ class TagListView(generic.ListView):
         return Tag.objects.all()
     
 
-class TagDetailView(generic.DetailView):
+class TagDetailView(CachePageMixin, ConditionalGetMixin, generic.DetailView):
+    anonymous_fast_path = True
     model = Tag
     template_name = 'library/tag_detail.html'
+    conditional_related = ('articles',)
 
     def get_context_data(self, **kwargs):
         """
@@ -83,12 +167,95 @@ class TagDetailView(generic.DetailView):
         """
         context = super().get_context_data(**kwargs)
         tag_obj = self.get_object()
-        articles = Article.verified_objects.filter(tags__slug=tag_obj.slug)
+        articles = Article.verified_objects.summaries().filter(tags__slug=tag_obj.slug)
         context['articles'] = articles
         return context
+
+    def get_conditional_queryset(self):
+        return Tag.objects.filter(slug=self.kwargs['slug'])
+
+    def get_cache_dependencies(self):
+        return [f'tag:{self.object.pk}', f'tag-articles:{self.object.pk}']
+
+    def get_cache_expiry(self):
+        return Article.objects.filter(tags=self.object).next_pub_date()
     
 
-class UserRegisterView(RedirectAuthenticatedUserMixin, generic.FormView):
+class AsyncArticleListView(ArticleListView):
+    """
+    Async version of `ArticleListView`, used when `ASYNC_VIEWS` is enabled.
+    """
+    async def dispatch(self, request, *args, **kwargs):
+        if 'tags' in request.GET:
+            self.loaded_tag_index = await tag_index.aget_index()
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = [article async for article in self.get_queryset()]
+        return self.render_to_response(self.get_context_data())
+
+
+class AsyncArticleDetailView(ArticleDetailView):
+    """
+    Async version of `ArticleDetailView`, fetches the author, tags
+    and related articles with the article, so rendering needs no queries.
+    """
+    async def get(self, request, *args, **kwargs):
+        try:
+            self.object = await Article.verified_objects.select_related(
+                'author'
+            ).prefetch_related('tags').aget(slug=self.kwargs['slug'])
+        except Article.DoesNotExist:
+            raise Http404
+        self.object.related_articles = [article async for article in self.object.get_related_articles()]
+        return self.render_to_response(self.get_context_data(object=self.object))
+
+
+class AsyncAuthorListView(AuthorListView):
+    """
+    Async version of `AuthorListView`.
+    """
+    async def get(self, request, *args, **kwargs):
+        self.object_list = [author async for author in self.get_queryset()]
+        return self.render_to_response(self.get_context_data())
+
+
+class AsyncAuthorDetailView(AuthorDetailView):
+    """
+    Async version of `AuthorDetailView`.
+    """
+    async def get(self, request, *args, **kwargs):
+        self.object = await aget_object_or_404(Author, slug=self.kwargs['slug'])
+        articles = [
+            article async for article in Article.verified_objects.summaries().filter(author=self.object)
+        ]
+        context = super(AuthorDetailView, self).get_context_data(object=self.object, articles=articles)
+        return self.render_to_response(context)
+
+
+class AsyncTagListView(TagListView):
+    """
+    Async version of `TagListView`.
+    """
+    async def get(self, request, *args, **kwargs):
+        self.object_list = [tag async for tag in self.get_queryset()]
+        return self.render_to_response(self.get_context_data())
+
+
+class AsyncTagDetailView(TagDetailView):
+    """
+    Async version of `TagDetailView`.
+    """
+    async def get(self, request, *args, **kwargs):
+        self.object = await aget_object_or_404(Tag, slug=self.kwargs['slug'])
+        articles = [
+            article async for article in Article.verified_objects.summaries().filter(tags=self.object)
+        ]
+        context = super(TagDetailView, self).get_context_data(object=self.object, articles=articles)
+        return self.render_to_response(context)
+
+
+class UserRegisterView(RedirectAuthenticatedUserMixin, PasswordHashingBusyMixin, generic.FormView):
     form_class = UserRegisterForm
     template_name = 'library/user_register.html'
     success_url = reverse_lazy('library:user-login')
@@ -100,10 +267,37 @@ class UserRegisterView(RedirectAuthenticatedUserMixin, generic.FormView):
         return super().form_valid(form)
 
 
-class UserLoginView(RedirectAuthenticatedUserMixin, auth_views.LoginView):
+class UserLoginView(RedirectAuthenticatedUserMixin, PasswordHashingBusyMixin, auth_views.LoginView):
     template_name = 'library/user_login.html'
     next_page = 'library:index'
 
+    def form_valid(self, form):
+        """
+        Logs the user in and, when the password hash is upgraded in
+        the background, moves the session to the new hash once it is stored,
+        since a session hash of the outdated one logs the user out.
+        """
+        response = super().form_valid(form)
+        user = form.get_user()
+        upgrade = getattr(user, 'password_upgrade', None)
+        if upgrade is not None:
+            session = self.request.session
+            session_hash = session[HASH_SESSION_KEY]
+
+            def update_session(upgrade):
+                new_hash = user.get_session_auth_hash()
+                if not upgrade.result() or new_hash == session_hash:
+                    return
+                # Saved with the response, unless it was saved already.
+                session[HASH_SESSION_KEY] = new_hash
+                stored = type(session)(session.session_key)
+                if stored.get(HASH_SESSION_KEY) == session_hash:
+                    stored[HASH_SESSION_KEY] = new_hash
+                    stored.save()
+
+            upgrade.add_done_callback(update_session)
+        return response
+
 
 class UserLogoutView(RedirectUnAuthenticatedUserMixin, auth_views.LogoutView):
     template_name = 'library/user_logout.html'
@@ -0,0 +1,127 @@
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
+
+from api import views
+from library import tag_index
+from common.test_utils import create_article, create_author, create_tag
+from library.models import Article
+
+
+class SetUpData(APITestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.author = create_author('author', 'r7m2kq4z')
+        self.tag = create_tag('tag')
+        self.article = create_article(
+            title='article title',
+            author=self.author,
+            tags=[self.tag],
+            pub_date=timezone.now() - timedelta(days=1),
+            content='article content',
+        )
+        self.viewsets = (
+            (views.ArticleViewSet, views.AsyncArticleViewSet, '/api/articles/', self.article.slug),
+            (views.AuthorViewSet, views.AsyncAuthorViewSet, '/api/authors/', self.author.slug),
+            (views.TagViewSet, views.AsyncTagViewSet, '/api/tags/', self.tag.slug),
+        )
+
+    def call(self, viewset, action: str, request, **kwargs):
+        method = request.method.lower()
+        view = viewset.as_view({method: action})
+        if issubclass(viewset, views.AsyncViewSetMixin):
+            view = async_to_sync(view)
+        response = view(request, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+
+class AsyncViewSetTests(SetUpData):
+
+    def test_same_responses_as_sync_viewsets(self):
+        """
+        Checks whether async viewsets return the same lists and details with the same ETags as sync viewsets.
+        """
+        for sync_viewset, async_viewset, url, slug in self.viewsets:
+            for action, kwargs in (('list', {}), ('retrieve', {'slug': slug})):
+                with self.subTest(viewset=async_viewset.__name__, action=action):
+                    path = f'{url}{slug}/' if kwargs else url
+                    expected = self.call(sync_viewset, action, self.factory.get(path), **kwargs)
+                    response = self.call(async_viewset, action, self.factory.get(path), **kwargs)
+                    self.assertEqual(response.status_code, status.HTTP_200_OK)
+                    self.assertEqual(response.data, expected.data)
+                    self.assertEqual(response['ETag'], expected['ETag'])
+
+                    request = self.factory.get(path, HTTP_IF_NONE_MATCH=response['ETag'])
+                    response = self.call(async_viewset, action, request, **kwargs)
+                    self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_missing_object(self):
+        """
+        Checks whether async viewsets return 404 for unknown objects.
+        """
+        for _, async_viewset, url, _ in self.viewsets:
+            with self.subTest(viewset=async_viewset.__name__):
+                request = self.factory.get(f'{url}missing/')
+                response = self.call(async_viewset, 'retrieve', request, slug='missing')
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_sync_actions(self):
+        """
+        Checks whether async viewsets run writes and their permission checks as sync handlers.
+        """
+        data = {'title': 'new article', 'content': 'new content', 'tags': [f'/api/tags/{self.tag.slug}/']}
+        request = self.factory.post('/api/articles/', data, format='json')
+        response = self.call(views.AsyncArticleViewSet, 'create', request)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        request = self.factory.post('/api/articles/', data, format='json')
+        force_authenticate(request, user=self.author)
+        response = self.call(views.AsyncArticleViewSet, 'create', request)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Article.objects.filter(title='new article', author=self.author).exists())
+
+    def test_export_streams_async(self):
+        """
+        Checks whether async viewsets stream exports from an async iterator with the same lines.
+        """
+        async def collect(response) -> bytes:
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        for sync_viewset, async_viewset, url, _ in self.viewsets:
+            with self.subTest(viewset=async_viewset.__name__):
+                expected = self.call(sync_viewset, 'export', self.factory.get(f'{url}export/'))
+                response = self.call(async_viewset, 'export', self.factory.get(f'{url}export/'))
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertTrue(response.is_async)
+                content = async_to_sync(collect)(response)
+                self.assertTrue(content)
+                self.assertEqual(content, b''.join(expected.streaming_content))
+
+    @override_settings(SINGLE_PROCESS=True)
+    def test_tag_filter_uses_loaded_index(self):
+        """
+        Checks whether async lists filter by tags with the index loaded
+        before, even when another process changed tags meanwhile.
+        """
+        aget_index = tag_index.aget_index
+
+        async def aget_index_then_change():
+            index = await aget_index()
+            cache.incr(tag_index.VERSION_KEY)
+            return index
+
+        path = f'/api/articles/?tags={self.tag.slug}'
+        expected = self.call(views.ArticleViewSet, 'list', self.factory.get(path))
+        with mock.patch.object(tag_index, 'aget_index', aget_index_then_change):
+            response = self.call(views.AsyncArticleViewSet, 'list', self.factory.get(path))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, expected.data)
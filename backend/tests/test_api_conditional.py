@@ -0,0 +1,156 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from common.test_utils import create_article, create_author, create_tag
+
+
+class SetUpData(APITestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url_article_list = '/api/articles/'
+        self.url_author_list = '/api/authors/'
+        self.url_tag_list = '/api/tags/'
+
+        self.author = create_author('author', 'n39vq7ua')
+        self.tag = create_tag('tag')
+        self.article = create_article(
+            title='article title',
+            author=self.author,
+            tags=[self.tag],
+            pub_date=timezone.now() - timedelta(days=1),
+            content='article content',
+        )
+        self.url_article_detail = f'/api/articles/{self.article.slug}/'
+        self.url_author_detail = f'/api/authors/{self.author.slug}/'
+        self.url_tag_detail = f'/api/tags/{self.tag.slug}/'
+
+    def get_etag(self, url: str) -> str:
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.has_header('ETag'))
+        return response['ETag']
+
+
+class ConditionalGetTests(SetUpData):
+
+    def test_matching_etag_not_modified(self):
+        """
+        Checks whether a request with a matching ETag gets 304 without serializing the response.
+        """
+        urls = (
+            self.url_article_list, self.url_author_list, self.url_tag_list,
+            self.url_article_detail, self.url_author_detail, self.url_tag_detail,
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                etag = self.get_etag(url)
+                with mock.patch('rest_framework.serializers.Serializer.to_representation') as to_representation:
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+                self.assertEqual(response.content, b'')
+                to_representation.assert_not_called()
+
+    def test_etag_depends_on_query(self):
+        """
+        Checks whether different pages of a list have different ETags.
+        """
+        self.assertNotEqual(
+            self.get_etag(self.url_article_list),
+            self.get_etag(f'{self.url_article_list}?page=1'),
+        )
+
+    def test_list_validators_read_page_only(self):
+        """
+        Checks whether list ETags aggregate over rows of the page only
+        and do not change when an article on another page changes.
+        """
+        articles = [
+            create_article(
+                title=f'article {number}',
+                author=self.author,
+                tags=[self.tag],
+                pub_date=timezone.now() - timedelta(days=2, hours=number),
+                content='article content',
+            )
+            for number in range(10)
+        ]
+        for url in (self.url_tag_list, f'{self.url_article_list}?pagination=cursor'):
+            with self.subTest(url=url), CaptureQueriesContext(connection) as context:
+                self.get_etag(url)
+            aggregates = [query['sql'] for query in context.captured_queries if 'MAX(' in query['sql']]
+            self.assertEqual(len(aggregates), 1)
+            self.assertIn(' IN (', aggregates[0])
+
+        etag = self.get_etag(f'{self.url_article_list}?pagination=cursor')
+        articles[-1].title = 'changed old title'
+        articles[-1].save()
+        self.assertEqual(self.get_etag(f'{self.url_article_list}?pagination=cursor'), etag)
+        self.article.title = 'changed title'
+        self.article.save()
+        self.assertNotEqual(self.get_etag(f'{self.url_article_list}?pagination=cursor'), etag)
+
+    def test_article_change_changes_etags(self):
+        """
+        Checks whether changing an article changes ETags of the article list and detail.
+        """
+        list_etag = self.get_etag(self.url_article_list)
+        detail_etag = self.get_etag(self.url_article_detail)
+        self.article.content = 'changed content'
+        self.article.save()
+        self.assertNotEqual(self.get_etag(self.url_article_list), list_etag)
+        self.assertNotEqual(self.get_etag(self.url_article_detail), detail_etag)
+
+    def test_article_delete_changes_etags(self):
+        """
+        Checks whether deleting an article changes ETags of lists displaying it.
+        """
+        urls = (self.url_article_list, self.url_author_detail, self.url_tag_detail)
+        etags = [self.get_etag(url) for url in urls]
+        self.article.delete()
+        for url, etag in zip(urls, etags):
+            with self.subTest(url=url):
+                self.assertNotEqual(self.get_etag(url), etag)
+
+    def test_retagging_changes_etags(self):
+        """
+        Checks whether removing a tag from an article changes ETags of the article and the tag.
+        """
+        another_tag = create_tag('another tag')
+        self.article.tags.add(another_tag)
+        article_etag = self.get_etag(self.url_article_detail)
+        tag_etag = self.get_etag(self.url_tag_detail)
+        self.article.tags.remove(self.tag)
+        self.assertNotEqual(self.get_etag(self.url_article_detail), article_etag)
+        self.assertNotEqual(self.get_etag(self.url_tag_detail), tag_etag)
+
+    def test_publication_changes_etag(self):
+        """
+        Checks whether publication of a scheduled article changes the ETag of the article list.
+        """
+        create_article(
+            title='scheduled article',
+            author=self.author,
+            tags=[self.tag],
+            pub_date=timezone.now() + timedelta(hours=1),
+            content='scheduled content',
+        )
+        etag = self.get_etag(self.url_article_list)
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(hours=2)):
+            self.assertNotEqual(self.get_etag(self.url_article_list), etag)
+
+    def test_last_modified(self):
+        """
+        Checks whether article details send Last-Modified and answer If-Modified-Since.
+        """
+        response = self.client.get(self.url_article_detail)
+        self.assertTrue(response.has_header('Last-Modified'))
+        response = self.client.get(self.url_article_detail, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertFalse(self.client.get(self.url_author_detail).has_header('Last-Modified'))
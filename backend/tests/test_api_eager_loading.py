@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from common.test_utils import create_article, create_author, create_tag
+
+
+class SetUpData(APITestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url_article_list = '/api/articles/'
+        self.url_author_list = '/api/authors/'
+        self.url_tag_list = '/api/tags/'
+
+        self.author = create_author('author', 'wao7984v')
+        self.tags = [create_tag('tag'), create_tag('another_tag')]
+
+    def add_articles(self, start: int, stop: int):
+        """
+        Creates published articles numbered from `start` to `stop`
+        with their own authors and tags.
+        """
+        for i in range(start, stop):
+            author = create_author(f'author_{i}', 'wao7984v') if i % 2 else self.author
+            tag = create_tag(f'tag_{i}')
+            create_article(
+                title=f'article_{i}',
+                author=author,
+                tags=[*self.tags, tag],
+                pub_date=timezone.now() - timedelta(hours=i + 1),
+                content=f'article_{i}_content',
+            )
+
+    def count_queries(self, url: str) -> int:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+
+class EagerLoadingTests(SetUpData):
+
+    def test_constant_queries_for_article_list(self):
+        """
+        Checks whether number of queries for article list does not depend on page size.
+        """
+        self.add_articles(0, 2)
+        small_page = self.count_queries(self.url_article_list)
+        self.add_articles(2, 9)
+        self.assertEqual(self.count_queries(self.url_article_list), small_page)
+        self.assertEqual(self.count_queries(f'{self.url_article_list}?pagination=cursor'), small_page - 1)
+
+    def test_constant_queries_for_author_list(self):
+        """
+        Checks whether number of queries for author list does not depend on page size.
+        """
+        self.add_articles(0, 2)
+        small_page = self.count_queries(self.url_author_list)
+        self.add_articles(2, 9)
+        self.assertEqual(self.count_queries(self.url_author_list), small_page)
+
+    def test_constant_queries_for_tag_list(self):
+        """
+        Checks whether number of queries for tag list does not depend on page size.
+        """
+        self.add_articles(0, 2)
+        small_page = self.count_queries(self.url_tag_list)
+        self.add_articles(2, 9)
+        self.assertEqual(self.count_queries(self.url_tag_list), small_page)
@@ -11,6 +11,7 @@ from common.test_utils import (
     create_superuser,
     create_tag,
     serialize_article,
+    serialize_article_summary,
     serialize_author,
     serialize_tag,
 )
@@ -95,6 +96,8 @@ class SetUpData(APITestCase):
         
         self.serialized_past_article = serialize_article(self.past_article)
         self.serialized_future_article = serialize_article(self.future_article)
+        self.summarized_past_article = serialize_article_summary(self.past_article)
+        self.summarized_future_article = serialize_article_summary(self.future_article)
 
 
 class ApiRootTests(SetUpData):
@@ -408,7 +411,7 @@ class ArticleListEndpointTests(SetUpData):
         """
         response = self.client.get(self.url_article_list)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn(self.serialized_past_article, response.data['results'])
+        self.assertIn(self.summarized_past_article, response.data['results'])
 
     def test_get_response_future_article(self):
         """
@@ -416,7 +419,24 @@ class ArticleListEndpointTests(SetUpData):
         """
         response = self.client.get(self.url_article_list)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertNotIn(self.serialized_future_article, response.data['results'])
+        self.assertNotIn(self.summarized_future_article, response.data['results'])
+
+    def test_get_response_search(self):
+        """
+        Checks article list endpoint response for full-text search query,
+        only published articles are returned.
+        """
+        response = self.client.get(self.url_article_list, {'q': 'article_content'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [self.summarized_past_article])
+
+    def test_get_response_search_no_match(self):
+        """
+        Checks article list endpoint response for full-text search query without matches.
+        """
+        response = self.client.get(self.url_article_list, {'q': 'nonexistent'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [])
 
     def test_post_response_logged_user(self):
         """
@@ -0,0 +1,152 @@
+import json
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from common.test_utils import create_article, create_author, create_tag
+from library.models import Article
+
+
+class SetUpData(APITestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url_article_export = '/api/articles/export/'
+        self.url_author_export = '/api/authors/export/'
+        self.url_tag_export = '/api/tags/export/'
+
+        self.author = create_author('author', 'wao7984v')
+        self.tag = create_tag('tag')
+        self.another_tag = create_tag('another_tag')
+        self.old_article = create_article(
+            title='old_article_title',
+            author=self.author,
+            tags=[self.tag, self.another_tag],
+            pub_date=timezone.now() - timedelta(days=2),
+            content='old_article_content',
+        )
+        self.past_article = create_article(
+            title='past_article_title',
+            author=self.author,
+            tags=[self.tag],
+            pub_date=timezone.now() - timedelta(hours=1),
+            content='past_article_content',
+        )
+        self.future_article = create_article(
+            title='future_article_title',
+            author=self.author,
+            tags=[self.tag],
+            pub_date=timezone.now() + timedelta(hours=1),
+            content='future_article_content',
+        )
+
+    def get_records(self, url: str, **params) -> list:
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        content = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+
+class ExportEndpointTests(SetUpData):
+
+    def test_article_export(self):
+        """
+        Checks whether article export streams verified articles
+        with author and tag slugs inlined, oldest first.
+        """
+        records = self.get_records(self.url_article_export)
+        self.assertEqual([record['slug'] for record in records], [self.old_article.slug, self.past_article.slug])
+        self.assertEqual(records[0]['author'], self.author.slug)
+        self.assertEqual(sorted(records[0]['tags']), sorted([self.tag.slug, self.another_tag.slug]))
+        self.assertEqual(records[0]['content'], 'old_article_content')
+
+    def test_article_export_since(self):
+        """
+        Checks whether `since` limits the export to recently modified articles.
+        """
+        since = timezone.now().isoformat()
+        self.past_article.content = 'changed_content'
+        self.past_article.save()
+        records = self.get_records(self.url_article_export, since=since)
+        self.assertEqual([record['slug'] for record in records], [self.past_article.slug])
+
+    def test_article_export_since_published(self):
+        """
+        Checks whether a scheduled article reaches the next export once it gets published.
+        """
+        since = timezone.now().isoformat()
+        records = self.get_records(self.url_article_export, since=since)
+        self.assertNotIn(self.future_article.slug, [record['slug'] for record in records])
+
+        # Time passes, the article itself is not modified.
+        Article.objects.filter(pk=self.future_article.pk).update(pub_date=timezone.now())
+        records = self.get_records(self.url_article_export, since=since)
+        self.assertEqual([record['slug'] for record in records], [self.future_article.slug])
+
+    def test_article_export_since_removed(self):
+        """
+        Checks whether exports with `since` report deleted and unpublished articles first.
+        """
+        since = timezone.now().isoformat()
+        self.old_article.delete()
+        self.past_article.tags.clear()
+        records = self.get_records(self.url_article_export, since=since)
+        # Unpublished articles changed since are reported whether or not they were published before.
+        self.assertTrue(all(record == {'slug': record['slug'], 'removed': True} for record in records))
+        self.assertLessEqual(
+            {self.old_article.slug, self.past_article.slug}, {record['slug'] for record in records}
+        )
+        self.assertEqual(self.get_records(self.url_article_export), [])
+
+    def test_author_and_tag_export_since_removed(self):
+        """
+        Checks whether exports with `since` report deleted authors and tags.
+        """
+        since = timezone.now().isoformat()
+        self.another_tag.delete()
+        records = self.get_records(self.url_tag_export, since=since)
+        self.assertEqual(records, [{'slug': 'another_tag', 'removed': True}])
+        author_slug = self.author.slug
+        self.author.delete()
+        records = self.get_records(self.url_author_export, since=since)
+        self.assertEqual(records, [{'slug': author_slug, 'removed': True}])
+
+    def test_article_export_invalid_since(self):
+        """
+        Checks whether invalid `since` returns 400.
+        """
+        response = self.client.get(self.url_article_export, {'since': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ndjson_accepted(self):
+        """
+        Checks whether clients accepting only NDJSON get the export, and errors as a JSON line.
+        """
+        for url in (self.url_article_export, self.url_author_export, self.url_tag_export):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_ACCEPT='application/x-ndjson')
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+                self.assertTrue(b''.join(response.streaming_content))
+
+        response = self.client.get(self.url_article_export, {'since': 'yesterday'}, HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertIn('since', json.loads(response.content.decode().strip()))
+
+    def test_author_export(self):
+        """
+        Checks whether author export streams all authors.
+        """
+        records = self.get_records(self.url_author_export)
+        self.assertEqual([record['slug'] for record in records], [self.author.slug])
+
+    def test_tag_export(self):
+        """
+        Checks whether tag export streams all tags.
+        """
+        records = self.get_records(self.url_tag_export)
+        self.assertEqual([record['name'] for record in records], ['tag', 'another_tag'])
@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from common.test_utils import create_article, create_author, create_tag
+from library.models import Article, Tag
+
+
+class SetUpData(APITestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url_article_import = '/api/articles/import/'
+
+        self.author = create_author('author', 'wao7984v')
+        self.tag = create_tag('tag')
+        self.existing_article = create_article(
+            title='existing_article_title',
+            author=self.author,
+            tags=[self.tag],
+            pub_date=timezone.now() - timedelta(hours=1),
+            content='existing_article_content',
+        )
+        self.import_data = [
+            {
+                'title': 'first imported',
+                'content': 'first content',
+                'tags': ['tag', 'new tag'],
+                'pub_date': str(timezone.now() - timedelta(hours=1)),
+            },
+            {
+                'title': 'existing_article_title',
+                'content': 'duplicate content',
+                'tags': ['tag'],
+            },
+            {
+                'title': 'second imported',
+                'content': '',
+                'tags': ['tag'],
+            },
+            {
+                'title': 'third imported',
+                'content': 'third content',
+                'tags': ['new tag'],
+            },
+        ]
+
+
+class ImportEndpointTests(SetUpData):
+
+    def test_post_response_not_logged_user(self):
+        """
+        Checks whether not logged user can not import articles.
+        """
+        response = self.client.post(self.url_article_import, self.import_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_post_response_logged_user(self):
+        """
+        Checks whether valid articles are created and invalid ones are reported by index.
+        """
+        self.client.force_authenticate(self.author)
+        response = self.client.post(self.url_article_import, self.import_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], ['first-imported', 'third-imported'])
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2])
+        self.assertIn('title', response.data['errors'][0]['errors'])
+        self.assertIn('content', response.data['errors'][1]['errors'])
+
+    def test_imported_articles(self):
+        """
+        Checks whether imported articles are verified, related with tags
+        and missing tags are created.
+        """
+        self.client.force_authenticate(self.author)
+        self.client.post(self.url_article_import, self.import_data, format='json')
+        new_tag = Tag.objects.get(name='new tag')
+        self.assertEqual(new_tag.slug, 'new-tag')
+        article = Article.verified_objects.get(slug='first-imported')
+        self.assertEqual(article.author, self.author)
+        self.assertQuerySetEqual(article.tags.all(), [new_tag, self.tag])
+
+    def test_post_response_not_a_list(self):
+        """
+        Checks whether import endpoint rejects data that is not a list.
+        """
+        self.client.force_authenticate(self.author)
+        response = self.client.post(self.url_article_import, self.import_data[0], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_post_response_nothing_created(self):
+        """
+        Checks whether import endpoint returns 400 when no article was created.
+        """
+        self.client.force_authenticate(self.author)
+        response = self.client.post(self.url_article_import, [self.import_data[1]], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['created'], [])
@@ -0,0 +1,155 @@
+import json
+from base64 import b64encode
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from common.test_utils import create_article, create_author, create_tag
+from library.models import Article
+
+
+class SetUpData(APITestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url_article_list = '/api/articles/'
+        self.url_tag_list = '/api/tags/'
+
+        self.author = create_author('author', 'wao7984v')
+        self.tag = create_tag('tag')
+        self.pub_date = timezone.now() - timedelta(hours=1)
+
+        # Articles sharing one pub_date check that the primary key breaks ties.
+        for i in range(12):
+            create_article(
+                title=f'article_{i}',
+                author=self.author,
+                tags=[self.tag],
+                pub_date=self.pub_date - timedelta(minutes=i // 4),
+                content=f'article_{i}_content',
+            )
+        self.expected_slugs = list(
+            Article.verified_objects.order_by('-pub_date', '-pk').values_list('slug', flat=True)
+        )
+        for i in range(12):
+            create_tag(f'tag_{i:02}')
+
+    def collect_pages(self, url: str, key: str = 'slug') -> list:
+        """
+        Follows `next` links and collects values of `key` from all pages.
+        """
+        collected = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            collected.extend(item[key] for item in response.data['results'])
+            url = response.data['next']
+        return collected
+
+
+class KeysetPaginationTests(SetUpData):
+
+    def test_page_number_mode_is_default(self):
+        """
+        Checks whether list endpoint still uses page number pagination by default.
+        """
+        response = self.client.get(self.url_article_list)
+        self.assertEqual(response.data['count'], 12)
+        self.assertEqual(len(response.data['results']), 9)
+
+    def test_cursor_mode_walks_all_articles(self):
+        """
+        Checks whether following cursor links returns every article once,
+        in `Meta.ordering` order with primary key tiebreaker.
+        """
+        slugs = self.collect_pages(f'{self.url_article_list}?pagination=cursor')
+        self.assertEqual(slugs, self.expected_slugs)
+
+    def test_cursor_mode_previous_link(self):
+        """
+        Checks whether previous link of the second page returns the first page.
+        """
+        first_page = self.client.get(f'{self.url_article_list}?pagination=cursor').data
+        self.assertIsNone(first_page['previous'])
+        second_page = self.client.get(first_page['next']).data
+        previous_page = self.client.get(second_page['previous']).data
+        self.assertEqual(previous_page['results'], first_page['results'])
+
+    def test_cursor_mode_previous_page_last(self):
+        """
+        Checks whether a previous page has no next link when no rows follow it anymore.
+        """
+        first_page = self.client.get(f'{self.url_article_list}?pagination=cursor').data
+        second_page = self.client.get(first_page['next']).data
+        Article.objects.exclude(slug__in=[article['slug'] for article in first_page['results']]).delete()
+        previous_page = self.client.get(second_page['previous']).data
+        self.assertEqual(previous_page['results'], first_page['results'])
+        self.assertIsNone(previous_page['next'])
+
+    def test_cursor_pages_use_index_range(self):
+        """
+        Checks whether pages after a cursor are read with an index range search, not a scan.
+        """
+        for url, table in ((self.url_article_list, 'library_article'), (self.url_tag_list, 'library_tag')):
+            with self.subTest(url=url):
+                next_url = self.client.get(url, {'pagination': 'cursor'}).data['next']
+                with CaptureQueriesContext(connection) as context:
+                    self.client.get(next_url)
+                page_query = next(
+                    query['sql'] for query in context.captured_queries
+                    if f'FROM "{table}"' in query['sql'] and 'LIMIT' in query['sql']
+                )
+                with connection.cursor() as cursor:
+                    cursor.execute(f'EXPLAIN QUERY PLAN {page_query}')
+                    plan = [row[-1] for row in cursor.fetchall()]
+                self.assertTrue(any(step.startswith(f'SEARCH {table} USING INDEX') for step in plan), plan)
+                self.assertFalse(any(step.startswith(f'SCAN {table}') for step in plan), plan)
+
+    def test_cursor_mode_ascending_ordering(self):
+        """
+        Checks whether cursor mode works for models ordered ascending.
+        """
+        names = self.collect_pages(f'{self.url_tag_list}?pagination=cursor', key='name')
+        self.assertEqual(names, sorted(names))
+        self.assertEqual(len(names), 13)
+
+    def test_cursor_mode_search_relevance(self):
+        """
+        Checks whether cursor pages of search results keep the best matches first.
+        """
+        for i in range(12):
+            create_article(
+                title=f'match_{i}',
+                author=self.author,
+                tags=[self.tag],
+                pub_date=self.pub_date - timedelta(days=1, minutes=i),
+                content=' '.join(['keyword'] * (i % 5 + 1) + ['filler'] * 20),
+            )
+        expected = list(Article.verified_objects.search('keyword').values_list('slug', flat=True))
+        by_date = list(Article.verified_objects.filter(slug__in=expected).values_list('slug', flat=True))
+        self.assertNotEqual(expected, by_date)
+        self.assertEqual(self.collect_pages(f'{self.url_article_list}?q=keyword&pagination=cursor'), expected)
+
+    def test_invalid_cursor(self):
+        """
+        Checks whether malformed cursor returns 404.
+        """
+        response = self.client.get(f'{self.url_article_list}?cursor=invalid')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_badly_typed_cursor_position(self):
+        """
+        Checks whether a cursor decoding to values of wrong types returns 404, not 500.
+        """
+        positions = (['yesterday', 1], ['2024-01-01T00:00:00+00:00', 'one'], [None, 1], [{}, []])
+        for position in positions:
+            with self.subTest(position=position):
+                cursor = b64encode(json.dumps({'p': position}).encode()).decode()
+                response = self.client.get(self.url_article_list, {'cursor': cursor})
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+                self.assertEqual(response.data['detail'], 'Invalid cursor')
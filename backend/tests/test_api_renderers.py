@@ -0,0 +1,85 @@
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import msgpack
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APITestCase
+
+from api.renderers import MessagePackRenderer, ORJSONRenderer
+from common.test_utils import create_article, create_author, create_tag
+
+
+class SetUpData(APITestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url_article_list = '/api/articles/'
+        self.author = create_author('author', 'wao7984v')
+        self.tag = create_tag('tag')
+        self.article = create_article(
+            title='article_title',
+            author=self.author,
+            tags=[self.tag],
+            pub_date=timezone.now() - timedelta(hours=1),
+            content='article_content ąę',
+        )
+
+
+class RenderersTests(SetUpData):
+
+    def test_json(self):
+        """
+        Checks whether JSON responses are encoded with orjson the same way as by JSONRenderer.
+        """
+        response = self.client.get(f'{self.url_article_list}{self.article.slug}/')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_msgpack(self):
+        """
+        Checks whether MessagePack is returned when requested with the Accept header.
+        """
+        json_response = self.client.get(self.url_article_list)
+        response = self.client.get(self.url_article_list, HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), json.loads(json_response.content))
+        self.assertNotEqual(response['ETag'], json_response['ETag'])
+
+    def test_msgpack_errors(self):
+        """
+        Checks whether error responses are encoded as MessagePack as well.
+        """
+        response = self.client.post(self.url_article_list, HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertIn('detail', msgpack.unpackb(response.content))
+
+    def test_indented_and_browsable(self):
+        """
+        Checks whether indented JSON and the browsable API are still rendered.
+        """
+        response = self.client.get(self.url_article_list, HTTP_ACCEPT='application/json; indent=2')
+        self.assertIn(b'\n  "count": 1', response.content)
+        response = self.client.get(self.url_article_list, HTTP_ACCEPT='text/html')
+        self.assertContains(response, 'article_title')
+
+    def test_values_of_json_encoder(self):
+        """
+        Checks whether values not encoded natively are converted like by JSONRenderer.
+        """
+        data = {
+            'datetime': datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc),
+            'decimal': Decimal('1.50'),
+            'lazy': gettext_lazy('text'),
+            1: None,
+        }
+        expected = {'datetime': '2024-01-02T03:04:05.678901Z', 'decimal': 1.5, 'lazy': 'text', '1': None}
+        self.assertEqual(json.loads(JSONRenderer().render(data)), expected)
+        self.assertEqual(json.loads(ORJSONRenderer().render(data)), expected)
+        unpacked = msgpack.unpackb(MessagePackRenderer().render(data), strict_map_key=False)
+        self.assertEqual(unpacked, {'datetime': '2024-01-02T03:04:05.678901Z', 'decimal': 1.5, 'lazy': 'text', 1: None})
@@ -0,0 +1,127 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from common.test_utils import create_article, create_author, create_tag
+from library.models import Tag
+
+
+class SetUpData(APITestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url_article_list = '/api/articles/'
+        self.url_author_list = '/api/authors/'
+        self.url_tag_list = '/api/tags/'
+
+        self.author = create_author('author', 'wao7984v')
+        self.tag = create_tag('tag')
+        self.article = create_article(
+            title='article_title',
+            author=self.author,
+            tags=[self.tag],
+            pub_date=timezone.now() - timedelta(hours=1),
+            content='article_content',
+        )
+
+    def get(self, url: str, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.queries = [query['sql'] for query in context.captured_queries]
+        return response
+
+
+class SparseFieldsTests(SetUpData):
+
+    def test_fields(self):
+        """
+        Checks whether only fields listed in `fields` are returned.
+        """
+        response = self.get(self.url_article_list, fields='title,slug')
+        self.assertEqual(response.data['results'], [{'title': 'article_title', 'slug': 'article_title'}])
+        response = self.get(self.url_tag_list, fields='name')
+        self.assertEqual(response.data['results'], [{'name': 'tag'}])
+
+    def test_omit(self):
+        """
+        Checks whether fields listed in `omit` are left out.
+        """
+        response = self.get(f'{self.url_author_list}{self.author.slug}/', omit='articles,avatar_variants')
+        self.assertNotIn('articles', response.data)
+        self.assertNotIn('avatar_variants', response.data)
+        self.assertEqual(response.data['user_name'], 'author')
+
+    def test_optional_fields(self):
+        """
+        Checks whether optional fields are returned when named in `fields`.
+        """
+        response = self.get(f'{self.url_article_list}{self.article.slug}/', fields='content_html')
+        self.assertEqual(response.data, {'content_html': '<p>article_content</p>\n'})
+
+    def test_unknown_fields(self):
+        """
+        Checks whether unknown or write only fields are reported with status 400.
+        """
+        response = self.get(self.url_author_list, fields='user_name,password', omit='nonexistent')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data), {'fields', 'omit'})
+
+    def test_ignored_by_writes(self):
+        """
+        Checks whether sparse fieldsets do not limit fields accepted by writes.
+        """
+        self.client.force_authenticate(self.author)
+        response = self.client.patch(
+            f'{self.url_article_list}{self.article.slug}/?fields=slug', {'title': 'new_title'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], 'new_title')
+
+
+class SparseQueriesTests(SetUpData):
+
+    def test_skips_prefetches(self):
+        """
+        Checks whether relations left out are not fetched.
+        """
+        self.get(self.url_tag_list)
+        all_fields = len(self.queries)
+        self.get(self.url_tag_list, fields='name')
+        self.assertEqual(len(self.queries), all_fields - 1)
+        self.get(self.url_article_list, omit='tags,author')
+        self.assertFalse(any('library_tag' in query or 'library_author' in query for query in self.queries))
+
+    def test_defers_columns(self):
+        """
+        Checks whether columns read only by left out fields are not loaded,
+        while ordering and lookup columns are.
+        """
+        self.get(f'{self.url_article_list}{self.article.slug}/', fields='url')
+        select = self.queries[-1].split(' FROM ')[0]
+        self.assertNotIn('"library_article"."title"', select)
+        self.assertNotIn('"library_article"."content"', select)
+        self.assertIn('"library_article"."slug"', select)
+        self.assertIn('"library_article"."pub_date"', select)
+
+    def test_extra_sources_loaded(self):
+        """
+        Checks whether model fields read by a requested field besides its source are loaded.
+        """
+        response = self.get(self.url_author_list, fields='avatar_variants')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(any('"library_author"."avatar"' in query for query in self.queries))
+
+    def test_no_query_per_row(self):
+        """
+        Checks whether number of queries does not depend on page size with sparse fieldsets.
+        """
+        self.get(self.url_tag_list, fields='url')
+        one_tag = len(self.queries)
+        Tag.objects.bulk_create(Tag(name=f'tag_{number}', slug=f'tag_{number}') for number in range(5))
+        response = self.get(self.url_tag_list, fields='url')
+        self.assertEqual(len(response.data['results']), 6)
+        self.assertEqual(len(self.queries), one_tag)
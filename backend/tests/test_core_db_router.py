@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from common.test_utils import create_article, create_author, create_tag
+from core import db_router
+from core.middleware import PIN_COOKIE_NAME, ReplicaRoutingMiddleware
+from library.models import Article, Author, Tag
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+class SetUpData(TestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.author = create_author('author', 'z4r8w2kd')
+        self.tag = create_tag('tag')
+        self.article = create_article(
+            title='article title',
+            author=self.author,
+            tags=[self.tag],
+            pub_date=timezone.now() - timedelta(days=1),
+            content='article content',
+        )
+
+    def route(self, request, view):
+        """
+        Passes the request through the middleware to `view`
+        and returns the response with the value returned by the view.
+        """
+        result = {}
+
+        def get_response(request):
+            result['value'] = view(request)
+            return HttpResponse()
+
+        response = ReplicaRoutingMiddleware(get_response)(request)
+        return response, result['value']
+
+
+class ReplicaRouterTests(SetUpData):
+
+    def test_safe_request_reads_from_one_replica(self):
+        """
+        Checks whether all reads of a safe request use the same replica.
+        """
+        request = self.factory.get('/')
+        _, databases = self.route(request, lambda request: {
+            Article.objects.all().db, Article.verified_objects.all().db, Tag.objects.all().db,
+        })
+        self.assertEqual(len(databases), 1)
+        self.assertIn(databases.pop(), ('replica1', 'replica2'))
+
+    def test_unsafe_request_reads_from_primary(self):
+        """
+        Checks whether an unsafe request reads from the primary.
+        """
+        _, database = self.route(self.factory.post('/'), lambda request: Article.verified_objects.all().db)
+        self.assertEqual(database, 'default')
+
+    def test_write_pins_request_and_client(self):
+        """
+        Checks whether reads after a write use the primary and the client gets a pin cookie.
+        """
+        def view(request):
+            Tag.objects.create(name='new tag')
+            return Tag.objects.all().db
+
+        response, database = self.route(self.factory.get('/'), view)
+        self.assertEqual(database, 'default')
+        self.assertIn(PIN_COOKIE_NAME, response.cookies)
+
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE_NAME] = '1'
+        response, database = self.route(request, lambda request: Tag.objects.all().db)
+        self.assertEqual(database, 'default')
+        self.assertNotIn(PIN_COOKIE_NAME, response.cookies)
+
+    def test_primary_only_models(self):
+        """
+        Checks whether sessions and writes always use the primary, while authors are read from a replica.
+        """
+        _, database = self.route(self.factory.get('/'), lambda request: Session.objects.all().db)
+        self.assertEqual(database, 'default')
+        _, database = self.route(self.factory.get('/'), lambda request: Author.objects.all().db)
+        self.assertIn(database, ('replica1', 'replica2'))
+        with db_router.route_request(safe=True):
+            self.assertEqual(Tag.objects.select_for_update().db, 'default')
+
+    def test_verified_objects_outside_requests(self):
+        """
+        Checks whether verified articles are read from the primary outside of requests
+        and the replica hint picks a replica in routed blocks.
+        """
+        self.assertEqual(Article.verified_objects.all().db, 'default')
+        self.assertEqual(Article.objects.all().db, 'default')
+        with db_router.route_request(safe=True) as state:
+            state.replica = None
+            self.assertIn(Article.verified_objects.filter(author=self.author).db, ('replica1', 'replica2'))
+            self.assertEqual(Article.objects.all().db, 'default')
+        with db_router.use_primary():
+            self.assertEqual(Article.verified_objects.all().db, 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        """
+        Checks whether all queries use the primary when there are no replicas.
+        """
+        _, database = self.route(self.factory.get('/'), lambda request: Article.verified_objects.all().db)
+        self.assertEqual(database, 'default')
@@ -0,0 +1,231 @@
+import gzip
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+import brotli
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from common.test_utils import create_article, create_author, create_tag
+from core import compression
+from core.middleware import CompressionMiddleware, StaticFilesMiddleware
+from library import avatars
+
+
+class SetUpData(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = create_author('author', 'q8x2v6mn')
+        self.tag = create_tag('test tag')
+        self.article = create_article(
+            title='article title',
+            author=self.author,
+            tags=[self.tag],
+            pub_date=timezone.now() - timedelta(days=1),
+            content='article content'
+        )
+        self.public_urls = (
+            reverse('library:article-list'),
+            reverse('library:article-search') + '?q=article',
+            reverse('library:article-detail', args=(self.article.slug,)),
+            reverse('library:author-list'),
+            reverse('library:author-detail', args=(self.author.slug,)),
+            reverse('library:tag-list'),
+            reverse('library:tag-detail', args=(self.tag.slug,)),
+            '/api/articles/',
+            f'/api/articles/{self.article.slug}/',
+            '/api/authors/',
+            '/api/tags/',
+        )
+
+
+class AnonymousFastPathTests(SetUpData):
+
+    def test_anonymous_responses_public(self):
+        """
+        Checks whether anonymous reads are cacheable by shared caches and do not vary on cookies.
+        """
+        for url in self.public_urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('public', response['Cache-Control'])
+                self.assertIn('max-age=60', response['Cache-Control'])
+                self.assertNotIn('Cookie', response.get('Vary', ''))
+                self.assertFalse(response.cookies)
+
+    def test_session_not_loaded(self):
+        """
+        Checks whether an anonymous read does not query the session table.
+        """
+        url = reverse('library:author-list')
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+    def test_logged_user_responses_private(self):
+        """
+        Checks whether responses of public views for logged in users are private.
+        """
+        self.client.force_login(self.author)
+        for url in self.public_urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('private', response['Cache-Control'])
+
+    def test_api_varies_on_accept(self):
+        """
+        Checks whether API responses vary on the negotiated media type.
+        """
+        response = self.client.get('/api/tags/')
+        self.assertIn('Accept', response['Vary'])
+
+    def test_other_views_not_affected(self):
+        """
+        Checks whether views without the fast path keep their headers.
+        """
+        response = self.client.get(reverse('library:index'))
+        self.assertFalse(response.has_header('Cache-Control'))
+        self.assertIn('Cookie', response['Vary'])
+
+    @override_settings(ANONYMOUS_CACHE_MAX_AGE=300)
+    def test_max_age_setting(self):
+        """
+        Checks whether max-age follows the ANONYMOUS_CACHE_MAX_AGE setting.
+        """
+        response = self.client.get(reverse('library:tag-list'))
+        self.assertIn('max-age=300', response['Cache-Control'])
+
+
+class CompressionTests(SetUpData):
+
+    def setUp(self):
+        super().setUp()
+        self.article.content = 'article content ' * 100
+        self.article.save()
+        self.api_url = f'/api/articles/{self.article.slug}/'
+
+    def test_negotiation(self):
+        """
+        Checks whether the accepted encoding with the highest quality is chosen, Brotli on ties.
+        """
+        factory = RequestFactory()
+        cases = {
+            '': None,
+            'gzip, deflate, br': 'br',
+            'br;q=0.5, gzip': 'gzip',
+            'identity': None,
+            '*': 'br',
+            '*;q=0.1, gzip;q=0.5': 'gzip',
+            'br;q=0, gzip;q=0': None,
+            'gzip;q=invalid': None,
+        }
+        for header, encoding in cases.items():
+            with self.subTest(header=header):
+                request = factory.get('/', HTTP_ACCEPT_ENCODING=header)
+                self.assertEqual(compression.get_encoding(request), encoding)
+
+    def test_pages_and_api_compressed(self):
+        """
+        Checks whether pages and API responses are compressed with the encoding the client prefers.
+        """
+        for url in (reverse('library:article-detail', args=(self.article.slug,)), self.api_url):
+            with self.subTest(url=url):
+                identity = self.client.get(url)
+                response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+                self.assertEqual(response['Content-Encoding'], 'br')
+                self.assertIn('Accept-Encoding', response['Vary'])
+                self.assertEqual(brotli.decompress(response.content), identity.content)
+                response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, br;q=0.5')
+                self.assertEqual(gzip.decompress(response.content), identity.content)
+                self.assertEqual(response['Content-Length'], str(len(response.content)))
+
+    def test_not_accepted(self):
+        """
+        Checks whether responses are not compressed for clients without a supported encoding.
+        """
+        response = self.client.get(self.api_url, HTTP_ACCEPT_ENCODING='deflate, br;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_small_and_binary_bodies(self):
+        """
+        Checks whether small bodies and other than text types are not compressed.
+        """
+        factory = RequestFactory(HTTP_ACCEPT_ENCODING='gzip')
+        middleware = CompressionMiddleware(lambda request: HttpResponse(b'small', content_type='text/html'))
+        self.assertFalse(middleware(factory.get('/')).has_header('Content-Encoding'))
+        middleware = CompressionMiddleware(lambda request: HttpResponse(b'0' * 4096, content_type='image/png'))
+        self.assertFalse(middleware(factory.get('/')).has_header('Content-Encoding'))
+
+    def test_streaming(self):
+        """
+        Checks whether streamed responses are compressed chunk by chunk.
+        """
+        chunks = [b'{"line": 1}\n' * 50, b'{"line": 2}\n' * 50]
+        middleware = CompressionMiddleware(
+            lambda request: StreamingHttpResponse(iter(chunks), content_type='application/x-ndjson')
+        )
+        response = middleware(RequestFactory(HTTP_ACCEPT_ENCODING='gzip').get('/'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), b''.join(chunks))
+
+    def test_conditional_requests(self):
+        """
+        Checks whether compressed responses have weak ETags that validate conditional requests.
+        """
+        response = self.client.get(self.api_url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        response = self.client.get(self.api_url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+
+class StaticFilesTests(TestCase):
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        os.makedirs(os.path.join(root, 'static'))
+        with open(os.path.join(root, 'static', 'style.css'), 'w') as style:
+            style.write('body {}')
+        media = override_settings(MEDIA_ROOT=root, STATIC_ROOT=os.path.join(root, 'static'))
+        media.enable()
+        self.addCleanup(media.disable)
+        self.middleware = StaticFilesMiddleware(lambda request: HttpResponse(status=404))
+        self.factory = RequestFactory()
+
+    def test_content_addressed_files(self):
+        """
+        Checks whether files named by their content hash, saved after the start, are served and cached forever.
+        """
+        name = avatars.avatar_storage.save('avatar.png', ContentFile(b'avatar'))
+        response = self.middleware(self.factory.get(avatars.avatar_storage.url(name)))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(b''.join(response.streaming_content), b'avatar')
+
+    def test_other_files(self):
+        """
+        Checks whether other files keep the default lifetime and new ones are not looked up.
+        """
+        response = self.middleware(self.factory.get('/static/style.css'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+        avatars.avatar_storage.save('avatar.png', ContentFile(b'avatar'))
+        os.rename(
+            os.path.join(settings.MEDIA_ROOT, 'static', 'style.css'),
+            os.path.join(settings.MEDIA_ROOT, 'static', 'new.css'),
+        )
+        response = self.middleware(self.factory.get('/static/new.css'))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,186 @@
+from concurrent.futures import Future
+from unittest import mock
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from common.test_utils import create_author
+from core import passwords
+from library.models import Author
+
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+class SetUpData(TestCase):
+
+    def setUp(self):
+        self.password = 'v3k8q2mz'
+        self.author = create_author('author', self.password)
+
+    def hold_upgrades(self):
+        """
+        Returns a patcher keeping new hashes of upgrades in a future
+        completed by the test, and the list of such futures.
+        """
+        submit = passwords.submit
+        held = []
+
+        def hold(function, *args, wait=True):
+            if function is passwords._make_password and not wait:
+                held.append(Future())
+                return held[-1]
+            return submit(function, *args, wait=wait)
+
+        return mock.patch.object(passwords, 'submit', hold), held
+
+    def set_outdated_password(self):
+        """
+        Stores the password hashed with fewer iterations than the current default.
+        """
+        self.author.password = PBKDF2PasswordHasher().encode(self.password, 'outdatedsalt', iterations=1000)
+        self.author.save()
+        return self.author.password
+
+
+class PasswordPoolTests(SetUpData):
+
+    def test_hash_in_pool(self):
+        """
+        Checks whether passwords hashed in worker processes are verified by Django.
+        """
+        encoded = passwords.make_password(self.password)
+        self.assertTrue(check_password(self.password, encoded))
+        self.assertTrue(passwords.check_password(self.password, encoded))
+        self.assertFalse(passwords.check_password('wrong password', encoded))
+
+    @override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+    def test_hashers_of_calling_process(self):
+        """
+        Checks whether worker processes use hashers of the calling process.
+        """
+        self.assertTrue(passwords.make_password(self.password).startswith('md5$'))
+
+    @override_settings(PASSWORD_HASHING_WORKERS=1, PASSWORD_HASHING_QUEUE_SIZE=0, PASSWORD_HASHING_TIMEOUT=0)
+    def test_busy(self):
+        """
+        Checks whether hashing fails fast when the queue is full and 503 is returned.
+        """
+        _, slots = passwords.get_pool()
+        slots.acquire()
+        try:
+            with self.assertRaises(passwords.PasswordHashingBusy):
+                passwords.make_password(self.password)
+
+            response = self.client.post(
+                reverse('library:user-login'), {'username': 'author', 'password': self.password}
+            )
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            response = self.client.post('/api/authors/', {
+                'user_name': 'new author', 'email': 'new@ex.com', 'password': 'n3w8q2mz',
+            })
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.assertEqual(response.data['detail'].code, 'password_hashing_busy')
+        finally:
+            slots.release()
+        self.assertTrue(check_password(self.password, passwords.make_password(self.password)))
+
+    @override_settings(PASSWORD_HASHING_RESULT_TIMEOUT=0)
+    def test_result_timeout(self):
+        """
+        Checks whether waiting too long for a hash fails like a full queue.
+        """
+        with mock.patch.object(passwords, 'submit', side_effect=lambda *args, **kwargs: Future()):
+            with self.assertRaises(passwords.PasswordHashingBusy):
+                passwords.make_password(self.password)
+            response = self.client.post(
+                reverse('library:user-login'), {'username': 'author', 'password': self.password}
+            )
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+@override_settings(PASSWORD_HASHING_WORKERS=0)
+class RehashTests(SetUpData):
+
+    def test_outdated_hash_upgraded(self):
+        """
+        Checks whether an outdated hash of a correct password is upgraded in the database and the instance.
+        """
+        outdated = self.set_outdated_password()
+        self.assertTrue(self.author.check_password(self.password))
+        upgraded = Author.objects.get(pk=self.author.pk).password
+        self.assertNotEqual(upgraded, outdated)
+        self.assertTrue(check_password(self.password, upgraded))
+        self.assertEqual(self.author.password, upgraded)
+
+    def test_upgrade_in_background(self):
+        """
+        Checks whether the check returns before the new hash is stored.
+        """
+        outdated = self.set_outdated_password()
+        patcher, held = self.hold_upgrades()
+        with patcher:
+            self.assertTrue(self.author.check_password(self.password))
+        self.assertEqual(Author.objects.get(pk=self.author.pk).password, outdated)
+        held[0].set_result(passwords.make_password(self.password))
+        upgraded = Author.objects.get(pk=self.author.pk).password
+        self.assertNotEqual(upgraded, outdated)
+        self.assertTrue(check_password(self.password, upgraded))
+        self.assertTrue(self.author.password_upgrade.result())
+
+    def test_wrong_password_not_upgraded(self):
+        """
+        Checks whether a wrong password neither verifies nor changes the hash.
+        """
+        outdated = self.set_outdated_password()
+        self.assertFalse(self.author.check_password('wrong password'))
+        self.assertEqual(Author.objects.get(pk=self.author.pk).password, outdated)
+
+    def test_changed_password_not_overwritten(self):
+        """
+        Checks whether an upgrade does not overwrite a password changed in the meantime.
+        """
+        self.set_outdated_password()
+        stale = Author.objects.get(pk=self.author.pk)
+        self.author.set_password('n3w8q2mz')
+        self.author.save()
+        self.assertTrue(stale.check_password(self.password))
+        self.assertTrue(Author.objects.get(pk=self.author.pk).check_password('n3w8q2mz'))
+
+    def test_session_survives_upgrade(self):
+        """
+        Checks whether a session started with an outdated hash stays valid after the upgrade.
+        """
+        self.set_outdated_password()
+        response = self.client.post(
+            reverse('library:user-login'), {'username': 'author', 'password': self.password}
+        )
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertNotEqual(Author.objects.get(pk=self.author.pk).password, self.author.password)
+        response = self.client.get(reverse('library:index'))
+        self.assertTrue(response.wsgi_request.user.is_authenticated)
+
+    def test_session_survives_background_upgrade(self):
+        """
+        Checks whether a session started before the new hash is stored stays valid.
+        """
+        outdated = self.set_outdated_password()
+        patcher, held = self.hold_upgrades()
+        with patcher:
+            response = self.client.post(
+                reverse('library:user-login'), {'username': 'author', 'password': self.password}
+            )
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        held[0].set_result(passwords.make_password(self.password))
+        self.assertNotEqual(Author.objects.get(pk=self.author.pk).password, outdated)
+        response = self.client.get(reverse('library:index'))
+        self.assertTrue(response.wsgi_request.user.is_authenticated)
+
+    def test_password_change_ends_sessions(self):
+        """
+        Checks whether setting a new password changes the session hash.
+        """
+        session_hash = self.author.get_session_auth_hash()
+        self.author.set_password(self.password)
+        self.assertNotEqual(self.author.get_session_auth_hash(), session_hash)
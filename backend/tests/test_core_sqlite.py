@@ -0,0 +1,54 @@
+import os
+import sqlite3
+import tempfile
+
+from django.db import connection
+from django.db.utils import load_backend
+from django.test import SimpleTestCase
+
+
+class SetUpData(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_dict = {
+            **connection.settings_dict,
+            'ENGINE': 'core.sqlite3',
+            'NAME': os.path.join(directory.name, 'db.sqlite3'),
+            'OPTIONS': {
+                'timeout': 20,
+                'transaction_mode': 'IMMEDIATE',
+                'pragmas': {'journal_mode': 'WAL', 'synchronous': 'NORMAL'},
+            },
+        }
+        self.connection = load_backend('core.sqlite3').DatabaseWrapper(settings_dict, alias='profile')
+        self.addCleanup(self.connection.close)
+
+    def fetch(self, sql: str):
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql)
+            return cursor.fetchone()[0]
+
+
+class ProductionSQLiteBackendTests(SetUpData):
+
+    def test_pragmas_applied(self):
+        """
+        Checks whether pragmas from OPTIONS are run on a new connection.
+        """
+        self.assertEqual(self.fetch('PRAGMA journal_mode'), 'wal')
+        self.assertEqual(self.fetch('PRAGMA synchronous'), 1)
+        self.assertEqual(self.fetch('PRAGMA busy_timeout'), 20000)
+
+    def test_immediate_transactions(self):
+        """
+        Checks whether transactions take the write lock when they begin.
+        """
+        self.connection.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+        other = sqlite3.connect(self.connection.settings_dict['NAME'], timeout=0)
+        self.addCleanup(other.close)
+        with self.assertRaisesMessage(sqlite3.OperationalError, 'database is locked'):
+            other.execute('BEGIN IMMEDIATE')
+        self.connection.rollback()
+        self.connection.set_autocommit(True)
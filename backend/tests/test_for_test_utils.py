@@ -11,6 +11,7 @@ from common.test_utils import (
     create_tag,
     create_superuser,
     serialize_article,
+    serialize_article_summary,
     serialize_author,
     serialize_tag,
 )
@@ -39,6 +40,7 @@ class SetUpData(TestCase):
         self.serialized_test_author = serialize_author(self.test_author)
         self.serialized_test_tag = serialize_tag(self.test_tag)
         self.serialized_test_article = serialize_article(self.test_article)
+        self.summarized_test_article = serialize_article_summary(self.test_article)
 
 
 class UtilsTests(SetUpData):
@@ -128,3 +130,12 @@ class UtilsTests(SetUpData):
         self.assertEqual(self.serialized_test_article['url'], expect['url'])
         self.assertEqual(self.serialized_test_article['author'], expect['author'])
         self.assertEqual(self.serialized_test_article['tags'],expect['tags'])
+
+    def test_serialize_article_summary(self):
+        """
+        Checks whether serialize_article_summary function propertly adds absolute urls.
+        """
+        self.assertEqual(self.summarized_test_article['url'], 'http://testserver/api/articles/test_title/')
+        self.assertEqual(self.summarized_test_article['author'], 'http://testserver/api/authors/test_author/')
+        self.assertEqual(self.summarized_test_article['tags'], ['http://testserver/api/tags/test_tag/'])
+        self.assertEqual(self.summarized_test_article['excerpt'], 'test_content')
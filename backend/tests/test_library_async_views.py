@@ -0,0 +1,126 @@
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import Http404
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from common.test_utils import create_article, create_author, create_tag
+from library import tag_index, views
+
+
+class SetUpData(TestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.author = create_author('author', 'h3k9v2xq')
+        self.tag = create_tag('test tag')
+        self.article = create_article(
+            title='article title',
+            author=self.author,
+            tags=[self.tag],
+            pub_date=timezone.now() - timedelta(days=1),
+            content='article content'
+        )
+        create_article(
+            title='future article',
+            author=self.author,
+            tags=[self.tag],
+            pub_date=timezone.now() + timedelta(days=1),
+            content='future content'
+        )
+        self.pages = (
+            (views.ArticleListView, views.AsyncArticleListView, '/articles/', {}),
+            (views.ArticleListView, views.AsyncArticleListView, f'/articles/?tags={self.tag.slug}', {}),
+            (views.ArticleDetailView, views.AsyncArticleDetailView, '/article/', {'slug': self.article.slug}),
+            (views.AuthorListView, views.AsyncAuthorListView, '/authors/', {}),
+            (views.AuthorDetailView, views.AsyncAuthorDetailView, '/author/', {'slug': self.author.slug}),
+            (views.TagListView, views.AsyncTagListView, '/tags/', {}),
+            (views.TagDetailView, views.AsyncTagDetailView, '/tag/', {'slug': self.tag.slug}),
+        )
+
+    def get(self, view_class, path: str, headers: dict | None = None, **kwargs):
+        cache.clear()
+        request = self.factory.get(path, headers=headers)
+        request.user = AnonymousUser()
+
+        async def auser():
+            return request.user
+
+        request.auser = auser
+        view = view_class.as_view()
+        if view_class.view_is_async:
+            view = async_to_sync(view)
+        response = view(request, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+
+class AsyncReadViewTests(SetUpData):
+
+    def test_views_are_async(self):
+        """
+        Checks whether async read views have only async handlers.
+        """
+        for _, async_view, _, _ in self.pages:
+            with self.subTest(view=async_view.__name__):
+                self.assertTrue(async_view.view_is_async)
+
+    def test_same_pages_as_sync_views(self):
+        """
+        Checks whether async views render the same pages with the same ETags as sync views.
+        """
+        for sync_view, async_view, path, kwargs in self.pages:
+            with self.subTest(view=async_view.__name__):
+                expected = self.get(sync_view, path, **kwargs)
+                response = self.get(async_view, path, **kwargs)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.content, expected.content)
+                self.assertEqual(response.get('ETag'), expected.get('ETag'))
+
+    def test_not_modified(self):
+        """
+        Checks whether async views answer a matching ETag with 304.
+        """
+        for _, async_view, path, kwargs in self.pages:
+            etag = self.get(async_view, path, **kwargs).get('ETag')
+            if etag is None:
+                continue
+            with self.subTest(view=async_view.__name__):
+                response = self.get(async_view, path, headers={'If-None-Match': etag}, **kwargs)
+                self.assertEqual(response.status_code, 304)
+
+    def test_missing_objects(self):
+        """
+        Checks whether async detail views raise 404 for unknown and unpublished objects.
+        """
+        for view_class in (views.AsyncArticleDetailView, views.AsyncAuthorDetailView, views.AsyncTagDetailView):
+            with self.subTest(view=view_class.__name__):
+                with self.assertRaises(Http404):
+                    self.get(view_class, '/missing/', slug='missing')
+        with self.assertRaises(Http404):
+            self.get(views.AsyncArticleDetailView, '/article/', slug='future-article')
+
+    @override_settings(SINGLE_PROCESS=True)
+    def test_tag_filter_uses_loaded_index(self):
+        """
+        Checks whether async lists filter by tags with the index loaded
+        before, even when another process changed tags meanwhile.
+        """
+        aget_index = tag_index.aget_index
+
+        async def aget_index_then_change():
+            index = await aget_index()
+            cache.incr(tag_index.VERSION_KEY)
+            return index
+
+        path = f'/articles/?tags={self.tag.slug}'
+        expected = self.get(views.ArticleListView, path)
+        with mock.patch.object(tag_index, 'aget_index', aget_index_then_change):
+            response = self.get(views.AsyncArticleListView, path)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, expected.content)
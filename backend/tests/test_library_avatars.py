@@ -0,0 +1,160 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from common.test_utils import create_author
+from library import avatars
+from library.models import Author
+
+
+def create_image(name: str, size: tuple[int, int], image_format: str = 'PNG') -> SimpleUploadedFile:
+    buffer = BytesIO()
+    Image.new('RGB', size, (200, 40, 40)).save(buffer, image_format)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f'image/{image_format.lower()}')
+
+
+class SetUpData(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.password = 'p4q8z2vm'
+        self.author = create_author('author', self.password)
+
+    def open_variant(self, name: str) -> Image.Image:
+        return Image.open(os.path.join(self.media_root, name))
+
+
+class AvatarVariantsTests(SetUpData):
+
+    def test_variants_of_upload(self):
+        """
+        Checks whether an uploaded avatar is cropped and recompressed into every variant.
+        """
+        self.author.avatar = create_image('avatar.png', (800, 600))
+        self.author.save()
+        self.assertEqual(set(self.author.avatar_variants), set(avatars.AVATAR_VARIANTS))
+        for variant, size in avatars.AVATAR_VARIANTS.items():
+            with self.subTest(variant=variant):
+                name = self.author.avatar_variants[variant]
+                self.assertTrue(name.startswith(f'{avatars.AVATAR_DIRECTORY}/'))
+                with self.open_variant(name) as image:
+                    self.assertEqual(image.format, avatars.VARIANT_FORMAT)
+                    self.assertEqual(image.size, (size, size))
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, self.author.avatar.name)))
+
+    def test_content_addressed(self):
+        """
+        Checks whether avatars are named by the hash of their content.
+        """
+        upload = create_image('Avatar.PNG', (100, 100))
+        digest = hashlib.sha256(upload.read()).hexdigest()
+        self.author.avatar = upload
+        self.author.save()
+        self.assertEqual(self.author.avatar.name, f'{avatars.AVATAR_DIRECTORY}/{digest[:2]}/{digest}.png')
+        with self.author.avatar.open('rb') as avatar:
+            self.assertEqual(hashlib.sha256(avatar.read()).hexdigest(), digest)
+
+    def test_identical_uploads_shared(self):
+        """
+        Checks whether identical avatars of different authors are stored once.
+        """
+        self.author.avatar = create_image('avatar.png', (300, 300))
+        self.author.save()
+        another_author = create_author('another author', self.password)
+        another_author.avatar = create_image('other name.png', (300, 300))
+        another_author.save()
+        self.assertEqual(another_author.avatar.name, self.author.avatar.name)
+        self.assertEqual(another_author.avatar_variants, self.author.avatar_variants)
+        directory = os.path.join(self.media_root, avatars.AVATAR_DIRECTORY)
+        files = [name for _, _, names in os.walk(directory) for name in names]
+        self.assertEqual(len(files), 1 + len(avatars.AVATAR_VARIANTS))
+
+    def test_small_upload_not_enlarged(self):
+        """
+        Checks whether variants are not larger than the uploaded avatar.
+        """
+        self.author.avatar = create_image('avatar.png', (100, 150))
+        self.author.save()
+        with self.open_variant(self.author.avatar_variants['small']) as image:
+            self.assertEqual(image.size, (64, 64))
+        with self.open_variant(self.author.avatar_variants['large']) as image:
+            self.assertEqual(image.size, (100, 100))
+
+    def test_default_avatar(self):
+        """
+        Checks whether the default avatar uses its variants shipped with static files.
+        """
+        self.assertEqual(self.author.avatar_variants, {})
+        for variant, url in self.author.avatar_urls.items():
+            with self.subTest(variant=variant):
+                name = avatars.get_variant_name(Author.DEFAULT_AVATAR, variant)
+                self.assertTrue(url.endswith(name))
+                self.assertTrue(os.path.exists(os.path.join(settings.BASE_DIR, name)))
+
+    def test_missing_variants(self):
+        """
+        Checks whether the original avatar stands in for variants not generated yet.
+        """
+        self.author.avatar = create_image('avatar.png', (300, 300))
+        self.author.save()
+        Author.objects.filter(pk=self.author.pk).update(avatar_variants={})
+        author = Author.objects.get(pk=self.author.pk)
+        self.assertEqual(set(author.avatar_urls.values()), {author.avatar.url})
+
+    def test_author_page(self):
+        """
+        Checks whether the author page shows the medium variant.
+        """
+        self.author.avatar = create_image('avatar.png', (800, 800))
+        self.author.save()
+        response = self.client.get(reverse('library:author-detail', args=(self.author.slug,)))
+        self.assertContains(response, f'src="{self.author.avatar_urls["medium"]}"')
+        self.assertContains(response, f'srcset="{self.author.avatar_urls["large"]} 2x"')
+
+    def test_registration_form(self):
+        """
+        Checks whether an avatar uploaded with the registration form gets variants.
+        """
+        response = self.client.post(reverse('library:user-register'), {
+            'user_name': 'newuser',
+            'email': 'newuser@ex.com',
+            'password': '4qa6gtv8o4',
+            'password2': '4qa6gtv8o4',
+            'avatar': create_image('avatar.jpg', (500, 500), 'JPEG'),
+        })
+        self.assertEqual(response.status_code, 302)
+        author = Author.objects.get(user_name='newuser')
+        self.assertEqual(set(author.avatar_variants), set(avatars.AVATAR_VARIANTS))
+
+    def test_api(self):
+        """
+        Checks whether an avatar uploaded through the API gets variants returned as absolute URLs.
+        """
+        client = APIClient()
+        client.force_authenticate(self.author)
+        response = client.patch(
+            f'/api/authors/{self.author.slug}/',
+            {'avatar': create_image('avatar.png', (500, 500))},
+            format='multipart',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.author.refresh_from_db()
+        self.assertEqual(set(self.author.avatar_variants), set(avatars.AVATAR_VARIANTS))
+        self.assertEqual(
+            response.json()['avatar_variants'],
+            {variant: f'http://testserver{url}' for variant, url in self.author.avatar_urls.items()},
+        )
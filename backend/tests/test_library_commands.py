@@ -0,0 +1,213 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from common.test_utils import create_article, create_author, create_tag
+from library import avatars, rendering
+from library.models import Article, Author, RelatedArticle, SimilarArticle
+
+
+class SetUpData(TestCase):
+
+    def setUp(self):
+        self.author = create_author('author', '48s5tb4w3')
+        self.tag = create_tag('tag')
+        self.article = create_article(
+            title='article title',
+            author=self.author,
+            pub_date=timezone.now() - timedelta(hours=1),
+            tags=[self.tag],
+            content='article content'
+        )
+
+
+class RebuildVerifiedArticlesTests(SetUpData):
+
+    def test_backfills_verified_flag(self):
+        """
+        Checks whether command restores `is_verified` of existing articles.
+        """
+        Article.objects.update(is_verified=False)
+        out = StringIO()
+        call_command('rebuild_verified_articles', stdout=out)
+        self.article.refresh_from_db()
+        self.assertTrue(self.article.is_verified)
+        self.assertIn('1 of them are verified', out.getvalue())
+
+
+class ExportNDJSONTests(SetUpData):
+
+    def test_exports_articles(self):
+        """
+        Checks whether command writes one JSON line per verified article.
+        """
+        out = StringIO()
+        call_command('export_ndjson', 'articles', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['slug'], self.article.slug)
+
+    def test_invalid_since(self):
+        """
+        Checks whether command fails on invalid `since` timestamp.
+        """
+        with self.assertRaises(CommandError):
+            call_command('export_ndjson', 'articles', since='yesterday', stdout=StringIO())
+
+
+class ImportArticlesTests(SetUpData):
+
+    def test_imports_articles(self):
+        """
+        Checks whether command imports articles referencing authors by slug
+        and reports invalid lines.
+        """
+        lines = [
+            {'title': 'imported', 'content': 'content', 'tags': ['tag'], 'author': self.author.slug},
+            {'title': 'unknown author', 'content': 'content', 'tags': ['tag'], 'author': 'nobody'},
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as source:
+            source.write('\n'.join(json.dumps(line) for line in lines))
+        self.addCleanup(os.remove, source.name)
+
+        out, err = StringIO(), StringIO()
+        call_command('import_articles', source.name, batch_size=1, stdout=out, stderr=err)
+        self.assertTrue(Article.verified_objects.filter(slug='imported', author=self.author).exists())
+        self.assertIn('Imported 1 articles, 1 failed.', out.getvalue())
+        self.assertIn('Line 2', err.getvalue())
+
+
+class GenerateAvatarVariantsTests(SetUpData):
+
+    def test_backfills_variants(self):
+        """
+        Checks whether command generates variants of uploaded avatars only.
+        """
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with override_settings(MEDIA_ROOT=media_root):
+            image = Image.new('RGB', (300, 300))
+            path = os.path.join(media_root, 'avatar.png')
+            image.save(path)
+            create_author('default avatar', 'x7c4n2qp')
+            Author.objects.filter(pk=self.author.pk).update(avatar='avatar.png')
+
+            out = StringIO()
+            call_command('generate_avatar_variants', jobs=2, stdout=out)
+            self.author.refresh_from_db()
+            self.assertEqual(set(self.author.avatar_variants), set(avatars.AVATAR_VARIANTS))
+            self.assertTrue(all(
+                os.path.exists(os.path.join(media_root, name)) for name in self.author.avatar_variants.values()
+            ))
+            self.assertEqual(Author.objects.get(user_name='default avatar').avatar_variants, {})
+            self.assertIn('Generated avatar variants of 1 authors.', out.getvalue())
+
+
+class DeleteUnusedAvatarsTests(SetUpData):
+
+    def test_deletes_unused_files(self):
+        """
+        Checks whether command deletes old files not used by any author and keeps the rest.
+        """
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with override_settings(MEDIA_ROOT=media_root):
+            storage = avatars.avatar_storage
+            used = storage.save('used.png', ContentFile(b'used'))
+            variant = storage.save('used_small.webp', ContentFile(b'variant'))
+            unused = storage.save('unused.png', ContentFile(b'unused'))
+            recent = storage.save('recent.png', ContentFile(b'recent'))
+            legacy = f'{avatars.AVATAR_ROOT}/author/avatar.png'
+            default_storage.save(legacy, ContentFile(b'legacy'))
+            default = Author.DEFAULT_AVATAR
+            default_storage.save(default, ContentFile(b'default'))
+            Author.objects.filter(pk=self.author.pk).update(avatar=used, avatar_variants={'small': variant})
+            old = time.time() - 2 * 60 * 60
+            for name in (used, variant, unused, legacy, default):
+                os.utime(storage.path(name), (old, old))
+
+            out = StringIO()
+            call_command('delete_unused_avatars', dry_run=True, stdout=out)
+            self.assertTrue(storage.exists(unused))
+            self.assertIn(unused, out.getvalue())
+
+            out = StringIO()
+            call_command('delete_unused_avatars', stdout=out)
+            self.assertEqual(
+                [storage.exists(name) for name in (used, variant, recent, default, unused, legacy)],
+                [True, True, True, True, False, False],
+            )
+            self.assertIn('Deleted 2 unused avatar files.', out.getvalue())
+
+
+class RenderArticlesCommandTests(SetUpData):
+
+    def test_renders_outdated_articles(self):
+        """
+        Checks whether command renders only articles rendered by an older renderer version.
+        """
+        current = create_article(
+            title='current', author=self.author, tags=[self.tag], pub_date=timezone.now(), content='current',
+        )
+        Article.objects.filter(pk=self.article.pk).update(content_html='', content_html_version=0)
+        Article.objects.filter(pk=current.pk).update(content_html='kept')
+
+        out = StringIO()
+        call_command('render_articles', jobs=1, stdout=out)
+        self.assertIn('Rendered 1 articles.', out.getvalue())
+        article = Article.objects.get(pk=self.article.pk)
+        self.assertEqual(article.content_html, '<p>article content</p>\n')
+        self.assertEqual(article.content_html_version, rendering.RENDERER_VERSION)
+        self.assertGreater(article.modified, self.article.modified)
+        self.assertEqual(Article.objects.get(pk=current.pk).content_html, 'kept')
+
+
+class RebuildRelatedArticlesTests(SetUpData):
+
+    def test_rebuilds_index(self):
+        """
+        Checks whether command restores entries of articles sharing tags.
+        """
+        other = create_article(
+            title='other', author=self.author, tags=[self.tag], pub_date=timezone.now(), content='other',
+        )
+        RelatedArticle.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_related_articles', stdout=out)
+        self.assertIn('Rebuilt the related articles index with 2 entries.', out.getvalue())
+        self.assertEqual(
+            set(RelatedArticle.objects.values_list('article_id', 'related_id')),
+            {(self.article.pk, other.pk), (other.pk, self.article.pk)},
+        )
+
+
+class RebuildSimilarArticlesTests(SetUpData):
+
+    def test_rebuilds_index(self):
+        """
+        Checks whether command restores lists of articles with similar content.
+        """
+        other = create_article(
+            title='other article', author=self.author, tags=[self.tag], pub_date=timezone.now(), content='other',
+        )
+        SimilarArticle.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_similar_articles', stdout=out)
+        self.assertIn('Rebuilt the similar articles index of 2 articles with 2 entries.', out.getvalue())
+        self.assertEqual(
+            set(SimilarArticle.objects.values_list('article_id', 'similar_id')),
+            {(self.article.pk, other.pk), (other.pk, self.article.pk)},
+        )
@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from common.test_utils import create_article, create_author, create_tag
+
+
+class SetUpData(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = create_author('author', '7vq2ma8x')
+        self.tag = create_tag('test tag')
+        self.article = create_article(
+            title='article title',
+            author=self.author,
+            tags=[self.tag],
+            pub_date=timezone.now() - timedelta(days=1),
+            content='article content'
+        )
+        self.urls = (
+            reverse('library:article-list'),
+            reverse('library:article-detail', args=(self.article.slug,)),
+            reverse('library:author-detail', args=(self.author.slug,)),
+            reverse('library:tag-detail', args=(self.tag.slug,)),
+        )
+
+
+class ConditionalGetTests(SetUpData):
+
+    def test_matching_etag_not_modified(self):
+        """
+        Checks whether a request with a matching ETag gets 304 without rendering the page.
+        """
+        for url in self.urls:
+            with self.subTest(url=url):
+                cache.clear()
+                etag = self.client.get(url)['ETag']
+                cache.clear()
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.templates, [])
+
+    @override_settings(SINGLE_PROCESS=True)
+    def test_cached_page_not_modified(self):
+        """
+        Checks whether a cached page answers a matching ETag with 304 without queries.
+        """
+        for url in self.urls:
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(0):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_change_changes_etags(self):
+        """
+        Checks whether changing an article changes ETags of all pages displaying it.
+        """
+        etags = [self.client.get(url)['ETag'] for url in self.urls]
+        self.article.title = 'changed title'
+        self.article.save()
+        for url, etag in zip(self.urls, etags):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+    def test_article_last_modified(self):
+        """
+        Checks whether the article page sends Last-Modified and answers If-Modified-Since.
+        """
+        url = self.urls[1]
+        last_modified = self.client.get(url)['Last-Modified']
+        cache.clear()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
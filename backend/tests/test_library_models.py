@@ -13,8 +13,6 @@ class SetUpData(TestCase):
 
     def setUp(self):
         self.author = create_author('author', '48s5tb4w3')
-        self.avatar_filename = 'avatar.png'
-        self.expect_avatar_path = 'static/library/author/author/avatar.png'
         self.another_author = create_author('another_author', 'a49o7wg3qvf')
         self.superuser = create_superuser('superuser', 'aiuh3h347q')
 
@@ -74,11 +72,6 @@ class AuthorTests(SetUpData):
         """
         self.assertTrue(self.author.slug)
 
-    def test_create_avatar_path(self):
-        self.assertEqual(
-            self.author.create_avatar_path(self.avatar_filename), self.expect_avatar_path
-        )
-
     def test_default_avatar(self):
         """
         Checks whether default avatar is provided by default.
@@ -182,3 +175,62 @@ class ArticleTests(SetUpData):
         Checks whether tag_as_str() correctly returns tags as string.
         """
         self.assertEqual(self.article.tags_as_str(), 'another_tag, tag')
+
+    def test_verified_after_tags_set(self):
+        """
+        Checks whether article becomes verified once tags are related with it.
+        """
+        test_article = Article(
+            title='title', author=self.author, content='content'
+        )
+        test_article.save()
+        self.assertFalse(test_article.is_verified)
+        test_article.tags.set([self.tag])
+        test_article.refresh_from_db()
+        self.assertTrue(test_article.is_verified)
+
+    def test_not_verified_after_tags_clear(self):
+        """
+        Checks whether article stops being verified when all its tags are removed.
+        """
+        self.another_article.tags.clear()
+        self.another_article.refresh_from_db()
+        self.assertFalse(self.another_article.is_verified)
+
+    def test_not_verified_after_reverse_tags_clear(self):
+        """
+        Checks whether article stops being verified when its only tag
+        is cleared from the tag side.
+        """
+        self.yet_another_tag.articles.clear()
+        self.yet_another_article.refresh_from_db()
+        self.assertFalse(self.yet_another_article.is_verified)
+
+    def test_not_verified_after_tag_delete(self):
+        """
+        Checks whether article stops being verified when its only tag is deleted.
+        """
+        self.another_tag.delete()
+        self.article.refresh_from_db()
+        self.another_article.refresh_from_db()
+        self.assertTrue(self.article.is_verified)
+        self.assertFalse(self.another_article.is_verified)
+
+    def test_not_verified_after_content_removed(self):
+        """
+        Checks whether article stops being verified when its content is emptied.
+        """
+        self.article.content = ''
+        self.article.save(update_fields=['content'])
+        self.article.refresh_from_db()
+        self.assertFalse(self.article.is_verified)
+
+    def test_verified_objects(self):
+        """
+        Checks whether verified_objects returns only verified published articles.
+        """
+        Article.objects.filter(pk=self.article.pk).update(is_verified=False)
+        self.assertQuerySetEqual(
+            Article.verified_objects.all(),
+            [self.yet_another_article, self.another_article]
+        )
@@ -0,0 +1,195 @@
+import gzip
+import time
+from datetime import timedelta
+from unittest import mock
+
+import brotli
+
+from django.core.cache import cache
+from django.core.checks import run_checks
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from common.test_utils import create_article, create_author, create_tag
+from library.models import Article
+from library.views import ArticleDetailView
+
+
+@override_settings(SINGLE_PROCESS=True)
+class SetUpData(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = create_author('author', '48s5tb4w3')
+        self.tag = create_tag('test tag')
+        self.another_tag = create_tag('another tag')
+        self.article = create_article(
+            title='article title',
+            author=self.author,
+            tags=[self.tag],
+            pub_date=timezone.now() - timedelta(days=1),
+            content='article content'
+        )
+        self.article_list_url = reverse('library:article-list')
+        self.article_detail_url = reverse('library:article-detail', args=(self.article.slug,))
+        self.author_detail_url = reverse('library:author-detail', args=(self.author.slug,))
+        self.tag_detail_url = reverse('library:tag-detail', args=(self.tag.slug,))
+        self.another_tag_detail_url = reverse('library:tag-detail', args=(self.another_tag.slug,))
+
+    def assertCached(self, url: str):
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+
+class PageCacheTests(SetUpData):
+
+    def test_anonymous_pages_cached(self):
+        """
+        Checks whether repeated anonymous requests are served without queries.
+        """
+        for url in (self.article_list_url, self.article_detail_url, self.author_detail_url, self.tag_detail_url):
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                response = self.assertCached(url)
+                self.assertEqual(response.content, first.content)
+
+    def test_logged_user_not_cached(self):
+        """
+        Checks whether pages are rendered for logged in users.
+        """
+        self.client.force_login(self.author)
+        self.client.get(self.article_list_url)
+        response = self.client.get(self.article_list_url)
+        self.assertTemplateUsed(response, 'library/article_list.html')
+
+    def test_article_change_invalidates_pages(self):
+        """
+        Checks whether changing an article invalidates pages displaying it.
+        """
+        for url in (self.article_list_url, self.article_detail_url, self.author_detail_url, self.tag_detail_url):
+            self.assertCached(url)
+        self.article.title = 'changed title'
+        self.article.save()
+        for url in (self.article_list_url, self.article_detail_url, self.author_detail_url, self.tag_detail_url):
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), 'changed title')
+
+    def test_change_during_render_not_cached(self):
+        """
+        Checks whether a page rendered while a displayed article changes is not stored.
+        """
+        get_context_data = ArticleDetailView.get_context_data
+
+        def change_article(view, **kwargs):
+            context = get_context_data(view, **kwargs)
+            Article.objects.get(pk=self.article.pk).save()
+            view.object.title = 'stale title'
+            return context
+
+        with mock.patch.object(ArticleDetailView, 'get_context_data', change_article):
+            self.assertContains(self.client.get(self.article_detail_url), 'stale title')
+        self.assertNotContains(self.client.get(self.article_detail_url), 'stale title')
+
+    def test_retagging_invalidates_tag_pages(self):
+        """
+        Checks whether adding and removing tags invalidates tag pages.
+        """
+        self.assertCached(self.tag_detail_url)
+        self.assertCached(self.another_tag_detail_url)
+        self.article.tags.set([self.another_tag])
+        self.assertNotContains(self.client.get(self.tag_detail_url), 'article title')
+        self.assertContains(self.client.get(self.another_tag_detail_url), 'article title')
+
+    def test_author_change_invalidates_article_page(self):
+        """
+        Checks whether renaming an author invalidates pages of its articles.
+        """
+        self.assertCached(self.article_detail_url)
+        self.author.user_name = 'renamed'
+        self.author.save()
+        self.assertContains(self.client.get(self.article_detail_url), 'renamed')
+
+    def test_tag_delete_invalidates_pages(self):
+        """
+        Checks whether deleting the only tag of an article removes it from the list.
+        """
+        self.assertCached(self.article_list_url)
+        self.tag.delete()
+        self.assertNotContains(self.client.get(self.article_list_url), 'article title')
+
+    def test_scheduled_article_expires_page(self):
+        """
+        Checks whether cached list expires when a scheduled article gets published.
+        """
+        create_article(
+            title='scheduled title',
+            author=self.author,
+            tags=[self.tag],
+            pub_date=timezone.now() + timedelta(hours=1),
+            content='scheduled content'
+        )
+        self.assertNotContains(self.assertCached(self.article_list_url), 'scheduled title')
+        later = timezone.now() + timedelta(hours=2)
+        with mock.patch('time.time', return_value=time.time() + 2 * 60 * 60), \
+                mock.patch('django.utils.timezone.now', return_value=later):
+            self.assertContains(self.client.get(self.article_list_url), 'scheduled title')
+
+
+class CompressedPageCacheTests(SetUpData):
+
+    def test_compressed_variants_served(self):
+        """
+        Checks whether cached pages are served compressed without compressing them again.
+        """
+        self.article.content = 'article content ' * 100
+        self.article.save()
+        identity = self.client.get(self.article_detail_url)
+        with mock.patch('core.compression.compress') as compress, self.assertNumQueries(0):
+            response = self.client.get(self.article_detail_url, HTTP_ACCEPT_ENCODING='br, gzip')
+            gzip_response = self.client.get(self.article_detail_url, HTTP_ACCEPT_ENCODING='gzip')
+        compress.assert_not_called()
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), identity.content)
+        self.assertEqual(gzip.decompress(gzip_response.content), identity.content)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(response['ETag'], f'W/{identity["ETag"]}')
+
+        response = self.client.get(
+            self.article_detail_url, HTTP_ACCEPT_ENCODING='br', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_small_pages_stored_once(self):
+        """
+        Checks whether no variants are stored for pages too small to be compressed.
+        """
+        with self.settings(COMPRESSION_MIN_SIZE=10 ** 6), mock.patch('core.compression.compress') as compress:
+            self.client.get(self.tag_detail_url, HTTP_ACCEPT_ENCODING='gzip')
+            response = self.client.get(self.tag_detail_url, HTTP_ACCEPT_ENCODING='gzip')
+        compress.assert_not_called()
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertNotIn('Accept-Encoding', response.get('Vary', ''))
+
+
+@override_settings(SINGLE_PROCESS=False)
+class ProcessLocalCacheTests(SetUpData):
+
+    def test_pages_not_cached(self):
+        """
+        Checks whether pages are rendered every time when processes do not share the cache.
+        """
+        self.client.get(self.article_detail_url)
+        response = self.client.get(self.article_detail_url)
+        self.assertTemplateUsed(response, 'library/article_detail.html')
+
+    def test_deploy_check_warns(self):
+        """
+        Checks whether the deployment check warns about a process-local cache.
+        """
+        self.assertIn('library.W001', [message.id for message in run_checks(include_deployment_checks=True)])
+        with self.settings(SINGLE_PROCESS=True):
+            self.assertNotIn('library.W001', [message.id for message in run_checks(include_deployment_checks=True)])
@@ -0,0 +1,205 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from common.test_utils import create_article, create_author, create_tag
+from library import related
+from library.importer import import_articles
+from library.models import Article, RelatedArticle
+
+
+class SetUpData(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = create_author('author', 'r8k2m4vq')
+        self.common = create_tag('common')
+        self.rare = create_tag('rare')
+        self.pub_date = timezone.now() - timedelta(days=1)
+
+    def create(self, title: str, tags: list) -> Article:
+        return create_article(
+            title=title, author=self.author, pub_date=self.pub_date, tags=tags, content=f'{title} content',
+        )
+
+    @staticmethod
+    def get_listed(article: Article) -> list[int]:
+        return list(
+            RelatedArticle.objects.filter(article=article).order_by(
+                '-score', '-related_id'
+            ).values_list('related_id', flat=True)
+        )
+
+
+class ScoringTests(SetUpData):
+
+    def test_rare_tags_weigh_more(self):
+        """
+        Checks whether sharing a rare tag scores higher than sharing a popular one.
+        """
+        article = self.create('article', [self.common, self.rare])
+        popular = [self.create(f'popular {index}', [self.common]) for index in range(3)]
+        rare = self.create('rare', [self.rare])
+
+        scores = related.get_scores(article.pk)
+        self.assertEqual(scores[rare.pk], round(related.get_weight(2), related.SCORE_DIGITS))
+        self.assertEqual(scores[popular[0].pk], round(related.get_weight(4), related.SCORE_DIGITS))
+        self.assertEqual(self.get_listed(article)[0], rare.pk)
+
+    def test_rebuild(self):
+        """
+        Checks whether rebuild stores best matches of every article with current weights.
+        """
+        articles = [self.create(f'article {index}', [self.common]) for index in range(4)]
+        articles.append(self.create('rare', [self.common, self.rare]))
+        RelatedArticle.objects.all().delete()
+
+        with mock.patch('library.related.INDEX_SIZE', 2):
+            self.assertEqual(related.rebuild(), 10)
+            for article in articles:
+                expected = [other_id for other_id, _ in related.get_best(related.get_scores(article.pk))]
+                self.assertEqual(self.get_listed(article), expected)
+
+
+class IncrementalUpdateTests(SetUpData):
+
+    def test_tags_added_and_removed(self):
+        """
+        Checks whether both articles list each other once they share a tag, and not after.
+        """
+        first = self.create('first', [self.common])
+        second = self.create('second', [self.rare])
+        self.assertEqual(RelatedArticle.objects.count(), 0)
+
+        second.tags.add(self.common)
+        self.assertEqual(self.get_listed(first), [second.pk])
+        self.assertEqual(self.get_listed(second), [first.pk])
+
+        self.common.articles.remove(second)
+        self.assertEqual(RelatedArticle.objects.count(), 0)
+
+    def test_full_list_refilled(self):
+        """
+        Checks whether a full list takes the best unlisted match when a listed article drops out.
+        """
+        with mock.patch('library.related.INDEX_SIZE', 2):
+            first, second, third, fourth = [self.create(f'article {index}', [self.common]) for index in range(4)]
+            # The second article was scored while the tag was rarer.
+            self.assertEqual(self.get_listed(first), [second.pk, third.pk])
+
+            third.tags.clear()
+            self.assertEqual(self.get_listed(third), [])
+            self.assertEqual(self.get_listed(first), [fourth.pk, second.pk])
+
+    def test_full_list_takes_better_match(self):
+        """
+        Checks whether a better match replaces the worst entry of a full list.
+        """
+        with mock.patch('library.related.INDEX_SIZE', 2):
+            first = self.create('first', [self.common, self.rare])
+            second, third = [self.create(f'article {index}', [self.common]) for index in range(2)]
+            fourth = self.create('fourth', [self.rare])
+            self.assertEqual(self.get_listed(first), [fourth.pk, second.pk])
+
+            fifth = self.create('fifth', [self.common])
+            self.assertNotIn(fifth.pk, self.get_listed(first))
+
+    def test_article_deleted(self):
+        """
+        Checks whether lists showing a deleted article are computed again.
+        """
+        with mock.patch('library.related.INDEX_SIZE', 1):
+            first, second, third = [self.create(f'article {index}', [self.common]) for index in range(3)]
+            self.assertEqual(self.get_listed(first), [second.pk])
+
+            second.delete()
+            self.assertEqual(self.get_listed(first), [third.pk])
+
+    def test_tag_deleted(self):
+        """
+        Checks whether articles stop listing each other when their only shared tag is deleted.
+        """
+        first = self.create('first', [self.common])
+        self.create('second', [self.common])
+        self.common.delete()
+        self.assertEqual(RelatedArticle.objects.count(), 0)
+        self.assertEqual(self.get_listed(first), [])
+
+    def test_import(self):
+        """
+        Checks whether imported articles are added to the index.
+        """
+        article = self.create('article', [self.common])
+        result = import_articles(
+            [{'title': 'imported', 'content': 'imported content', 'tags': ['common']}], author=self.author,
+        )
+        imported = Article.objects.get(slug=result.created[0])
+        self.assertEqual(self.get_listed(article), [imported.pk])
+        self.assertEqual(self.get_listed(imported), [article.pk])
+
+
+    def test_import_takes_better_match(self):
+        """
+        Checks whether imported articles replace worse entries of full lists only.
+        """
+        with mock.patch('library.related.INDEX_SIZE', 1):
+            first = self.create('first', [self.common, self.rare])
+            second = self.create('second', [self.common])
+            import_articles(
+                [{'title': 'close', 'content': 'close content', 'tags': ['common', 'rare']}], author=self.author,
+            )
+            close = Article.objects.get(title='close')
+            self.assertEqual(self.get_listed(first), [close.pk])
+            self.assertEqual(self.get_listed(second), [first.pk])
+            self.assertEqual(self.get_listed(close), [first.pk])
+
+
+class RelatedArticlesViewTests(SetUpData):
+
+    def setUp(self):
+        super().setUp()
+        self.article = self.create('article', [self.common, self.rare])
+        self.close_match = self.create('close match', [self.common, self.rare])
+        self.loose_match = self.create('loose match', [self.common])
+        self.scheduled = create_article(
+            title='scheduled', author=self.author, pub_date=timezone.now() + timedelta(days=1),
+            tags=[self.common, self.rare], content='scheduled content',
+        )
+
+    def test_detail_page(self):
+        """
+        Checks whether the detail page lists published related articles, best matches first.
+        """
+        response = self.client.get(reverse('library:article-detail', args=[self.article.slug]))
+        self.assertEqual(response.context['article'].related_articles, [self.close_match, self.loose_match])
+        self.assertContains(response, reverse('library:article-detail', args=[self.close_match.slug]))
+        self.assertNotContains(response, 'scheduled')
+
+    def test_cached_page_invalidated(self):
+        """
+        Checks whether the cached detail page is rendered again when a related article changes.
+        """
+        url = reverse('library:article-detail', args=[self.article.slug])
+        self.client.get(url)
+        self.close_match.title = 'renamed match'
+        self.close_match.save()
+        self.assertContains(self.client.get(url), 'renamed match')
+
+    def test_api_field(self):
+        """
+        Checks whether the API detail returns URLs of related articles, best matches first.
+        """
+        response = self.client.get(f'/api/articles/{self.article.slug}/')
+        self.assertEqual(
+            response.data['related_articles'],
+            [
+                f'http://testserver/api/articles/{self.close_match.slug}/',
+                f'http://testserver/api/articles/{self.loose_match.slug}/',
+            ],
+        )
+        response = self.client.get(f'/api/articles/{self.article.slug}/', {'omit': 'related_articles'})
+        self.assertNotIn('related_articles', response.data)
@@ -0,0 +1,142 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from common.test_utils import create_article, create_author, create_tag
+from library import rendering
+from library.importer import import_articles
+from library.models import Article
+
+
+class SetUpData(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = create_author('author', 'm4x9q2kv')
+        self.tag = create_tag('tag')
+        self.article = create_article(
+            title='article title',
+            author=self.author,
+            tags=[self.tag],
+            pub_date=timezone.now() - timedelta(days=1),
+            content='Some **bold** text.\n\n<script>alert(1)</script> [link](javascript:alert(1))',
+        )
+
+
+class RenderOnWriteTests(SetUpData):
+
+    def test_rendered_on_save(self):
+        """
+        Checks whether content is rendered to sanitized HTML when an article is saved.
+        """
+        article = Article.objects.get(pk=self.article.pk)
+        self.assertIn('<strong>bold</strong>', article.content_html)
+        self.assertIn('&lt;script&gt;', article.content_html)
+        self.assertNotIn('href="javascript:', article.content_html)
+        self.assertEqual(article.content_html_version, rendering.RENDERER_VERSION)
+
+    def test_rendered_only_when_content_changes(self):
+        """
+        Checks whether content is rendered again only when it or the renderer version changes.
+        """
+        article = Article.objects.get(pk=self.article.pk)
+        with mock.patch('library.rendering.render', return_value='<p>new</p>') as render:
+            article.title = 'new title'
+            article.save()
+            render.assert_not_called()
+
+            article.content = 'new content'
+            article.save(update_fields=['content'])
+            self.assertEqual(render.call_count, 1)
+            article.save()
+            self.assertEqual(render.call_count, 1)
+
+            with mock.patch('library.rendering.RENDERER_VERSION', rendering.RENDERER_VERSION + 1):
+                Article.objects.get(pk=self.article.pk).save()
+            self.assertEqual(render.call_count, 2)
+        self.assertEqual(Article.objects.get(pk=self.article.pk).content_html, '<p>new</p>')
+
+    def test_imported_articles_rendered(self):
+        """
+        Checks whether imported articles are stored with rendered content.
+        """
+        import_articles([{'title': 'imported', 'content': '# Heading', 'tags': ['tag']}], author=self.author)
+        article = Article.objects.get(slug='imported')
+        self.assertEqual(article.content_html, '<h1>Heading</h1>\n')
+        self.assertEqual(article.content_html_version, rendering.RENDERER_VERSION)
+
+
+class ServeStoredHTMLTests(SetUpData):
+
+    def test_detail_page(self):
+        """
+        Checks whether the article page shows the stored HTML without rendering it.
+        """
+        with mock.patch('library.rendering.render') as render:
+            response = self.client.get(reverse('library:article-detail', args=(self.article.slug,)))
+        render.assert_not_called()
+        self.assertContains(response, '<strong>bold</strong>', html=False)
+        self.assertNotContains(response, '<script>')
+
+    def test_api_opt_in(self):
+        """
+        Checks whether the API returns the stored HTML only when requested.
+        """
+        url = f'/api/articles/{self.article.slug}/'
+        self.assertNotIn('content_html', self.client.get(url).data)
+        self.assertNotIn('content_html_version', self.client.get(url).data)
+        response = self.client.get(url, {'include': 'content_html'})
+        self.assertEqual(response.data['content_html'], self.article.content_html)
+        response = self.client.get('/api/articles/', {'include': 'content_html'})
+        self.assertNotIn('content_html', response.data['results'][0])
+
+
+class ArticleSummaryTests(SetUpData):
+
+    def test_excerpt_and_word_count(self):
+        """
+        Checks whether a plain text excerpt and the word count are stored when an article is saved.
+        """
+        self.article.content = '# Title\n\n' + ' '.join(f'*word{number}*' for number in range(60))
+        self.article.save()
+        article = Article.objects.get(pk=self.article.pk)
+        self.assertEqual(article.word_count, 61)
+        self.assertEqual(article.excerpt, 'Title ' + ' '.join(f'word{number}' for number in range(39)) + '…')
+
+    def test_api_list(self):
+        """
+        Checks whether the API lists articles with excerpts and without content,
+        which is returned by the detail.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/articles/')
+        listed, = response.data['results']
+        self.assertNotIn('content', listed)
+        self.assertEqual(listed['excerpt'], self.article.excerpt)
+        self.assertEqual(listed['word_count'], 5)
+        self.assertIn('<script>', listed['excerpt'])
+        self.assertFalse(any('"content"' in query['sql'] for query in queries))
+        response = self.client.get(f'/api/articles/{self.article.slug}/')
+        self.assertEqual(response.data['content'], self.article.content)
+
+    def test_list_pages(self):
+        """
+        Checks whether pages listing articles do not load content.
+        """
+        urls = [
+            reverse('library:article-list'),
+            reverse('library:article-search') + '?q=bold',
+            reverse('library:author-detail', args=(self.author.slug,)),
+            reverse('library:tag-detail', args=(self.tag.slug,)),
+        ]
+        for url in urls:
+            with self.subTest(url=url), CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+                self.assertContains(response, self.article.title)
+                self.assertFalse(any('"library_article"."content"' in query['sql'] for query in queries))
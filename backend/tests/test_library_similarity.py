@@ -0,0 +1,184 @@
+import math
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from common.test_utils import create_article, create_author, create_tag, serialize_article_summary
+from library import similarity
+from library.importer import import_articles
+from library.models import Article, ArticleTerm, SimilarArticle, Tag, Term
+
+
+class SetUpData(APITestCase):
+
+    def setUp(self):
+        self.author = create_author('author', 'k3v8q2mz')
+        self.pub_date = timezone.now() - timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.decorators = self.create(
+                'Python decorators', 'Decorators wrap functions in Python, decorators return wrapped functions.',
+                'python',
+            )
+            self.wrappers = self.create(
+                'Wrapping functions', 'Wrapped functions keep names when decorators use functools wraps.', 'style',
+            )
+            self.tomatoes = self.create(
+                'Growing tomatoes', 'Tomatoes need sun and water, plant tomatoes in spring.', 'python',
+            )
+
+    def create(self, title: str, content: str, tag: str) -> Article:
+        return create_article(
+            title=title, author=self.author, pub_date=self.pub_date, tags=[Tag.objects.get_or_create(name=tag)[0]],
+            content=content,
+        )
+
+    @staticmethod
+    def get_listed(article: Article) -> list[int]:
+        return list(
+            SimilarArticle.objects.filter(article=article).order_by(
+                '-score', '-similar_id'
+            ).values_list('similar_id', flat=True)
+        )
+
+
+class VectorTests(SetUpData):
+
+    def test_terms(self):
+        """
+        Checks whether stop words, short words and numbers are left out and title words count more.
+        """
+        terms = similarity.get_terms('Python tips', 'The python is an animal, 42 of them and more.')
+        self.assertEqual(terms, {'python': 4, 'tips': 3, 'animal': 1})
+
+    def test_vector(self):
+        """
+        Checks whether vectors have unit length, at most `MAX_TERMS` terms and rare terms weigh more.
+        """
+        counts = similarity.get_terms('', ' '.join(f'word{chr(97 + index % 26) * (index // 26 + 1)}' for index in range(50)))
+        vector = similarity.get_vector(counts, {}, 10)
+        self.assertEqual(len(vector), similarity.MAX_TERMS)
+
+        vector = similarity.get_vector({'rare': 1, 'common': 1}, {'rare': 1, 'common': 9}, 10)
+        self.assertAlmostEqual(math.sqrt(sum(weight * weight for weight in vector.values())), 1)
+        self.assertGreater(vector['rare'], vector['common'])
+
+
+class SimilarityIndexTests(SetUpData):
+
+    def test_similar_content_across_tags(self):
+        """
+        Checks whether articles sharing words are listed regardless of their tags.
+        """
+        self.assertEqual(self.get_listed(self.decorators), [self.wrappers.pk])
+        self.assertEqual(self.get_listed(self.wrappers), [self.decorators.pk])
+        self.assertEqual(self.get_listed(self.tomatoes), [])
+
+    def test_content_edited(self):
+        """
+        Checks whether lists follow an article whose content moves to another topic and back.
+        """
+        self.tomatoes.content = 'Tomatoes and decorators: wrap functions like tomatoes.'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tomatoes.save()
+        self.assertIn(self.tomatoes.pk, self.get_listed(self.decorators))
+
+        self.tomatoes.content = 'Tomatoes need sun and water.'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tomatoes.save()
+        self.assertEqual(self.get_listed(self.decorators), [self.wrappers.pk])
+        self.assertEqual(self.get_listed(self.tomatoes), [])
+
+    def test_other_fields_saved(self):
+        """
+        Checks whether saving fields other than title and content leaves the index and frequencies alone.
+        """
+        frequencies = dict(Term.objects.values_list('name', 'articles'))
+        entries = set(SimilarArticle.objects.values_list('pk', flat=True))
+        article = Article.objects.get(pk=self.decorators.pk)
+        article.pub_date = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            article.save(update_fields=['pub_date'])
+            article.save()
+            self.decorators.save()
+        self.assertEqual(dict(Term.objects.values_list('name', 'articles')), frequencies)
+        self.assertEqual(Term.objects.get(name='functions').articles, 2)
+        self.assertEqual(set(SimilarArticle.objects.values_list('pk', flat=True)), entries)
+
+    def test_indexed_after_commit(self):
+        """
+        Checks whether articles saved in a transaction are indexed together once it commits.
+        """
+        self.tomatoes.content = 'Tomatoes and decorators: wrap functions like tomatoes.'
+        self.wrappers.title = 'Wrapping tomatoes'
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.tomatoes.save()
+            self.wrappers.save()
+        self.assertNotIn(self.tomatoes.pk, self.get_listed(self.decorators))
+
+        callbacks[0]()
+        self.assertIn(self.tomatoes.pk, self.get_listed(self.decorators))
+        self.assertIn(self.tomatoes.pk, self.get_listed(self.wrappers))
+        with self.assertNumQueries(0):
+            for callback in callbacks[1:]:
+                callback()
+
+    def test_article_deleted(self):
+        """
+        Checks whether lists showing a deleted article are computed again.
+        """
+        self.wrappers.delete()
+        self.assertEqual(SimilarArticle.objects.count(), 0)
+
+    def test_import(self):
+        """
+        Checks whether imported articles are indexed and listed by similar articles.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            result = import_articles(
+                [{'title': 'Decorators', 'content': 'Class decorators wrap functions.', 'tags': ['misc']}],
+                author=self.author,
+            )
+        imported = Article.objects.get(slug=result.created[0])
+        self.assertIn(imported.pk, self.get_listed(self.decorators))
+        self.assertEqual(set(self.get_listed(imported)), {self.decorators.pk, self.wrappers.pk})
+        self.assertEqual(Term.objects.get(name='functions').articles, 3)
+
+    def test_rebuild(self):
+        """
+        Checks whether rebuild counts frequencies again and stores vectors and lists of all articles.
+        """
+        Term.objects.all().delete()
+        ArticleTerm.objects.all().delete()
+        SimilarArticle.objects.all().delete()
+
+        self.assertEqual(similarity.rebuild(), (3, 2))
+        self.assertEqual(Term.objects.get(name='functions').articles, 2)
+        self.assertEqual(self.get_listed(self.decorators), [self.wrappers.pk])
+        self.assertEqual(
+            similarity.get_scores(self.decorators.pk)[self.wrappers.pk],
+            similarity.get_scores(self.wrappers.pk)[self.decorators.pk],
+        )
+
+
+class SimilarArticlesEndpointTests(SetUpData):
+
+    def test_similar(self):
+        """
+        Checks whether the endpoint lists summaries of published similar articles, best matches first.
+        """
+        create_article(
+            title='Scheduled decorators', author=self.author, pub_date=timezone.now() + timedelta(days=1),
+            tags=[create_tag('future')], content='Decorators wrap functions.',
+        )
+        response = self.client.get(f'/api/articles/{self.decorators.slug}/similar/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [serialize_article_summary(self.wrappers)])
+
+    def test_not_found(self):
+        """
+        Checks whether the endpoint returns 404 for unknown articles.
+        """
+        response = self.client.get('/api/articles/unknown/similar/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,169 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import IntegrityError
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from common.test_utils import create_article, create_author, create_tag
+from library import slugs
+from library.importer import import_articles
+from library.models import Article, Tag
+
+
+class SetUpData(APITestCase):
+
+    def setUp(self):
+        self.author = create_author('author', 'k2v9q4xm')
+        self.tag = create_tag('tag')
+        self.article = create_article(
+            title='Article title',
+            author=self.author,
+            tags=[self.tag],
+            pub_date=timezone.now() - timedelta(days=1),
+            content='article content',
+        )
+
+
+class AllocateSlugsTests(SetUpData):
+
+    def test_collisions_in_batch(self):
+        """
+        Checks whether values with the same slug get numbered ones.
+        """
+        self.assertEqual(
+            slugs.allocate_slugs(Tag, ['New tag', 'new tag!', 'New-Tag', 'other']),
+            ['new-tag', 'new-tag-2', 'new-tag-3', 'other'],
+        )
+
+    def test_collisions_in_database(self):
+        """
+        Checks whether slugs taken in the database are skipped and the first free number is used.
+        """
+        for name in ('c', 'c-2', 'c-4', 'c-sharp'):
+            Tag.objects.create(name=name, slug=name)
+        self.assertEqual(slugs.allocate_slugs(Tag, ['C', 'C++', 'c sharp']), ['c-3', 'c-5', 'c-sharp-2'])
+
+    def test_numbered_slug_taken_for_repeated_base(self):
+        """
+        Checks whether values repeated in a batch skip numbered slugs taken
+        in the database while their base is free.
+        """
+        Tag.objects.create(name='go 2', slug='go-2')
+        self.assertEqual(slugs.allocate_slugs(Tag, ['Go', 'go!', 'GO']), ['go', 'go-3', 'go-4'])
+
+    def test_one_lookup_per_batch(self):
+        """
+        Checks whether a batch is allocated with one query, and one more when any base is taken or repeated.
+        """
+        names = [f'name {number}' for number in range(300)]
+        with self.assertNumQueries(1):
+            slugs.allocate_slugs(Tag, names)
+        with self.assertNumQueries(2):
+            slugs.allocate_slugs(Tag, [*names, 'tag'])
+        with self.assertNumQueries(2):
+            slugs.allocate_slugs(Tag, [*names, 'name 0'])
+
+    def test_long_values(self):
+        """
+        Checks whether numbered slugs of long values fit into the slug field.
+        """
+        title = 'a' * 300
+        Tag.objects.create(name='long', slug='a' * 250)
+        slug, = slugs.allocate_slugs(Tag, [title])
+        self.assertEqual(len(slug), 250)
+        self.assertTrue(slug.endswith('a-2'))
+
+    def test_numbered_values_at_length_limit(self):
+        """
+        Checks whether numbered slugs whose base was truncated to fit are found taken.
+        """
+        base = 'b' * 249
+        self.assertEqual(
+            [Tag.objects.create(name=f'{base}{mark}').slug for mark in ('', '!', '?', '.')],
+            [base, f'{base[:248]}-2', f'{base[:248]}-3', f'{base[:248]}-4'],
+        )
+
+    def test_values_without_letters(self):
+        """
+        Checks whether values without letters or digits get slugs made of the model name.
+        """
+        self.assertEqual(Tag.objects.create(name='!!!').slug, 'tag-2')
+        self.assertEqual(Tag.objects.create(name='???').slug, 'tag-3')
+
+
+class UniqueSlugMixinTests(SetUpData):
+
+    def test_colliding_titles(self):
+        """
+        Checks whether saving articles whose titles have the same slug does not fail.
+        """
+        article = create_article(
+            title='Article, title!',
+            author=self.author,
+            tags=[self.tag],
+            pub_date=timezone.now(),
+            content='content',
+        )
+        self.assertEqual(article.slug, 'article-title-2')
+
+    def test_slug_taken_by_concurrent_writer(self):
+        """
+        Checks whether a slug taken between allocation and INSERT is allocated again.
+        """
+        allocate_slugs = slugs.allocate_slugs
+        with mock.patch('library.slugs.allocate_slugs', side_effect=[['tag'], ['tag-2']]) as allocate:
+            new_tag = Tag.objects.create(name='Tag!')
+        self.assertEqual(allocate.call_count, 2)
+        self.assertEqual(new_tag.slug, 'tag-2')
+        self.assertEqual(allocate_slugs(Tag, ['Tag']), ['tag-3'])
+
+    def test_other_integrity_errors(self):
+        """
+        Checks whether errors of other unique fields are raised without allocating again.
+        """
+        tag = Tag(name='tag')
+        with self.assertRaises(IntegrityError):
+            tag.save()
+        self.assertEqual(tag.slug, '')
+
+    def test_given_slug_kept(self):
+        """
+        Checks whether a slug set before saving is not replaced.
+        """
+        self.assertEqual(Tag.objects.create(name='given', slug='given-slug').slug, 'given-slug')
+
+    def test_api(self):
+        """
+        Checks whether articles created through the API get numbered slugs.
+        """
+        client = APIClient()
+        client.force_authenticate(self.author)
+        response = client.post('/api/articles/', {
+            'title': 'article title?',
+            'content': 'content',
+            'tags': [f'/api/tags/{self.tag.slug}/'],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['slug'], 'article-title-2')
+
+
+class ImportSlugsTests(SetUpData):
+
+    def test_import_colliding_titles(self):
+        """
+        Checks whether imported articles and tags with colliding slugs get numbered ones.
+        """
+        result = import_articles([
+            {'title': 'Article title?', 'content': 'content', 'tags': ['C', 'C++']},
+            {'title': 'article title!', 'content': 'content', 'tags': ['C']},
+            {'title': 'Article title', 'content': 'content', 'tags': ['C']},
+        ], author=self.author)
+        self.assertEqual(result.created, ['article-title-2', 'article-title-3'])
+        self.assertEqual([error['index'] for error in result.errors], [2])
+        self.assertEqual(
+            dict(Tag.objects.filter(name__in=['C', 'C++']).values_list('name', 'slug')),
+            {'C': 'c', 'C++': 'c-2'},
+        )
+        self.assertEqual(Article.verified_objects.get(slug='article-title-3').tags.count(), 1)
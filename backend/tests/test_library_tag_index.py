@@ -0,0 +1,216 @@
+import random
+from array import array
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from common.test_utils import create_article, create_author, create_tag
+from library import tag_index
+from library.importer import import_articles
+from library.models import Article
+
+
+@override_settings(SINGLE_PROCESS=True)
+class SetUpData(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = create_author('author', 'p7w3n9xc')
+        self.python = create_tag('python')
+        self.django = create_tag('django')
+        self.rust = create_tag('rust')
+        self.go = create_tag('go')
+        pub_date = timezone.now() - timedelta(days=1)
+        self.web = create_article(
+            title='web', author=self.author, pub_date=pub_date, tags=[self.python, self.django], content='web',
+        )
+        self.scripts = create_article(
+            title='scripts', author=self.author, pub_date=pub_date, tags=[self.python], content='scripts',
+        )
+        self.systems = create_article(
+            title='systems', author=self.author, pub_date=pub_date, tags=[self.rust, self.go], content='systems',
+        )
+
+    def filter(self, text: str) -> set[str]:
+        return set(tag_index.filter_articles(Article.verified_objects.all(), text).values_list('title', flat=True))
+
+
+class ParserTests(SetUpData):
+
+    def test_precedence(self):
+        """
+        Checks whether NOT binds tighter than AND, AND tighter than OR, and parentheses group.
+        """
+        self.assertEqual(
+            tag_index.parse('a OR b and NOT c'),
+            ('or', ('tag', 'a'), ('and', ('tag', 'b'), ('not', ('tag', 'c')))),
+        )
+        self.assertEqual(
+            tag_index.parse('(a or b) AND c'),
+            ('and', ('or', ('tag', 'a'), ('tag', 'b')), ('tag', 'c')),
+        )
+
+    def test_invalid(self):
+        """
+        Checks whether malformed expressions raise `TagExpressionError`.
+        """
+        for text in ('', 'a AND', 'a b', '(a OR b', 'a)', 'OR a', 'NOT'):
+            with self.subTest(text=text):
+                with self.assertRaises(tag_index.TagExpressionError):
+                    tag_index.parse(text)
+
+
+class TagIndexTests(SetUpData):
+
+    def test_boolean_filters(self):
+        """
+        Checks whether expressions select articles like the tags table would.
+        """
+        self.assertEqual(self.filter('python AND django'), {'web'})
+        self.assertEqual(self.filter('rust OR go'), {'systems'})
+        self.assertEqual(self.filter('python AND NOT django'), {'scripts'})
+        self.assertEqual(self.filter('NOT python'), {'systems'})
+        self.assertEqual(self.filter('(django OR rust) AND NOT missing'), {'web', 'systems'})
+        self.assertEqual(self.filter('missing'), set())
+
+    def test_subqueries_for_large_results(self):
+        """
+        Checks whether results above `MAX_IDS` are filtered with subqueries the same way.
+        """
+        with mock.patch('library.tag_index.MAX_IDS', 0):
+            self.assertEqual(self.filter('python AND NOT django'), {'scripts'})
+            self.assertEqual(self.filter('NOT python OR django'), {'web', 'systems'})
+
+    def test_tags_changed(self):
+        """
+        Checks whether the index follows tags added and removed from both sides.
+        """
+        tag_index.get_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.scripts.tags.add(self.django)
+        self.assertEqual(self.filter('python AND django'), {'web', 'scripts'})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.django.articles.remove(self.web)
+        self.assertEqual(self.filter('django'), {'scripts'})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.python.articles.clear()
+        self.assertEqual(self.filter('python'), set())
+
+        with mock.patch.object(tag_index.TagIndex, 'load') as load:
+            tag_index.get_index()
+            load.assert_not_called()
+
+    def test_objects_deleted(self):
+        """
+        Checks whether deleted articles and tags leave the index.
+        """
+        tag_index.get_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.web.delete()
+            self.rust.delete()
+        self.assertEqual(len(tag_index.get_index().evaluate(('tag', 'django'))), 0)
+        self.assertNotIn('rust', tag_index.get_index().tag_ids)
+        self.assertEqual(self.filter('go'), {'systems'})
+
+    def test_import(self):
+        """
+        Checks whether imported articles and tags created with them are indexed.
+        """
+        tag_index.get_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            import_articles([{'title': 'imported', 'content': 'imported', 'tags': ['python', 'new']}], self.author)
+        self.assertEqual(self.filter('python AND new'), {'imported'})
+
+    def test_changed_by_other_process(self):
+        """
+        Checks whether changes of another process are applied without loading the index again.
+        """
+        tag_index.get_index()
+        with mock.patch.object(tag_index, '_index', tag_index.TagIndex()), \
+                self.captureOnCommitCallbacks(execute=True):
+            self.systems.tags.add(self.python)
+            self.rust.delete()
+        with mock.patch.object(tag_index.TagIndex, 'load') as load:
+            self.assertEqual(self.filter('python AND go'), {'systems'})
+            self.assertEqual(self.filter('rust'), set())
+        load.assert_not_called()
+
+    def test_missed_change_of_other_process(self):
+        """
+        Checks whether the index is loaded again when a change of another process is not in the cache.
+        """
+        index = tag_index.get_index()
+        index.add([(self.systems.pk, self.python.pk)])
+        cache.incr(tag_index.VERSION_KEY)
+        self.assertEqual(self.filter('python AND rust'), set())
+
+    @override_settings(SINGLE_PROCESS=False)
+    def test_process_local_cache(self):
+        """
+        Checks whether expressions are evaluated with subqueries when processes do not share the cache.
+        """
+        with mock.patch.object(tag_index.TagIndex, 'load') as load:
+            self.assertEqual(self.filter('python AND NOT django'), {'scripts'})
+        load.assert_not_called()
+
+
+class BitmapTests(SimpleTestCase):
+
+    def test_operations(self):
+        """
+        Checks whether bitmaps with sparse and dense chunks behave like sets.
+        """
+        generator = random.Random(0)
+        sets = [
+            set(generator.sample(range(200_000), 3000)) | set(range(70_000, 75_000)),
+            set(generator.sample(range(200_000), 6000)) | set(range(72_000, 80_000)),
+            {0, 65_535, 65_536, 10 ** 9},
+        ]
+        for left in sets:
+            for right in sets:
+                left_bitmap, right_bitmap = tag_index.Bitmap.from_ids(left), tag_index.Bitmap.from_ids(right)
+                self.assertEqual(list(left_bitmap & right_bitmap), sorted(left & right))
+                self.assertEqual(list(left_bitmap | right_bitmap), sorted(left | right))
+                self.assertEqual(list(left_bitmap - right_bitmap), sorted(left - right))
+                self.assertEqual(len(left_bitmap - right_bitmap), len(left - right))
+        self.assertIn(10 ** 9, tag_index.Bitmap.from_ids(sets[2]))
+        self.assertNotIn(10 ** 9 + 1, tag_index.Bitmap.from_ids(sets[2]))
+
+    def test_sparse_keys_stay_small(self):
+        """
+        Checks whether chunks hold as many values as keys, however large the keys are.
+        """
+        bitmap = tag_index.Bitmap.from_ids([1_000_000, 10 ** 9])
+        self.assertEqual([len(chunk) for chunk in bitmap.chunks.values()], [1, 1])
+        self.assertTrue(all(isinstance(chunk, array) for chunk in bitmap.chunks.values()))
+        dense = tag_index.Bitmap.from_ids(range(10_000))
+        self.assertIsInstance(dense.chunks[0], int)
+        self.assertIsInstance((dense - tag_index.Bitmap.from_ids(range(100, 10_000))).chunks[0], array)
+
+
+class TagFilterViewTests(SetUpData):
+
+    def test_api(self):
+        """
+        Checks whether the API lists articles matching `?tags=` and rejects malformed expressions.
+        """
+        response = self.client.get('/api/articles/', {'tags': 'python AND NOT django'})
+        self.assertEqual([article['title'] for article in response.data['results']], ['scripts'])
+        response = self.client.get('/api/articles/', {'tags': 'python AND'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('tags', response.data)
+
+    def test_article_list(self):
+        """
+        Checks whether the article list page shows articles matching `?tags=`.
+        """
+        response = self.client.get(reverse('library:article-list'), {'tags': 'rust OR django'})
+        self.assertEqual(set(response.context['published_articles_list']), {self.web, self.systems})
+        response = self.client.get(reverse('library:article-list'), {'tags': '(rust'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
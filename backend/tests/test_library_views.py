@@ -1,5 +1,6 @@
 from datetime import timedelta
 
+from django.db import connection
 from django.test import TestCase
 from django.urls import reverse
 from django.utils import timezone
@@ -14,6 +15,7 @@ class SetUpData(TestCase):
         self.index_template = 'library/index.html'
         self.article_list_template = 'library/article_list.html'
         self.article_detail_template = 'library/article_detail.html'
+        self.article_search_template = 'library/article_search.html'
         self.author_list_template = 'library/author_list.html'
         self.author_detail_template = 'library/author_detail.html'
         self.tag_list_template = 'library/tag_list.html'
@@ -25,6 +27,7 @@ class SetUpData(TestCase):
         self.index_url = 'library:index'
         self.article_list_url = 'library:article-list'
         self.article_detail_url = 'library:article-detail'
+        self.article_search_url = 'library:article-search'
         self.author_list_url = 'library:author-list'
         self.author_detail_url = 'library:author-detail'
         self.tag_list_url = 'library:tag-list'
@@ -160,6 +163,93 @@ class ArticleListViewTests(SetUpData):
         )
 
 
+class ArticleSearchViewTests(SetUpData):
+
+    def test_template_used(self):
+        """
+        Checks whether ArticleSearchView uses correct template.
+        """
+        response = self.client.get(reverse(self.article_search_url))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, self.article_search_template)
+
+    def test_matching_article(self):
+        """
+        Checks whether ArticleSearchView displays published article matching the query.
+        """
+        response = self.client.get(reverse(self.article_search_url), {'q': 'PAST content'})
+        self.assertQuerySetEqual(
+            response.context['found_articles_list'], [self.past_article]
+        )
+
+    def test_future_article(self):
+        """
+        Checks whether ArticleSearchView not displays article with future pub_date.
+        """
+        response = self.client.get(reverse(self.article_search_url), {'q': 'future'})
+        self.assertQuerySetEqual(response.context['found_articles_list'], [])
+        self.assertContains(response, 'No articles match your search.')
+
+    def test_ranking(self):
+        """
+        Checks whether articles matching the query in title are displayed first.
+        """
+        title_match = create_article(
+            title='django tips',
+            author=self.author,
+            tags=[self.tag],
+            pub_date=timezone.now() - timedelta(days=2),
+            content='short notes'
+        )
+        content_match = create_article(
+            title='web frameworks',
+            author=self.author,
+            tags=[self.tag],
+            pub_date=timezone.now() - timedelta(hours=1),
+            content='flask, rails and django compared'
+        )
+        response = self.client.get(reverse(self.article_search_url), {'q': 'django'})
+        self.assertQuerySetEqual(
+            response.context['found_articles_list'], [title_match, content_match]
+        )
+
+    def test_index_follows_changes(self):
+        """
+        Checks whether search index is updated when article is changed or deleted.
+        """
+        self.past_article.title = 'renamed title'
+        self.past_article.save()
+        response = self.client.get(reverse(self.article_search_url), {'q': 'renamed'})
+        self.assertQuerySetEqual(
+            response.context['found_articles_list'], [self.past_article]
+        )
+        self.past_article.delete()
+        response = self.client.get(reverse(self.article_search_url), {'q': 'renamed'})
+        self.assertQuerySetEqual(response.context['found_articles_list'], [])
+
+    def test_index_queried_once(self):
+        """
+        Checks whether a search runs one MATCH query of the index, ranking matches
+        in the same scan, instead of subqueries of the index per article.
+        """
+        sql, params = Article.verified_objects.search('django notes').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = [row[-1] for row in cursor.fetchall()]
+        self.assertEqual(len([step for step in plan if 'library_article_fts' in step]), 1, plan)
+        self.assertFalse(any('SUBQUERY' in step for step in plan), plan)
+
+    def test_query_with_operators(self):
+        """
+        Checks whether search syntax characters in query do not cause an error.
+        """
+        response = self.client.get(reverse(self.article_search_url), {'q': 'past" (content*'})
+        self.assertEqual(response.status_code, 200)
+        self.assertQuerySetEqual(
+            response.context['found_articles_list'], [self.past_article]
+        )
+
+
 class ArticleDetailViewTests(SetUpData):
 
     def test_template_used(self):
@@ -0,0 +1,267 @@
+"""
+Query count, latency and response size budgets for every route
+of the `library` app and the API.
+
+Query counts and sizes are always checked. Latency varies with the machine,
+so it is only checked when the `BUDGET_LATENCY` environment variable sets
+a factor the latency budgets are multiplied by, e.g. `1` for the budgets
+as declared. Measurements are written as JSON to the path given by the
+`BUDGET_REPORT` environment variable, if any, so that they can be compared
+across releases.
+
+Pages of the page cache are measured rendered, the measured request
+removes its page from the cache after the warm-up request stored it.
+Work deferred until commit, e.g. indexing of imported articles, is
+counted with the request that committed it.
+"""
+import json
+import os
+import time
+from datetime import timedelta
+from typing import NamedTuple
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, resolve
+from django.utils import timezone
+
+from common.test_utils import create_article, create_author, create_tag
+from library import page_cache
+
+
+class Budget(NamedTuple):
+    queries: int
+    milliseconds: int
+    size: int
+
+
+BUDGETS = {
+    'library:index': Budget(queries=0, milliseconds=250, size=2_000),
+    'library:article-list': Budget(queries=3, milliseconds=250, size=10_000),
+    'library:article-search': Budget(queries=2, milliseconds=250, size=10_000),
+    'library:article-detail': Budget(queries=7, milliseconds=250, size=5_000),
+    'library:author-list': Budget(queries=1, milliseconds=250, size=2_000),
+    'library:author-detail': Budget(queries=5, milliseconds=250, size=4_000),
+    'library:tag-list': Budget(queries=1, milliseconds=250, size=2_000),
+    'library:tag-detail': Budget(queries=5, milliseconds=250, size=4_000),
+    'library:user-register': Budget(queries=0, milliseconds=250, size=2_000),
+    'library:user-login': Budget(queries=0, milliseconds=250, size=2_000),
+    'library:user-logout': Budget(queries=4, milliseconds=250, size=1_000),
+    'api:api-root': Budget(queries=0, milliseconds=250, size=1_000),
+    'api:article-list': Budget(queries=4, milliseconds=500, size=10_000),
+    'api:article-list-cursor': Budget(queries=3, milliseconds=500, size=10_000),
+    'api:article-search': Budget(queries=4, milliseconds=500, size=10_000),
+    'api:article-tags': Budget(queries=4, milliseconds=500, size=10_000),
+    'api:article-detail': Budget(queries=3, milliseconds=250, size=4_000),
+    'api:article-export': Budget(queries=2, milliseconds=500, size=160_000),
+    'api:article-import': Budget(queries=26, milliseconds=500, size=2_000),
+    'api:article-similar': Budget(queries=3, milliseconds=250, size=8_000),
+    'api:author-list': Budget(queries=4, milliseconds=500, size=8_000),
+    'api:author-detail': Budget(queries=3, milliseconds=250, size=2_000),
+    'api:author-export': Budget(queries=1, milliseconds=250, size=2_000),
+    'api:tag-list': Budget(queries=4, milliseconds=500, size=12_000),
+    'api:tag-detail': Budget(queries=3, milliseconds=250, size=2_000),
+    'api:tag-export': Budget(queries=1, milliseconds=250, size=2_000),
+}
+
+
+# URL configurations whose routes are measured, route names are prefixed
+# with their package. The admin and the API schema are left out.
+MEASURED_URLCONFS = ('library.urls', 'api.urls')
+
+
+def get_latency_factor() -> float | None:
+    """
+    Returns the factor of latency budgets from `BUDGET_LATENCY`, None when it is not set.
+    """
+    factor = os.environ.get('BUDGET_LATENCY')
+    return float(factor) if factor else None
+
+
+def get_route_names() -> set[str]:
+    """
+    Returns prefixed names of all routes of the measured URL configurations.
+    """
+    names = set()
+    for pattern in get_resolver().url_patterns:
+        urlconf = getattr(pattern, 'urlconf_name', None)
+        module = getattr(urlconf, '__name__', urlconf)
+        if module in MEASURED_URLCONFS:
+            prefix = module.split('.')[0]
+            names.update(f'{prefix}:{name}' for name in _get_names(pattern.url_patterns))
+    return names
+
+
+def _get_names(patterns: list) -> set[str]:
+    names = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            names |= _get_names(pattern.url_patterns)
+        elif pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+@override_settings(SINGLE_PROCESS=True)
+class SetUpData(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = [create_author(f'author{i}', 'wao7984v') for i in range(4)]
+        cls.tags = [create_tag(f'tag {i}') for i in range(12)]
+        now = timezone.now()
+        # Runs indexing deferred until commit, test data is never committed.
+        with cls.captureOnCommitCallbacks(execute=True):
+            for i in range(60):
+                create_article(
+                    title=f'article {i}',
+                    author=cls.authors[i % len(cls.authors)],
+                    tags=[cls.tags[(i + j) % len(cls.tags)] for j in range(3)],
+                    pub_date=now - timedelta(hours=i + 1),
+                    content=' '.join(f'word_{i}_{j}' for j in range(200)),
+                )
+            for i in range(5):
+                create_article(
+                    title=f'future article {i}',
+                    author=cls.authors[0],
+                    tags=[cls.tags[0]],
+                    pub_date=now + timedelta(days=i + 1),
+                    content='future content',
+                )
+        cls.results = {}
+
+    def setUp(self):
+        # Indexes kept in memory may hold rows of other test cases, rolled back since.
+        cache.clear()
+
+    @classmethod
+    def tearDownClass(cls):
+        report_path = os.environ.get('BUDGET_REPORT')
+        if report_path:
+            with open(report_path, 'w') as report:
+                json.dump(cls.results, report, indent=2, sort_keys=True)
+        super().tearDownClass()
+
+    def get_routes(self) -> dict:
+        """
+        Returns route names mapped to requests that exercise them.
+        """
+        article = 'article-30'
+        author = 'author1'
+        tag = 'tag-5'
+        return {
+            'library:index': ('get', '/'),
+            'library:article-list': ('get', '/articles/'),
+            'library:article-search': ('get', '/search/?q=word_30_1'),
+            'library:article-detail': ('get', f'/article-{article}/'),
+            'library:author-list': ('get', '/authors/'),
+            'library:author-detail': ('get', f'/author-{author}/'),
+            'library:tag-list': ('get', '/tags/'),
+            'library:tag-detail': ('get', f'/tag-{tag}/'),
+            'library:user-register': ('get', '/register/'),
+            'library:user-login': ('get', '/login/'),
+            'library:user-logout': ('post', '/logout/'),
+            'api:api-root': ('get', '/api/'),
+            'api:article-list': ('get', '/api/articles/?page=3'),
+            'api:article-list-cursor': ('get', '/api/articles/?pagination=cursor'),
+            'api:article-search': ('get', '/api/articles/?q=word'),
+            'api:article-tags': ('get', '/api/articles/?tags=(tag-1 OR tag-2) AND NOT tag-3'),
+            'api:article-detail': ('get', f'/api/articles/{article}/'),
+            'api:article-export': ('get', '/api/articles/export/'),
+            'api:article-import': ('post', '/api/articles/import/'),
+            'api:article-similar': ('get', f'/api/articles/{article}/similar/'),
+            'api:author-list': ('get', '/api/authors/'),
+            'api:author-detail': ('get', f'/api/authors/{author}/'),
+            'api:author-export': ('get', '/api/authors/export/'),
+            'api:tag-list': ('get', '/api/tags/'),
+            'api:tag-detail': ('get', f'/api/tags/{tag}/'),
+            'api:tag-export': ('get', '/api/tags/export/'),
+        }
+
+    def get_payload(self, name: str) -> list | None:
+        """
+        Returns JSON data posted to the route, every call returns new articles.
+        """
+        if name != 'api:article-import':
+            return None
+        self.imported = getattr(self, 'imported', 0) + 1
+        return [
+            {
+                'title': f'imported {self.imported} {i}',
+                'content': 'imported content',
+                'tags': ['tag 1', f'imported tag {i}'],
+            }
+            for i in range(10)
+        ]
+
+    def request(self, name: str, method: str, url: str):
+        """
+        Requests the url, routes with a payload receive it as JSON.
+        """
+        payload = self.get_payload(name)
+        if payload is None:
+            return getattr(self.client, method)(url)
+        return self.client.post(url, json.dumps(payload), content_type='application/json')
+
+    def measure(self, name: str, method: str, url: str) -> dict:
+        """
+        Requests the url and returns number of queries, time and response size.
+        """
+        if method == 'post':
+            self.client.force_login(self.authors[0])
+        page_cache.get_cache().delete(page_cache.get_page_key(RequestFactory().get(url)))
+        with CaptureQueriesContext(connection) as context, self.captureOnCommitCallbacks(execute=True):
+            start = time.perf_counter()
+            response = self.request(name, method, url)
+            if response.streaming:
+                content = b''.join(response.streaming_content)
+            else:
+                content = response.content
+            elapsed = time.perf_counter() - start
+        self.assertLess(response.status_code, 400, url)
+        return {
+            'url': url,
+            'status': response.status_code,
+            'queries': len(context.captured_queries),
+            'milliseconds': round(elapsed * 1000, 2),
+            'size': len(content),
+        }
+
+
+class RouteBudgetTests(SetUpData):
+
+    def test_every_route_has_budget(self):
+        """
+        Checks whether every named route of the library app and the API
+        is measured and every measured request has a declared budget.
+        """
+        measured = {
+            f'{name.split(":")[0]}:{resolve(url.split("?")[0]).url_name}'
+            for name, (_, url) in self.get_routes().items()
+        }
+        self.assertEqual(measured, get_route_names())
+        self.assertEqual(set(self.get_routes()), set(BUDGETS))
+
+    def test_routes_within_budget(self):
+        """
+        Checks whether every route stays within its query count,
+        latency and response size budget.
+        """
+        latency_factor = get_latency_factor()
+        for name, (method, url) in self.get_routes().items():
+            with self.subTest(route=name):
+                # The first request warms up templates and url resolvers.
+                if method == 'post':
+                    self.client.force_login(self.authors[0])
+                self.request(name, method, url)
+                result = self.measure(name, method, url)
+                self.client.logout()
+                budget = BUDGETS[name]
+                type(self).results[name] = {**result, 'budget': budget._asdict()}
+
+                self.assertLessEqual(result['queries'], budget.queries)
+                self.assertLessEqual(result['size'], budget.size)
+                if latency_factor is not None:
+                    self.assertLessEqual(result['milliseconds'], budget.milliseconds * latency_factor)